@@ -21,6 +21,7 @@ setup(
     """.split(
         "\n"
     ),
+    extras_require={"yaml": ["PyYAML"]},
     tests_require=["coverage", "pytest"],
     python_requires=">=3.6",
     packages=find_packages("src"),
@@ -3,16 +3,10 @@ from sys import argv
 
 import click
 
-from .config import command as config
+from . import output
+from .command_util import LazyGroup
 from .config import manager as config_manager
-from .pipeline import command as pipeline
-from .report import command as report
-from .result import command as result
-from .run import command as run
-from .software import command as software
-from .subscription import command as subscription
-from .template import command as template
-from .test import command as test
+from .rest import response_cache
 
 # Version number is automatically set via bumpversion.
 # DO NOT MODIFY:
@@ -24,9 +18,28 @@ LOGGER = logging.getLogger(__name__)
 # Context settings for commands, for overwriting some click defaults
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
+# Update with new sub-commands.  Maps each sub-command to the module that defines it, so the module
+# is only imported when the sub-command is invoked
+SUBCOMMAND_MODULES = {
+    "pipeline": "carrot_cli.pipeline.command",
+    "template": "carrot_cli.template.command",
+    "test": "carrot_cli.test.command",
+    "subscription": "carrot_cli.subscription.command",
+    "result": "carrot_cli.result.command",
+    "run": "carrot_cli.run.command",
+    "software": "carrot_cli.software.command",
+    "config": "carrot_cli.config.command",
+    "report": "carrot_cli.report.command",
+    "cache": "carrot_cli.cache.command",
+    "mirror": "carrot_cli.mirror.command",
+    "apply": "carrot_cli.apply.command",
+}
+
 
 @click.group(
     name="carrot_cli",
+    cls=LazyGroup,
+    lazy_subcommands=SUBCOMMAND_MODULES,
     context_settings=CONTEXT_SETTINGS
 )
 @click.option(
@@ -49,11 +62,38 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
     flag_value=logging.NOTSET,
     help="Highest level logging for debugging",
 )
-def main_entry(verbosity):
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(output.OUTPUT_FORMATS),
+    default="pretty",
+    show_default=True,
+    help="How to format json output: pretty prints it indented with sorted keys, compact prints "
+    "it on one line with keys in the order they were received, and ndjson prints lists of records "
+    "with one compact record per line",
+)
+@click.option(
+    "--cache_only",
+    "cache_mode",
+    flag_value="cache_only",
+    help="Only use cached records when retrieving records by id, without sending requests to "
+    "the server",
+)
+@click.option(
+    "--refresh",
+    "cache_mode",
+    flag_value="refresh",
+    help="Ignore cached records when retrieving records by id, and update the cache with the "
+    "retrieved records",
+)
+def main_entry(verbosity, output_format, cache_mode):
+    output.set_output_format(output_format)
+    response_cache.set_mode(cache_mode or "default")
+
     # Set up our log verbosity
     from . import log  # pylint: disable=C0415
 
-    log.configure_logging(verbosity)
+    log.configure_logging(verbosity, __version__)
 
     # Make sure we have a config file
     config_manager.create_config_dir_if_not_exists()
@@ -69,16 +109,5 @@ def version():
     LOGGER.info("carrot_cli %s", __version__)
 
 
-# Update with new sub-commands:
-main_entry.add_command(pipeline.main)
-main_entry.add_command(template.main)
-main_entry.add_command(test.main)
-main_entry.add_command(subscription.main)
-main_entry.add_command(result.main)
-main_entry.add_command(run.main)
-main_entry.add_command(software.main)
-main_entry.add_command(config.main)
-main_entry.add_command(report.main)
-
 if __name__ == "__main__":
     main_entry()  # pylint: disable=E1120
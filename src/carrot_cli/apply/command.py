@@ -0,0 +1,80 @@
+import logging
+import sys
+
+import click
+
+from .. import output
+from ..config import manager as config
+from . import spec as spec_util
+
+LOGGER = logging.getLogger(__name__)
+
+# Default maximum number of changes to make at once
+DEFAULT_APPLY_PARALLELISM = 4
+
+
+@click.command(name="apply")
+@click.argument("spec")
+@click.option(
+    "--created_by",
+    default="",
+    help="Email of the creator of any records that are created.  Defaults to email config "
+    "variable",
+)
+@click.option(
+    "--parallelism",
+    default=DEFAULT_APPLY_PARALLELISM,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="The maximum number of records to create or update at once",
+)
+@click.option(
+    "--dry_run",
+    is_flag=True,
+    default=False,
+    help="Print the changes that would be made without making them",
+)
+@click.option(
+    "--force_upload",
+    is_flag=True,
+    default=False,
+    help="Upload the local WDL files of templates that already exist, even if they are the same "
+    "as the files last uploaded for them",
+)
+def main(spec, created_by, parallelism, dry_run, force_upload):
+    """
+    Create or update the pipelines, templates, tests, results and reports described in SPEC, a
+    json (or, if PyYAML is installed, YAML) file, and the mappings between them.  Only the records
+    and fields that differ from what's on the server are changed, so applying the same spec again
+    does nothing.  Records that aren't in SPEC are left alone.  Prints the changes that were made
+    """
+    try:
+        items = spec_util.load_spec(spec)
+        changes, ids = spec_util.plan(items, force_upload=force_upload)
+    except spec_util.SpecError as e:
+        LOGGER.error(e.message)
+        sys.exit(1)
+    if not changes:
+        LOGGER.info("Everything in the spec is already up to date")
+        output.print_result([])
+        return
+    if dry_run:
+        output.print_result([spec_util.describe_change(change) for change in changes])
+        return
+    # If created_by is not set and there is an email config variable, fill with that
+    if created_by == "":
+        email_config_val = config.load_var_no_error("email")
+        if email_config_val is not None:
+            created_by = email_config_val
+        else:
+            LOGGER.error(
+                "No email config variable set.  If a value is not specified for --created by, "
+                "there must be a value set for email."
+            )
+            sys.exit(1)
+    reports = spec_util.apply_changes(
+        changes, ids, created_by, parallelism, force_upload=force_upload
+    )
+    output.print_result(reports)
+    if any(report["status"] != "succeeded" for report in reports):
+        sys.exit(1)
@@ -0,0 +1,720 @@
+import functools
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import output, wdl_util
+from ..rest import (
+    pipelines,
+    reports,
+    request_handler,
+    results,
+    template_reports,
+    template_results,
+    templates,
+    tests,
+    upload_manifest,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# For each type of entity a spec can contain, the rest module for it, the key for its id, the
+# fields that can be set in the spec, the fields that can be changed once it's created, and the
+# fields that are json (which can be given inline or as the path to a json file)
+ENTITIES = {
+    "pipelines": {
+        "module": pipelines,
+        "id_key": "pipeline_id",
+        "fields": ("description",),
+        "updatable": ("description",),
+        "json_fields": (),
+    },
+    "results": {
+        "module": results,
+        "id_key": "result_id",
+        "fields": ("description", "result_type"),
+        "updatable": ("description",),
+        "json_fields": (),
+    },
+    "reports": {
+        "module": reports,
+        "id_key": "report_id",
+        "fields": ("description", "notebook", "config"),
+        "updatable": ("description", "notebook", "config"),
+        "json_fields": ("notebook", "config"),
+    },
+    "templates": {
+        "module": templates,
+        "id_key": "template_id",
+        "fields": (
+            "description",
+            "test_wdl",
+            "test_wdl_dependencies",
+            "eval_wdl",
+            "eval_wdl_dependencies",
+        ),
+        "updatable": (
+            "description",
+            "test_wdl",
+            "test_wdl_dependencies",
+            "eval_wdl",
+            "eval_wdl_dependencies",
+        ),
+        "json_fields": (),
+    },
+    "tests": {
+        "module": tests,
+        "id_key": "test_id",
+        "fields": (
+            "description",
+            "test_input_defaults",
+            "test_option_defaults",
+            "eval_input_defaults",
+            "eval_option_defaults",
+        ),
+        "updatable": (
+            "description",
+            "test_input_defaults",
+            "test_option_defaults",
+            "eval_input_defaults",
+            "eval_option_defaults",
+        ),
+        "json_fields": (
+            "test_input_defaults",
+            "test_option_defaults",
+            "eval_input_defaults",
+            "eval_option_defaults",
+        ),
+    },
+}
+
+# Fields holding WDLs, which can be URIs or paths to local files
+WDL_FIELDS = (
+    "test_wdl",
+    "test_wdl_dependencies",
+    "eval_wdl",
+    "eval_wdl_dependencies",
+)
+
+# Prefixes for WDL locations that the server reads itself, as opposed to local files we upload
+URI_PREFIXES = ("http://", "https://", "gs://")
+
+# Changes are made in this order, since each level needs the ids of the records created in the
+# ones before it.  Changes within a level are independent of each other
+LEVELS = (
+    ("pipelines", "results", "reports"),
+    ("templates",),
+    ("tests", "template_results", "template_reports"),
+)
+
+# Page size for retrieving a template's existing mappings
+FIND_MAPS_PAGE_SIZE = 100
+
+
+class SpecError(Exception):
+    """
+    Represents a problem with a spec, or with retrieving the current state of the records it
+    describes
+    """
+
+    # Constructor takes a message describing the problem
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def load_spec(filename):
+    """
+    Reads the spec in filename.  Files ending in .yaml or .yml are read as YAML (which requires
+    PyYAML to be installed), and anything else as json.  Relative paths to files in the spec are
+    resolved relative to the directory containing it
+
+    Returns
+    -------
+    A list of the changes described by the spec, as returned by flatten_spec.  Raises a SpecError
+    if the file can't be read or the spec is invalid
+    """
+    try:
+        with open(filename, "r") as spec_file:
+            if filename.lower().endswith((".yaml", ".yml")):
+                try:
+                    import yaml  # pylint: disable=C0415
+                except ImportError:
+                    raise SpecError(
+                        "Reading YAML specs requires PyYAML, which is not installed. Install it "
+                        "with pip install carrot_cli[yaml], or write the spec as json"
+                    )
+                try:
+                    spec = yaml.safe_load(spec_file)
+                except yaml.YAMLError as e:
+                    raise SpecError(f"Failed to parse {filename} as YAML: {e}")
+            else:
+                try:
+                    spec = json.load(spec_file)
+                except json.JSONDecodeError as e:
+                    raise SpecError(f"Failed to parse {filename} as json: {e}")
+    except OSError as e:
+        raise SpecError(f"Failed to read {filename}: {e}")
+    return flatten_spec(spec, os.path.dirname(os.path.abspath(filename)))
+
+
+def flatten_spec(spec, base_dir):
+    """
+    Converts spec, a dict with lists of pipelines (each with a list of templates, each with lists
+    of tests, results and reports), results and reports, into a flat list of the records and
+    mappings it describes, loading any json files it refers to
+
+    Parameters
+    ----------
+    spec - the parsed spec
+    base_dir - the directory that relative paths in the spec are relative to
+
+    Returns
+    -------
+    A list of dicts, one for each record or mapping in the spec.  Records have the entity type,
+    name, fields, and the entity type and name of their parent (for templates and tests).
+    Mappings have the entity type (template_results or template_reports), the names of the
+    template and result or report, and the result_key for results.  Raises a SpecError if the
+    spec is invalid
+    """
+    if not isinstance(spec, dict):
+        raise SpecError("The spec must be a mapping with pipelines, results and reports lists")
+    unknown_keys = set(spec) - {"pipelines", "results", "reports"}
+    if unknown_keys:
+        raise SpecError(f"Unrecognized keys in spec: {', '.join(sorted(unknown_keys))}")
+    items = []
+    for entity in ("pipelines", "results", "reports"):
+        for record in __get_list(spec, entity, "spec"):
+            items.append(__flatten_record(entity, record, None, base_dir))
+            if entity != "pipelines":
+                continue
+            for template in __get_list(record, "templates", f"pipeline {record['name']}"):
+                items.append(
+                    __flatten_record(
+                        "templates", template, ("pipelines", record["name"]), base_dir
+                    )
+                )
+                items.extend(__flatten_template_children(template, base_dir))
+    # Names are unique, so the same one can't be used for two records of the same type
+    seen = set()
+    for item in items:
+        key = __key(item)
+        if key in seen:
+            raise SpecError(f"{__describe(item)} appears in the spec more than once")
+        seen.add(key)
+    return items
+
+
+def plan(items, force_upload=False):
+    """
+    Works out the changes needed to make the server match items, the flattened spec returned by
+    load_spec, by retrieving the current state of every record in it from the server, with the
+    lookups sent concurrently.  If force_upload is True, the local WDLs of templates that already
+    exist are uploaded again even if they don't seem to have changed
+
+    Returns
+    -------
+    A tuple of a list of changes (dicts describing the create, update or map requests to send)
+    in the order they need to be made, and a dict mapping (entity, name) keys to the ids of the
+    records that already exist.  Raises a SpecError if the spec can't be applied, e.g. because a
+    record that can't be changed doesn't match the spec
+    """
+    # Look up every record mentioned in the spec by name, including results and reports that are
+    # only mapped to templates
+    spec_keys = {__key(item) for item in items if "name" in item}
+    keys = set(spec_keys)
+    for item in items:
+        if item["entity"] == "template_results":
+            keys.add(("results", item["result"]))
+        elif item["entity"] == "template_reports":
+            keys.add(("reports", item["report"]))
+    keys = sorted(keys)
+    with ThreadPoolExecutor(max_workers=min(8, len(keys) or 1)) as executor:
+        existing = dict(zip(keys, executor.map(__find_existing, keys)))
+        ids = {
+            key: record[ENTITIES[key[0]]["id_key"]]
+            for key, record in existing.items()
+            if record is not None
+        }
+        # Retrieve the existing mappings for templates that already exist and have mappings in
+        # the spec
+        map_keys = sorted(
+            {
+                (item["entity"], item["template"])
+                for item in items
+                if item["entity"] in ("template_results", "template_reports")
+                and ("templates", item["template"]) in ids
+            }
+        )
+        existing_maps = dict(
+            zip(
+                map_keys,
+                executor.map(
+                    lambda map_key: __find_existing_maps(
+                        map_key[0], ids[("templates", map_key[1])]
+                    ),
+                    map_keys,
+                ),
+            )
+        )
+    changes = []
+    for item in items:
+        if item["entity"] in ENTITIES:
+            change = __diff_record(item, existing[__key(item)], ids, force_upload)
+        else:
+            __check_mapped_record(item, spec_keys, ids)
+            change = __diff_map(item, existing_maps, ids)
+        if change is not None:
+            changes.append(change)
+    level_order = {entity: index for index, level in enumerate(LEVELS) for entity in level}
+    changes.sort(key=lambda change: level_order[change["entity"]])
+    return changes, ids
+
+
+def apply_changes(changes, ids, created_by, parallelism, force_upload=False):
+    """
+    Makes changes, as returned by plan, a level at a time, so records are created before the
+    records that depend on them.  The changes in each level are made concurrently.  A change
+    that depends on a record that failed to be created is skipped
+
+    Parameters
+    ----------
+    changes - the list of changes returned by plan
+    ids - the dict mapping (entity, name) keys to ids returned by plan, which is updated with the
+          ids of created records
+    created_by - the email to use as the creator of new records
+    parallelism - the maximum number of requests to send at once
+    force_upload - if True, local WDLs are uploaded even if they're the same as the ones last
+                   uploaded for their templates
+
+    Returns
+    -------
+    A list with a report for each change, in the same order as changes, with its status and,
+    for records, the id of the record, or an error message if it failed
+    """
+    reports_by_change = {}
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for level in LEVELS:
+            level_changes = [change for change in changes if change["entity"] in level]
+            apply_one = functools.partial(
+                __apply_change, ids=ids, created_by=created_by, force_upload=force_upload
+            )
+            for change, report in zip(level_changes, executor.map(apply_one, level_changes)):
+                reports_by_change[id(change)] = report
+                if report.get("id") is not None and "name" in change:
+                    ids[(change["entity"], change["name"])] = report["id"]
+    return [reports_by_change[id(change)] for change in changes]
+
+
+def describe_change(change):
+    """Returns a dict describing change, without the values being sent, for printing"""
+    description = {"action": change["action"], "entity": change["entity"]}
+    for key in ("name", "template", "result", "report", "result_key"):
+        if key in change:
+            description[key] = change[key]
+    if change["action"] == "update":
+        description["fields"] = sorted(change["fields"])
+    return description
+
+
+def __get_list(container, key, container_name):
+    """
+    Returns container[key], checking it's a list of dicts with names, or an empty list if it's
+    not set
+    """
+    value = container.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise SpecError(f"{key} in {container_name} must be a list")
+    for element in value:
+        if not isinstance(element, dict) or not element.get("name"):
+            raise SpecError(f"Every entry in {key} in {container_name} must have a name")
+    return value
+
+
+def __flatten_record(entity, record, parent, base_dir):
+    """
+    Returns the flattened item for record, a record of type entity from the spec with parent,
+    the (entity, name) key of its parent record, or None
+    """
+    info = ENTITIES[entity]
+    nested_keys = {"templates"} if entity == "pipelines" else set()
+    if entity == "templates":
+        nested_keys = {"tests", "results", "reports", "build_dependencies"}
+    unknown_fields = set(record) - set(info["fields"]) - nested_keys - {"name"}
+    if unknown_fields:
+        raise SpecError(
+            f"Unrecognized fields for {entity[:-1]} {record['name']}: "
+            f"{', '.join(sorted(unknown_fields))}"
+        )
+    fields = {}
+    for field in info["fields"]:
+        value = record.get(field)
+        if value is None:
+            continue
+        if field in info["json_fields"] and isinstance(value, str):
+            value = __load_json_file(__resolve_path(value, base_dir))
+        elif field in WDL_FIELDS:
+            value = __resolve_path(value, base_dir)
+        fields[field] = value
+    if entity == "results" and "result_type" not in fields:
+        raise SpecError(f"result {record['name']} must have a result_type")
+    if entity == "templates" and not ("test_wdl" in fields and "eval_wdl" in fields):
+        raise SpecError(f"template {record['name']} must have a test_wdl and an eval_wdl")
+    if entity == "templates" and record.get("build_dependencies"):
+        __build_dependencies(fields)
+    if entity == "reports" and "notebook" not in fields:
+        raise SpecError(f"report {record['name']} must have a notebook")
+    return {"entity": entity, "name": record["name"], "fields": fields, "parent": parent}
+
+
+def __build_dependencies(fields):
+    """
+    Fills in the dependencies zips in fields, the fields of a template, for local WDLs without
+    them, with zips built from the local files the WDLs import
+    """
+    for wdl_field in ("test_wdl", "eval_wdl"):
+        dependencies_field = f"{wdl_field}_dependencies"
+        if dependencies_field in fields or fields[wdl_field].startswith(URI_PREFIXES):
+            continue
+        try:
+            zip_path = wdl_util.build_dependency_zip(fields[wdl_field])
+        except wdl_util.WdlImportError as e:
+            raise SpecError(e.message)
+        if zip_path is not None:
+            fields[dependencies_field] = zip_path
+
+
+def __flatten_template_children(template, base_dir):
+    """Returns the flattened items for the tests and mappings nested in template"""
+    name = template["name"]
+    items = []
+    for test in __get_list(template, "tests", f"template {name}"):
+        items.append(__flatten_record("tests", test, ("templates", name), base_dir))
+    # Results and reports are referred to by name, and results also need the key they map to
+    for result in __get_list(template, "results", f"template {name}"):
+        if not result.get("result_key"):
+            raise SpecError(f"Result {result['name']} in template {name} must have a result_key")
+        items.append(
+            {
+                "entity": "template_results",
+                "template": name,
+                "result": result["name"],
+                "result_key": result["result_key"],
+            }
+        )
+    for report in __get_list(template, "reports", f"template {name}"):
+        items.append({"entity": "template_reports", "template": name, "report": report["name"]})
+    return items
+
+
+def __resolve_path(value, base_dir):
+    """Returns value, with relative paths to local files made relative to base_dir"""
+    if not isinstance(value, str) or value.startswith(URI_PREFIXES):
+        return value
+    return os.path.join(base_dir, os.path.expanduser(value))
+
+
+def __load_json_file(filename):
+    """Returns the contents of filename parsed as json, or raises a SpecError if it can't be"""
+    try:
+        with open(filename, "r") as json_file:
+            return json.load(json_file)
+    except OSError as e:
+        raise SpecError(f"Failed to read {filename}: {e}")
+    except json.JSONDecodeError as e:
+        raise SpecError(f"Failed to parse {filename} as json: {e}")
+
+
+def __key(item):
+    """Returns the key identifying item, a flattened record or mapping"""
+    if item["entity"] == "template_results":
+        return (item["entity"], item["template"], item["result"])
+    if item["entity"] == "template_reports":
+        return (item["entity"], item["template"], item["report"])
+    return (item["entity"], item["name"])
+
+
+def __describe(item):
+    """Returns a description of item, a flattened record or mapping, for error messages"""
+    if item["entity"] == "template_results":
+        return f"The mapping from template {item['template']} to result {item['result']}"
+    if item["entity"] == "template_reports":
+        return f"The mapping from template {item['template']} to report {item['report']}"
+    return f"{item['entity'][:-1].capitalize()} {item['name']}"
+
+
+def __find_existing(key):
+    """
+    Returns the record identified by key, an (entity, name) tuple, or None if there isn't one,
+    or raises a SpecError if it couldn't be retrieved
+    """
+    entity, name = key
+    records = ENTITIES[entity]["module"].find(name=name, limit=2)
+    if isinstance(records, request_handler.ErrorResponse) and records.status == 404:
+        return None
+    if not isinstance(records, list) or len(records) > 1:
+        raise SpecError(
+            f"Failed to retrieve {entity[:-1]} {name}: {output.format_result(records)}"
+        )
+    return records[0] if records else None
+
+
+def __find_existing_maps(entity, template_id):
+    """
+    Returns the existing mappings of type entity (template_results or template_reports) for the
+    template with template_id, or raises a SpecError if they couldn't be retrieved
+    """
+    if entity == "template_results":
+        find_page = functools.partial(
+            template_results.find_maps, template_id, "", "", "", "", "", ""
+        )
+    else:
+        find_page = functools.partial(
+            template_reports.find_maps, template_id, "", "", "", "", ""
+        )
+    try:
+        return list(request_handler.paginate(find_page, FIND_MAPS_PAGE_SIZE))
+    except request_handler.PaginationError as e:
+        # The server returns a 404 if there aren't any
+        if isinstance(e.response, request_handler.ErrorResponse) and e.response.status == 404:
+            return []
+        raise SpecError(
+            f"Failed to retrieve mappings for template {template_id}: "
+            f"{output.format_result(e.response)}"
+        )
+
+
+def __diff_record(item, record, ids, force_upload):
+    """
+    Returns the change needed to make record, the existing record for item (or None if it
+    doesn't exist), match item, or None if it already does.  Local WDLs are always treated as
+    changed if force_upload is True.  Raises a SpecError if the record can't be changed to match
+    """
+    entity = item["entity"]
+    info = ENTITIES[entity]
+    if record is None:
+        return {
+            "action": "create",
+            "entity": entity,
+            "name": item["name"],
+            "fields": item["fields"],
+            "parent": item["parent"],
+        }
+    # A record can't be moved to a different parent
+    if item["parent"] is not None:
+        parent_entity = item["parent"][0]
+        parent_id_key = ENTITIES[parent_entity]["id_key"]
+        parent_id = ids.get(item["parent"])
+        if record.get(parent_id_key) != parent_id:
+            raise SpecError(
+                f"{__describe(item)} already exists in a different {parent_entity[:-1]}"
+            )
+    changed = {}
+    for field, value in item["fields"].items():
+        current = record.get(field)
+        # Local WDL files are uploaded and stored by the server, so whether they've changed
+        # depends on what was last uploaded from here
+        if field in WDL_FIELDS and not value.startswith(URI_PREFIXES):
+            if not force_upload and not __local_wdl_changed(item, record, field, value):
+                continue
+        elif __normalize(value) == __normalize(current):
+            continue
+        if field not in info["updatable"]:
+            raise SpecError(
+                f"{__describe(item)} already exists with a different {field}, which can't be "
+                "changed"
+            )
+        changed[field] = value
+    if not changed:
+        return None
+    return {"action": "update", "entity": entity, "name": item["name"], "fields": changed}
+
+
+def __local_wdl_changed(item, record, field, value):
+    """
+    Returns True if value, the path of a local WDL for field of item, a template that exists as
+    record, has different contents from the file last uploaded for that field according to the
+    upload manifest.  The manifest only knows about uploads from this machine, and the server
+    won't update the WDLs of a template that has runs, so if nothing has been recorded for the
+    field the WDL is assumed to be unchanged rather than risking a failed update
+    """
+    upload = upload_manifest.get_upload(record[ENTITIES["templates"]["id_key"]], field)
+    if upload is None:
+        LOGGER.warning(
+            "No record of uploading %s for %s of template %s, so assuming it hasn't changed.  "
+            "Use --force_upload to upload it anyway",
+            value,
+            field,
+            item["name"],
+        )
+        return False
+    return upload["sha256"] != upload_manifest.hash_file(value)
+
+
+def __check_mapped_record(item, spec_keys, ids):
+    """
+    Raises a SpecError if the result or report that item, a mapping, maps to its template is
+    neither in the spec (with keys spec_keys) nor on the server (with ids in ids), so the spec is
+    rejected before anything is applied instead of the mapping failing partway through
+    """
+    mapped_entity = "results" if item["entity"] == "template_results" else "reports"
+    mapped_key = (mapped_entity, item[mapped_entity[:-1]])
+    if mapped_key not in spec_keys and mapped_key not in ids:
+        raise SpecError(
+            f"{__describe(item)} can't be created because {mapped_entity[:-1]} {mapped_key[1]} "
+            "is not in the spec and does not exist"
+        )
+
+
+def __diff_map(item, existing_maps, ids):
+    """
+    Returns the change needed to create the mapping described by item, or None if it already
+    exists.  Raises a SpecError if it exists with a different result_key
+    """
+    mapped_entity = "results" if item["entity"] == "template_results" else "reports"
+    mapped_name = item[mapped_entity[:-1]]
+    mapped_id = ids.get((mapped_entity, mapped_name))
+    for mapping in existing_maps.get((item["entity"], item["template"]), []):
+        if mapping.get(ENTITIES[mapped_entity]["id_key"]) != mapped_id:
+            continue
+        if item["entity"] == "template_results" and mapping.get("result_key") != item["result_key"]:
+            raise SpecError(
+                f"{__describe(item)} already exists with a different result_key, which can't be "
+                "changed"
+            )
+        return None
+    return dict(item, action="map")
+
+
+def __normalize(value):
+    """Returns value with missing values treated as empty strings, for comparisons"""
+    return "" if value is None else value
+
+
+def __apply_change(change, ids, created_by, force_upload):
+    """
+    Makes change, looking up the ids of the records it depends on in ids.  If force_upload is
+    True, local WDLs are uploaded even if they haven't changed
+
+    Returns
+    -------
+    A report for the change, with its description, its status (succeeded, failed or skipped),
+    the id of the record if it's a record, and an error message if it failed or was skipped
+    """
+    report = describe_change(change)
+    entity = change["entity"]
+    # Find the ids of everything this change depends on
+    dependencies = []
+    if change["action"] == "create" and change["parent"] is not None:
+        dependencies.append(change["parent"])
+    if change["action"] == "map":
+        mapped_entity = "results" if entity == "template_results" else "reports"
+        dependencies += [
+            ("templates", change["template"]),
+            (mapped_entity, change[mapped_entity[:-1]]),
+        ]
+    dependency_ids = []
+    for dependency in dependencies:
+        if dependency not in ids:
+            report["status"] = "skipped"
+            report["error"] = f"{dependency[0][:-1].capitalize()} {dependency[1]} was not created"
+            return report
+        dependency_ids.append(ids[dependency])
+    if change["action"] == "create":
+        response = __create(entity, change["name"], change["fields"], dependency_ids, created_by)
+    elif change["action"] == "update":
+        response = __update(entity, ids[(entity, change["name"])], change["fields"], force_upload)
+    elif entity == "template_results":
+        response = template_results.create_map(
+            dependency_ids[0], dependency_ids[1], change["result_key"], created_by
+        )
+    else:
+        response = template_reports.create_map(dependency_ids[0], dependency_ids[1], created_by)
+    if not isinstance(response, dict):
+        report["status"] = "failed"
+        report["error"] = output.format_result(response)
+        return report
+    report["status"] = "succeeded"
+    if entity in ENTITIES:
+        report["id"] = response.get(ENTITIES[entity]["id_key"], ids.get((entity, change["name"])))
+    return report
+
+
+def __create(entity, name, fields, parent_ids, created_by):
+    """Sends the request to create a record of type entity with name and fields"""
+    field = fields.get
+    if entity == "pipelines":
+        return pipelines.create(name, field("description", ""), created_by)
+    if entity == "results":
+        return results.create(
+            name, field("description", ""), field("result_type"), created_by
+        )
+    if entity == "reports":
+        return reports.create(
+            name,
+            field("description", ""),
+            field("notebook"),
+            field("config", ""),
+            created_by,
+        )
+    if entity == "templates":
+        return templates.create(
+            name,
+            parent_ids[0],
+            field("description", ""),
+            field("test_wdl"),
+            field("test_wdl_dependencies", ""),
+            field("eval_wdl"),
+            field("eval_wdl_dependencies", ""),
+            created_by,
+        )
+    return tests.create(
+        name,
+        parent_ids[0],
+        field("description", ""),
+        field("test_input_defaults", ""),
+        field("test_option_defaults", ""),
+        field("eval_input_defaults", ""),
+        field("eval_option_defaults", ""),
+        created_by,
+    )
+
+
+def __update(entity, id, fields, force_upload):
+    """
+    Sends the request to update the record of type entity with id, changing only fields (empty
+    values aren't sent, so everything else is left as it is).  force_upload is passed on to
+    templates.update
+    """
+    field = fields.get
+    if entity == "pipelines":
+        return pipelines.update(id, "", field("description", ""))
+    if entity == "results":
+        return results.update(id, "", field("description", ""))
+    if entity == "reports":
+        return reports.update(
+            id, "", field("description", ""), field("notebook", ""), field("config", "")
+        )
+    if entity == "templates":
+        return templates.update(
+            id,
+            "",
+            field("description", ""),
+            field("test_wdl", ""),
+            field("test_wdl_dependencies", ""),
+            field("eval_wdl", ""),
+            field("eval_wdl_dependencies", ""),
+            force_upload=force_upload,
+        )
+    return tests.update(
+        id,
+        "",
+        field("description", ""),
+        field("test_input_defaults", ""),
+        field("test_option_defaults", ""),
+        field("eval_input_defaults", ""),
+        field("eval_option_defaults", ""),
+    )
@@ -0,0 +1,222 @@
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import dependency_util, output
+from .rest import tests
+
+LOGGER = logging.getLogger(__name__)
+
+# The columns a manifest row may have.  test is required, the rest are optional
+MANIFEST_COLUMNS = (
+    "test",
+    "name",
+    "test_input",
+    "test_options",
+    "eval_input",
+    "eval_options",
+    "created_by",
+)
+
+# Columns that contain paths to json files that should be loaded and sent with the run
+JSON_FILE_COLUMNS = ("test_input", "test_options", "eval_input", "eval_options")
+
+
+class RateLimiter:
+    """
+    Limits the rate at which something happens across threads to at most rate times per second.
+    A rate of 0 or less means no limit
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until it's been long enough since the last call to acquire"""
+        if self.interval == 0.0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def read_manifest(filename):
+    """
+    Reads the run manifest in filename and returns its rows as a list of dicts, or logs an error
+    and exits if it can't be read.  Files ending in .csv are read as csv with a header row, and
+    any others are read as json lines, with one json object per line.  Relative paths to json
+    files in the manifest are resolved relative to the directory containing the manifest
+    """
+    try:
+        with open(filename, "r", newline="") as manifest_file:
+            if filename.lower().endswith(".csv"):
+                rows = [dict(row) for row in csv.DictReader(manifest_file)]
+            else:
+                rows = [json.loads(line) for line in manifest_file if line.strip()]
+    except FileNotFoundError:
+        LOGGER.error("Encountered FileNotFound error when trying to read %s", filename)
+        sys.exit(1)
+    except json.JSONDecodeError:
+        LOGGER.error("Encountered JSONDecodeError error when trying to read %s", filename)
+        sys.exit(1)
+    manifest_dir = os.path.dirname(os.path.abspath(filename))
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or not row.get("test"):
+            LOGGER.error("Row %i in manifest %s does not specify a test", index + 1, filename)
+            sys.exit(1)
+        unknown_columns = set(row) - set(MANIFEST_COLUMNS)
+        if unknown_columns:
+            LOGGER.error(
+                "Row %i in manifest %s has unrecognized columns: %s",
+                index + 1,
+                filename,
+                ", ".join(sorted(str(column) for column in unknown_columns)),
+            )
+            sys.exit(1)
+        for column in JSON_FILE_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str) and value != "":
+                row[column] = os.path.join(manifest_dir, value)
+    return rows
+
+
+def run_batch(rows, created_by, parallelism, rate_limit):
+    """
+    Starts a run for each of rows, the rows of a manifest returned by read_manifest.  Each
+    distinct test is resolved to its id only once and each json file is only read once, no
+    matter how many rows use them.  Runs are submitted concurrently
+
+    Parameters
+    ----------
+    rows - a list of dicts, each containing the test (id or name) to run and optionally the name,
+           json files (or, in json manifests, objects) for inputs and options, and created_by
+           for the run
+    created_by - the email to use for rows that don't specify created_by
+    parallelism - the maximum number of runs to submit at once
+    rate_limit - the maximum number of runs to submit per second, or 0 for no limit
+
+    Returns
+    -------
+    A list with a status report for each row, in the same order as rows
+    """
+    # Resolve each test and load each file once up front so the submissions don't repeat work
+    distinct_tests = list({row["test"] for row in rows})
+    test_ids = dict(
+        zip(
+            distinct_tests,
+            dependency_util.get_ids_from_ids_or_names(
+                [(test, tests, "test_id") for test in distinct_tests]
+            ),
+        )
+    )
+    json_files = {}
+    file_errors = {}
+    for row in rows:
+        for column in JSON_FILE_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str) and value != "" and value not in json_files:
+                json_files[value], file_errors[value] = __load_json_file(value)
+
+    rate_limiter = RateLimiter(rate_limit)
+
+    def submit(index_and_row):
+        index, row = index_and_row
+        return __submit_row(
+            index, row, test_ids, json_files, file_errors, created_by, rate_limiter
+        )
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        return list(executor.map(submit, enumerate(rows)))
+
+
+def __submit_row(index, row, test_ids, json_files, file_errors, created_by, rate_limiter):
+    """
+    Starts a run for row, the row at index in the manifest, and returns a status report for it
+
+    Parameters
+    ----------
+    index - the index of the row in the manifest
+    row - the row, as returned by read_manifest
+    test_ids - a dict mapping each test in the manifest to its id, or the RecordNotFoundError
+               encountered trying to find it
+    json_files - a dict mapping each json file in the manifest to its parsed contents
+    file_errors - a dict mapping each json file in the manifest to the error message encountered
+                  trying to load it, or None if it loaded successfully
+    created_by - the email to use if the row doesn't specify created_by
+    rate_limiter - a RateLimiter limiting how fast runs are submitted
+
+    Returns
+    -------
+    A dict with the row number, test, name, and status of the row, along with the run id if it
+    was submitted or an error message if it failed
+    """
+    report = {
+        "row": index + 1,
+        "test": row["test"],
+        "name": row.get("name") or "",
+    }
+    test_id = test_ids[row["test"]]
+    if isinstance(test_id, dependency_util.RecordNotFoundError):
+        return __failed_report(report, f"Failed to find test: {test_id.message}")
+    # Fill in the json for each input and options column
+    run_json = {}
+    for column in JSON_FILE_COLUMNS:
+        value = row.get(column)
+        if isinstance(value, str) and value != "":
+            if file_errors[value] is not None:
+                return __failed_report(report, file_errors[value])
+            value = json_files[value]
+        run_json[column] = value if value is not None else ""
+    rate_limiter.acquire()
+    result = tests.run(
+        test_id,
+        report["name"],
+        run_json["test_input"],
+        run_json["test_options"],
+        run_json["eval_input"],
+        run_json["eval_options"],
+        row.get("created_by") or created_by,
+    )
+    if not isinstance(result, dict) or "run_id" not in result:
+        return __failed_report(report, output.format_result(result))
+    report["status"] = "submitted"
+    report["run_id"] = result["run_id"]
+    if not report["name"]:
+        report["name"] = result.get("name", "")
+    return report
+
+
+def __failed_report(report, error):
+    """Fills in report to indicate its row failed with error and returns it"""
+    report["status"] = "failed"
+    report["error"] = error
+    return report
+
+
+def __load_json_file(filename):
+    """
+    Loads filename as json.  Unlike file_util.read_file_to_json, doesn't exit on failure, so one
+    bad file only fails the rows that use it
+
+    Returns
+    -------
+    A tuple of the parsed contents of filename (or None if it couldn't be loaded) and an error
+    message (or None if it loaded successfully)
+    """
+    try:
+        with open(filename, "r") as input_file:
+            return json.load(input_file), None
+    except OSError:
+        return None, f"Encountered an error when trying to read {filename}"
+    except json.JSONDecodeError:
+        return None, f"Encountered JSONDecodeError error when trying to read {filename}"
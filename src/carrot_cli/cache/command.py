@@ -0,0 +1,35 @@
+import logging
+
+import click
+
+from .. import wdl_util
+from ..rest import name_cache, response_cache, upload_manifest
+
+LOGGER = logging.getLogger(__name__)
+
+
+@click.group(name="cache")
+def main():
+    """Commands for managing data cached locally by carrot_cli"""
+
+
+@main.command(name="clear")
+@click.option(
+    "--entity",
+    type=click.Choice(sorted(set(name_cache.ID_KEYS) | set(response_cache.CACHED_ENTITIES))),
+    default=None,
+    help="The type of record to clear cached ids and records for.  Defaults to all types",
+)
+def clear(entity):
+    """
+    Clear the cached ids for names of records, the cached records, and the record of files
+    uploaded for templates on the current server.  Without --entity, also deletes built WDL
+    dependency zips
+    """
+    name_cache.clear(entity)
+    response_cache.clear(entity)
+    if entity in (None, "templates"):
+        upload_manifest.clear()
+    if entity is None:
+        wdl_util.clear_dependency_zips()
+    print("Success!")
@@ -1,13 +1,67 @@
-import json
+import importlib
 import logging
 import sys
+import types
 
 import click
 
+from . import output
 from .config import manager as config
+from .rest import request_handler
 
 LOGGER = logging.getLogger(__name__)
 
+
+class LazyGroup(click.Group):
+    """
+    A click Group that only imports the module for one of its sub-commands when that sub-command
+    is actually used, so invoking one command doesn't pay to import all the others
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Maps sub-command names to the names of the modules that define them as "main"
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(super().list_commands(ctx) + list(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return importlib.import_module(self.lazy_subcommands[cmd_name]).main
+        return super().get_command(ctx, cmd_name)
+
+
+def print_find_results(find_page, limit, offset, all_records, prefetch=1):
+    """
+    Calls find_page (a find function with every param but limit and offset already filled in)
+    with limit and offset and prints the results.  If all_records is true, instead prints all
+    the matching records starting at offset, fetching them in pages starting with a page of size
+    limit, with up to prefetch page requests in flight at once.  When printing all records or
+    printing in ndjson format, records are parsed and printed as they arrive.  Exits if all_records
+    is true and limit isn't positive, since there would be no way to move on to the next page
+    """
+    if all_records and limit < 1:
+        LOGGER.error("--limit must be at least 1 to retrieve all records with --all")
+        sys.exit(1)
+    if all_records:
+        # Stream each page so records are printed as they arrive
+        with request_handler.streaming():
+            output.print_records(
+                request_handler.paginate(find_page, limit, offset, prefetch)
+            )
+    elif output.get_output_format() == "ndjson":
+        # Each record gets its own line, so they can be printed as they arrive
+        with request_handler.streaming():
+            result = find_page(limit, offset)
+            if isinstance(result, types.GeneratorType):
+                output.print_records(result)
+            else:
+                output.print_result(result)
+    else:
+        output.print_result(find_page(limit, offset))
+
+
 def delete(id, yes, entity, entity_name):
     """
     Calls entity's delete function with id
@@ -18,11 +72,11 @@ def delete(id, yes, entity, entity_name):
     # they are not the creator
     if not yes:
         # Try to find the record by id
-        record = json.loads(entity.find_by_id(id))
+        record = entity.find_by_id(id)
         # If the returned record has a created_by field that does not match the user email, prompt the user to confirm
         # the delete
         user_email = config.load_var("email")
-        if "created_by" in record and record["created_by"] != user_email:
+        if isinstance(record, dict) and "created_by" in record and record["created_by"] != user_email:
             # If they decide not to delete, exit
             if not click.confirm(
                     f"{entity_name} with id {id} was created by {record['created_by']}. Are you sure you want to delete?"
@@ -30,7 +84,7 @@ def delete(id, yes, entity, entity_name):
                 LOGGER.info("Okay, aborting delete operation")
                 sys.exit(0)
 
-    print(entity.delete(id))
+    output.print_result(entity.delete(id))
 
 def delete_map(entity1_id, entity2_id, yes, map_entity, entity1_name, entity2_name):
     """
@@ -42,11 +96,11 @@ def delete_map(entity1_id, entity2_id, yes, map_entity, entity1_name, entity2_na
     # they are not the creator
     if not yes:
         # Try to find the record by id
-        record = json.loads(map_entity.find_map_by_ids(entity1_id, entity2_id))
+        record = map_entity.find_map_by_ids(entity1_id, entity2_id)
         # If the returned record has a created_by field that does not match the user email, prompt the user to confirm
         # the delete
         user_email = config.load_var("email")
-        if "created_by" in record and record["created_by"] != user_email:
+        if isinstance(record, dict) and "created_by" in record and record["created_by"] != user_email:
             # If they decide not to delete, exit
             if not click.confirm(
                     f"Mapping for {entity1_name} with id {entity1_id} and {entity2_name} with id {entity2_id} was "
@@ -55,4 +109,4 @@ def delete_map(entity1_id, entity2_id, yes, map_entity, entity1_name, entity2_na
                 LOGGER.info("Okay, aborting delete operation")
                 sys.exit(0)
 
-    print(map_entity.delete_map_by_ids(entity1_id, entity2_id))
+    output.print_result(map_entity.delete_map_by_ids(entity1_id, entity2_id))
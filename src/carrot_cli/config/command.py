@@ -26,6 +26,74 @@ def set_var(variable, value):
         The address of the CARROT server you'd like to connect to
     email
         Your email address, for provenance and notification purposes
+    connection_pool_size
+        The number of server connection pools to keep (default 10)
+    connection_pool_maxsize
+        The maximum number of connections to keep open to the server (default 10)
+    keep_alive
+        Whether to reuse connections to the server between requests (default true)
+    connect_timeout
+        How long, in seconds, to wait to connect to the server (default 10). Set
+        to 0 to wait indefinitely
+    read_timeout
+        How long, in seconds, to wait for the server to respond (default 300).
+        Set to 0 to wait indefinitely
+    max_retries
+        The number of times to retry GET, PUT and DELETE requests that fail with
+        a connection error, a timeout, or a 429, 502, 503 or 504 status
+        (default 3)
+    retry_backoff
+        How long, in seconds, to wait before the first retry, which doubles with
+        each retry, with random jitter (default 0.5)
+    max_retry_backoff
+        The maximum time, in seconds, to wait before a retry (default 30). If
+        the server asks us to wait longer, the request is not retried
+    rate_limit
+        The maximum number of requests per second to send to the server, shared
+        by all carrot_cli commands running on this machine (default 0, meaning
+        no limit)
+    rate_burst
+        The number of requests that can be sent at once before rate_limit
+        applies (defaults to rate_limit)
+    max_in_flight
+        The maximum number of requests to have waiting on the server at once,
+        shared by all carrot_cli commands running on this machine (default 0,
+        meaning no limit)
+    server_limits
+        A json object mapping server addresses to objects with any of
+        rate_limit, rate_burst and max_in_flight, to use different limits for
+        those servers, e.g. {"example.com:8080": {"rate_limit": 5}}
+    circuit_breaker_threshold
+        The number of requests in a row that can fail before carrot_cli stops
+        sending requests to the server for a while (default 5). Set to 0 to
+        always send requests
+    circuit_breaker_cooldown
+        How long, in seconds, to stop sending requests to the server after
+        circuit_breaker_threshold failures (default 30)
+    compress_requests
+        Whether to gzip large json request bodies, e.g. reports with big
+        notebooks (default false). Only turn this on if your server accepts
+        gzipped requests
+    compression_threshold
+        The minimum size, in bytes, of a json request body to gzip when
+        compress_requests is on (default 16384)
+    upload_progress
+        Whether to write the progress and speed of file uploads, e.g. WDL
+        dependency zips, to stderr (default false)
+    fast_logging
+        Whether to skip aligning module names in log messages, which speeds up
+        startup (default false)
+    name_cache_ttl
+        How long, in seconds, to remember the ids for names of records (default
+        3600). Set to 0 to always look them up
+    response_cache_ttl
+        How long, in seconds, to reuse records retrieved by id instead of
+        retrieving them again (default 3600). Finished runs are always reused.
+        Set to 0 to always retrieve other records
+
+    Any config variable can also be set with an environment variable named
+    CARROT_CLI_ followed by the upper-case variable name, which takes priority
+    over the value set here
     """
     # If the user tries to set a variable that isn't a valid config variable, print a message
     if variable not in manager.CONFIG_VARIABLES:
@@ -2,12 +2,44 @@ import json
 import logging
 import os
 import sys
+import threading
 
 LOGGER = logging.getLogger(__name__)
 
-CONFIG_VARIABLES = ["carrot_server_address", "email"]
+CONFIG_VARIABLES = [
+    "carrot_server_address",
+    "email",
+    "connection_pool_size",
+    "connection_pool_maxsize",
+    "keep_alive",
+    "connect_timeout",
+    "read_timeout",
+    "max_retries",
+    "retry_backoff",
+    "max_retry_backoff",
+    "rate_limit",
+    "rate_burst",
+    "max_in_flight",
+    "server_limits",
+    "circuit_breaker_threshold",
+    "circuit_breaker_cooldown",
+    "compress_requests",
+    "compression_threshold",
+    "upload_progress",
+    "fast_logging",
+    "name_cache_ttl",
+    "response_cache_ttl",
+]
 
+# Environment variables named with this prefix followed by the upper-case name of a config
+# variable take priority over the config file, e.g. CARROT_CLI_CARROT_SERVER_ADDRESS
+ENV_VAR_PREFIX = "CARROT_CLI_"
+
+# The config file is loaded once and cached here, along with the modification time and size of
+# the file when it was loaded, so we only reload it if it changes
 __CURRENT_CONFIG = {}
+__CURRENT_CONFIG_STAT = None
+__CONFIG_LOCK = threading.Lock()
 
 
 def create_config_dir_if_not_exists():
@@ -47,17 +79,48 @@ def load_var(var_name):
 
 
 def load_var_no_error(var_name):
-    """Returns specified variable from config file, or None if not set"""
-    # Open file and load as json
-    config_file_path = os.path.expanduser("~/.carrot_cli/config.json")
-    with open(config_file_path, "r") as config_file:
-        LOGGER.debug("Loading config variable %s", var_name)
-        config_json = json.load(config_file)
-        # Return variable value if it's set
-        if var_name in config_json:
-            return config_json[var_name]
-        LOGGER.debug("Config file did not contain variable %s", var_name)
-        return None
+    """
+    Returns specified variable from its environment variable if set, then from the config file, or
+    None if not set
+    """
+    env_value = os.environ.get(ENV_VAR_PREFIX + var_name.upper())
+    if env_value is not None:
+        LOGGER.debug("Loading config variable %s from environment", var_name)
+        return env_value
+    LOGGER.debug("Loading config variable %s", var_name)
+    config_json = __load_config()
+    # Return variable value if it's set
+    if var_name in config_json:
+        return config_json[var_name]
+    LOGGER.debug("Config file did not contain variable %s", var_name)
+    return None
+
+
+def load_var_with_default(var_name, default):
+    """
+    Returns specified variable from config file converted to the type of default, or default if
+    the variable is not set or its value cannot be converted to that type
+    """
+    value = load_var_no_error(var_name)
+    if value is None:
+        return default
+    try:
+        # bool("false") is True, so booleans need to be parsed by hand
+        if isinstance(default, bool):
+            if str(value).lower() in ("true", "yes", "1"):
+                return True
+            if str(value).lower() in ("false", "no", "0"):
+                return False
+            raise ValueError(f"{value} is not a boolean")
+        return type(default)(value)
+    except (TypeError, ValueError):
+        LOGGER.warning(
+            "Config variable %s has invalid value %s. Using default value %s",
+            var_name,
+            value,
+            default,
+        )
+        return default
 
 
 def set_var(var_name, val):
@@ -65,18 +128,61 @@ def set_var(var_name, val):
     LOGGER.debug("Setting config variable %s to %s", var_name, val)
     # Open file and load as json
     config_file_path = os.path.expanduser("~/.carrot_cli/config.json")
-    config_file = open(config_file_path, "r+")
-    config_json = json.load(config_file)
-    config_file.seek(0)
-    # Set var
-    config_json[var_name] = val
-    # Write back to file
-    json.dump(config_json, config_file, sort_keys=True, indent=4, ensure_ascii=False)
-    config_file.truncate()
+    with __CONFIG_LOCK:
+        with open(config_file_path, "r+") as config_file:
+            config_json = json.load(config_file)
+            config_file.seek(0)
+            # Set var
+            config_json[var_name] = val
+            # Write back to file
+            json.dump(
+                config_json, config_file, sort_keys=True, indent=4, ensure_ascii=False
+            )
+            config_file.truncate()
+        # Drop the cached config so the next load picks up the change
+        __clear_cached_config()
 
 
 def get_config():
-    # Open file and load as json
+    """Returns the current config, with any environment variable overrides applied, as json"""
+    config_json = dict(__load_config())
+    for var_name in CONFIG_VARIABLES:
+        env_value = os.environ.get(ENV_VAR_PREFIX + var_name.upper())
+        if env_value is not None:
+            config_json[var_name] = env_value
+    return json.dumps(config_json, indent=4, sort_keys=True)
+
+
+def __load_config():
+    """
+    Returns the contents of the config file as a dict, loading it from the file only if it hasn't
+    been loaded yet or has changed since it was last loaded
+
+    Returns
+    -------
+    A dict of the config variables in the config file, or an empty dict if there is no config file
+    """
+    global __CURRENT_CONFIG, __CURRENT_CONFIG_STAT
     config_file_path = os.path.expanduser("~/.carrot_cli/config.json")
-    with open(config_file_path, "r") as config_file:
-        return json.dumps(json.load(config_file), indent=4, sort_keys=True)
+    with __CONFIG_LOCK:
+        try:
+            file_stat = os.stat(config_file_path)
+        except FileNotFoundError:
+            LOGGER.debug("No config file found at %s", config_file_path)
+            __clear_cached_config()
+            return {}
+        # Use the modification time and size to check whether the file has changed
+        current_stat = (file_stat.st_mtime_ns, file_stat.st_size)
+        if current_stat != __CURRENT_CONFIG_STAT:
+            LOGGER.debug("Loading config file %s", config_file_path)
+            with open(config_file_path, "r") as config_file:
+                __CURRENT_CONFIG = json.load(config_file)
+            __CURRENT_CONFIG_STAT = current_stat
+        return __CURRENT_CONFIG
+
+
+def __clear_cached_config():
+    """Clears the cached config so it will be reloaded from the file next time it is needed"""
+    global __CURRENT_CONFIG, __CURRENT_CONFIG_STAT
+    __CURRENT_CONFIG = {}
+    __CURRENT_CONFIG_STAT = None
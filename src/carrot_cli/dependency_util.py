@@ -1,10 +1,16 @@
-import json
 import logging
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import output
+from .rest import name_cache
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of names to look up at once when resolving several
+MAX_RESOLVE_WORKERS = 8
+
 def get_id_from_id_or_name_and_handle_error(id_or_name, module, id_key, entity_name):
     """
     Convenience wrapper function for get_id_from_id_or_name that prints an error message and exits
@@ -32,6 +38,79 @@ def get_id_from_id_or_name_and_handle_error(id_or_name, module, id_key, entity_n
         LOGGER.error(f"Encountered an error processing value for {entity_name}: {e.message}")
         sys.exit(1)
 
+def get_ids_from_ids_or_names_and_handle_error(lookups):
+    """
+    Convenience wrapper function for get_ids_from_ids_or_names that prints an error message for
+    each value that couldn't be processed and exits if there were any
+
+    Parameters
+    ----------
+    lookups - a list of (id_or_name, module, id_key, entity_name) tuples, with the values to pass
+              to get_id_from_id_or_name_and_handle_error for each record
+
+    Returns
+    -------
+    A list of the ids for lookups, in the same order
+    """
+    ids = get_ids_from_ids_or_names([lookup[:3] for lookup in lookups])
+    failed = False
+    for (id_or_name, module, id_key, entity_name), id in zip(lookups, ids):
+        if isinstance(id, RecordNotFoundError):
+            LOGGER.debug(
+                f"Encountered RecordNotFoundError when running get_id_from_id_or_name with params:"
+                f"id_or_name: {id_or_name}, module: {module.__name__}, id_key: {id_key}, error: {id.message}"
+            )
+            LOGGER.error(f"Encountered an error processing value for {entity_name}: {id.message}")
+            failed = True
+    if failed:
+        sys.exit(1)
+    return ids
+
+def get_ids_from_ids_or_names(lookups):
+    """
+    Batch version of get_id_from_id_or_name.  Each distinct value is only processed once, and
+    names are looked up concurrently, so resolving several names takes about as long as resolving
+    one.  Empty values (for optional arguments) are returned as is
+
+    Parameters
+    ----------
+    lookups - a list of (id_or_name, module, id_key) tuples, with the values to pass to
+              get_id_from_id_or_name for each record
+
+    Returns
+    -------
+    A list with the id for each of lookups, in the same order, or the RecordNotFoundError
+    encountered trying to find it
+    """
+    def resolve(lookup):
+        try:
+            return get_id_from_id_or_name(*lookup)
+        except RecordNotFoundError as e:
+            return e
+
+    resolved = {}
+    names = []
+    for lookup in set(lookups):
+        if lookup[0] == "" or __is_uuid(lookup[0]):
+            resolved[lookup] = lookup[0]
+        else:
+            names.append(lookup)
+    # Only bother with threads if there's more than one request to make
+    if len(names) == 1:
+        resolved[names[0]] = resolve(names[0])
+    elif names:
+        with ThreadPoolExecutor(max_workers=min(MAX_RESOLVE_WORKERS, len(names))) as executor:
+            resolved.update(zip(names, executor.map(resolve, names)))
+    return [resolved[lookup] for lookup in lookups]
+
+def __is_uuid(value):
+    """Returns True if value is a valid UUID"""
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
 def get_id_from_id_or_name(id_or_name, module, id_key):
     """
     Checks if id_or_name is a UUID.  If it is, returns it.  If not, assumes it is a name of a
@@ -66,7 +145,8 @@ def find_id_by_name(name, module, id_key):
     """
     Accepts the name of a record and the module corresponding to the type of record and attempts to
     retrieve a record using module.find with the name and return the uuid.  If the record is not
-    found, raises a RecordNotFoundError
+    found, raises a RecordNotFoundError.  Ids are cached by name using name_cache, so if this name
+    was looked up recently, returns the cached id without making a request
 
     Parameters
     ----------
@@ -78,32 +158,36 @@ def find_id_by_name(name, module, id_key):
     -------
     If a record is found, returns the UUID for that record.  If not, raises a RecordNotFoundError
     """
+    # The type of entity is the last part of the rest module's name, e.g. pipelines
+    entity = module.__name__.rpartition(".")[2]
+    # Check if we've already looked up this name recently
+    cached_id = name_cache.get(entity, name)
+    if cached_id is not None:
+        return cached_id
     # Use module.find to try to get a record with that name
     # Note: we're limiting to 2 because names are unique, so if we get 2 or more records, we'll
     # consider that a failure
-    record = module.find(name=name, limit=2)
-    # Try to load it into a dict so we can parse it
-    try:
-        record_as_json = json.loads(record)
-    except json.JSONDecodeError:
-        # If that failed, raise an error
-        raise RecordNotFoundError(record)
-    # If it loaded as anything other than an array, that's an error because the expected output
-    # of find is an array of results
-    if not isinstance(record_as_json, list):
-        raise RecordNotFoundError(record)
-    # If it's an array but has anything other than exactly one element, raise an error
-    if not len(record_as_json) == 1:
+    records = module.find(name=name, limit=2)
+    # If it's anything other than a list, that's an error because the expected output of find is
+    # a list of results
+    if not isinstance(records, list):
+        raise RecordNotFoundError(output.format_result(records))
+    # If it's a list but has anything other than exactly one element, raise an error
+    if not len(records) == 1:
         raise RecordNotFoundError(
-            f"Attempt to retrieve record by name produced unexpected result: {record}"
+            f"Attempt to retrieve record by name produced unexpected result: "
+            f"{output.format_result(records)}"
         )
     # Now try to get the id
-    if id_key in record_as_json[0]:
-        return record_as_json[0][id_key]
+    if id_key in records[0]:
+        # Cache it so we don't have to look it up next time
+        name_cache.put(entity, name, records[0][id_key])
+        return records[0][id_key]
     else:
         # If we didn't find it, raise an error
         raise RecordNotFoundError(
-            f"Attempt to retrieve {id_key} by name failed with record: {record}"
+            f"Attempt to retrieve {id_key} by name failed with record: "
+            f"{output.format_result(records)}"
         )
 
 
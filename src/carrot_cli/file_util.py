@@ -1,9 +1,16 @@
+import contextlib
+import hashlib
 import json
 import logging
+import os
 import sys
+import threading
 
 LOGGER = logging.getLogger(__name__)
 
+# Size of the chunks files are read in when hashing them
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 def read_file_to_json(filename):
     """
@@ -28,3 +35,56 @@ def read_file_to_json(filename):
             sys.exit(1)
     else:
         return ""
+
+
+def hash_file(path):
+    """
+    Returns the hex sha256 digest of the contents of the file at path, reading it in chunks so
+    large files aren't loaded into memory.  Raises an OSError if the file can't be read
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def atomic_write_path(path):
+    """
+    Context manager that gives a temporary path to write a file to, and moves the file to path
+    when the block finishes, so other processes never see a partially written file.  Creates the
+    directory containing path if it doesn't exist.  If the block raises, the temporary file is
+    removed and path is left as it was
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def load_json(path, default=None):
+    """
+    Returns the contents of the json file at path, or default if it doesn't exist or can't be
+    read or parsed
+    """
+    try:
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, value):
+    """
+    Writes value to the json file at path, atomically (see atomic_write_path).  Raises an OSError
+    if it can't be written
+    """
+    with atomic_write_path(path) as temp_path:
+        with open(temp_path, "w") as json_file:
+            json.dump(value, json_file)
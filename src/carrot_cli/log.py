@@ -1,14 +1,29 @@
+import json
 import logging
+import os
 import pkgutil
 from pathlib import Path
 
+# The computed format string is cached here, keyed by carrot_cli version and install location, so
+# we only have to walk the package to compute it once per install
+LOG_FORMAT_CACHE_PATH = "~/.carrot_cli/log_format_cache.json"
 
-def configure_logging(verbosity):
+# Format string that doesn't require knowing the names of all the modules in the package
+FAST_FORMAT_STRING = "%(asctime)s %(name)s %(levelname)-8s %(message)s"
+
+
+def configure_logging(verbosity, version=""):
     """Set up logging for the carrot_cli module"""
 
     import carrot_cli  # pylint: disable=C0415
 
-    format_string = get_logging_format_string(carrot_cli)
+    from .config import manager as config  # pylint: disable=C0415
+
+    # If fast logging is on, skip computing the column width for module names entirely
+    if config.load_var_with_default("fast_logging", False):
+        format_string = FAST_FORMAT_STRING
+    else:
+        format_string = get_cached_logging_format_string(carrot_cli, version)
 
     # Set logging level:
     log_level = logging.INFO
@@ -19,6 +34,33 @@ def configure_logging(verbosity):
     logging.basicConfig(level=log_level, format=format_string)
 
 
+def get_cached_logging_format_string(package, version):
+    """Get format string for all loggers
+    Returns the format string from the cache file if it was cached for this version and location
+    of package.  Otherwise, computes it with get_logging_format_string and caches it.
+    """
+    cache_path = os.path.expanduser(LOG_FORMAT_CACHE_PATH)
+    cache_key = f"{version}:{package.__path__[0]}"
+    # Use the cached format string if there is one for this install
+    try:
+        with open(cache_path, "r") as cache_file:
+            cache = json.load(cache_file)
+        if cache.get("key") == cache_key:
+            return cache["format_string"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        # Missing or malformed cache, so we'll just compute it again
+        pass
+    format_string = get_logging_format_string(package)
+    # Failing to write the cache shouldn't stop us from running, so ignore any errors
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w") as cache_file:
+            json.dump({"key": cache_key, "format_string": format_string}, cache_file)
+    except OSError:
+        pass
+    return format_string
+
+
 def get_logging_format_string(package):
     """Get format string for all loggers
     Discovers all modules to determine the space needed to
@@ -46,9 +88,11 @@ def get_dot_separated_submodule_names(package):
 
 def get_package_paths(paths):
     """Recursively walk through all child packages of paths
+    Uses iter_modules rather than walk_packages since we do the recursion ourselves, and
+    walk_packages imports every package it finds
     returns: iterator of ModuleInfo objects
     """
-    child_packages = pkgutil.walk_packages(paths)
+    child_packages = pkgutil.iter_modules(paths)
     for child in child_packages:
         if child.ispkg:
             yield from get_package_paths(
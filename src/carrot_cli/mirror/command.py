@@ -0,0 +1,155 @@
+import logging
+import sys
+
+import click
+
+from .. import output
+from . import database
+
+LOGGER = logging.getLogger(__name__)
+
+
+@click.group(name="mirror")
+def main():
+    """
+    Commands for keeping a local copy of the records on the current server and searching it
+    without sending requests to the server
+    """
+
+
+@main.command(name="sync")
+@click.option(
+    "--full",
+    is_flag=True,
+    default=False,
+    help="Retrieve all records instead of only those created (or, for runs, finished) since the "
+    "last sync",
+)
+def sync(full):
+    """
+    Copy pipelines, templates, tests, results, reports and runs from the current server into the
+    local mirror.  After the first sync, only retrieves new records.  Note that changes to
+    existing records (other than runs finishing) are only picked up with --full
+    """
+    connection = database.connect()
+    try:
+        output.print_result(database.sync(connection, full))
+    finally:
+        connection.close()
+
+
+@main.command(name="query")
+@click.argument("entity", type=click.Choice(sorted(database.ENTITIES)))
+@click.option("--id", "id_", default="", help="The record's ID")
+@click.option("--name", default="", help="The name of the record, case-sensitive")
+@click.option("--description", default="", help="The description of the record, case-sensitive")
+@click.option("--pipeline_id", default="", help="For templates and runs, the pipeline's ID")
+@click.option("--template_id", default="", help="For tests and runs, the template's ID")
+@click.option("--test_id", default="", help="For runs, the test's ID")
+@click.option("--status", default="", help="For runs, the status of the run")
+@click.option("--result_type", default="", help="For results, the type of the result")
+@click.option("--created_by", default="", help="Email of the creator of the record, case sensitive")
+@click.option(
+    "--created_before",
+    default="",
+    help="Upper bound for the record's created_at value, in the format YYYY-MM-DDThh:mm:ss.ssssss",
+)
+@click.option(
+    "--created_after",
+    default="",
+    help="Lower bound for the record's created_at value, in the format YYYY-MM-DDThh:mm:ss.ssssss",
+)
+@click.option(
+    "--finished_before",
+    default="",
+    help="For runs, upper bound for the run's finished_at value, in the format "
+    "YYYY-MM-DDThh:mm:ss.ssssss",
+)
+@click.option(
+    "--finished_after",
+    default="",
+    help="For runs, lower bound for the run's finished_at value, in the format "
+    "YYYY-MM-DDThh:mm:ss.ssssss",
+)
+@click.option(
+    "--sort",
+    default="",
+    help="A comma-separated list of sort keys, enclosed in asc() for ascending or desc() for "
+    "descending.  Ex. asc(name),desc(created_at)",
+)
+@click.option(
+    "--limit",
+    default=20,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="The maximum number of records to return",
+)
+@click.option(
+    "--offset",
+    default=0,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="The offset to start at within the list of records to return.  Ex. Sorting by "
+    "asc(created_at) with offset=1 would return records sorted by when they were created "
+    "starting from the second record to be created",
+)
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching records, starting at --offset, instead of at most --limit of them",
+)
+def query(
+    entity,
+    id_,
+    name,
+    description,
+    pipeline_id,
+    template_id,
+    test_id,
+    status,
+    result_type,
+    created_by,
+    created_before,
+    created_after,
+    finished_before,
+    finished_after,
+    sort,
+    limit,
+    offset,
+    all_records,
+):
+    """
+    Retrieve records of type ENTITY from the local mirror, filtered to match the specified
+    parameters.  Run mirror sync first to bring the mirror up to date
+    """
+    filters = {
+        "name": name,
+        "description": description,
+        "pipeline_id": pipeline_id,
+        "template_id": template_id,
+        "test_id": test_id,
+        "status": status,
+        "result_type": result_type,
+        "created_by": created_by,
+        "created_before": created_before,
+        "created_after": created_after,
+        "finished_before": finished_before,
+        "finished_after": finished_after,
+    }
+    # For pipelines, templates and tests, the id key is also one of the parent id options, so it's
+    # set afterwards, and only if --id is specified, so neither overwrites the other when empty
+    if id_:
+        filters[database.ENTITIES[entity]["id_key"]] = id_
+    connection = database.connect()
+    try:
+        records = database.query(
+            connection, entity, filters, sort, None if all_records else limit, offset
+        )
+    except ValueError as e:
+        LOGGER.error(str(e))
+        sys.exit(1)
+    finally:
+        connection.close()
+    output.print_result(records)
@@ -0,0 +1,381 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import urllib.parse
+
+from .. import output
+from ..config import manager as config
+from ..rest import (
+    pipelines,
+    reports,
+    request_handler,
+    results,
+    runs,
+    templates,
+    tests,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Mirrors are stored in this directory, with one database file per server
+MIRROR_DIR = "~/.carrot_cli/mirror"
+
+# Number of records to request in the first page when syncing
+SYNC_PAGE_SIZE = 500
+
+# For each type of entity, the rest module for finding it, the key for its id, and the fields
+# stored in their own (indexed where useful) columns so they can be queried.  Every record is also
+# stored in full as json
+ENTITIES = {
+    "pipelines": {
+        "module": pipelines,
+        "id_key": "pipeline_id",
+        "columns": ("name", "description", "created_by", "created_at"),
+    },
+    "templates": {
+        "module": templates,
+        "id_key": "template_id",
+        "columns": (
+            "pipeline_id",
+            "name",
+            "description",
+            "test_wdl",
+            "eval_wdl",
+            "created_by",
+            "created_at",
+        ),
+    },
+    "tests": {
+        "module": tests,
+        "id_key": "test_id",
+        "columns": ("template_id", "name", "description", "created_by", "created_at"),
+    },
+    "results": {
+        "module": results,
+        "id_key": "result_id",
+        "columns": ("name", "description", "result_type", "created_by", "created_at"),
+    },
+    "reports": {
+        "module": reports,
+        "id_key": "report_id",
+        "columns": ("name", "description", "created_by", "created_at"),
+    },
+    "runs": {
+        "module": runs,
+        "id_key": "run_id",
+        "columns": (
+            "test_id",
+            "name",
+            "status",
+            "test_cromwell_job_id",
+            "eval_cromwell_job_id",
+            "created_by",
+            "created_at",
+            "finished_at",
+        ),
+    },
+}
+
+# Columns to index in each table, if the table has them
+INDEXED_COLUMNS = (
+    "name",
+    "status",
+    "created_at",
+    "finished_at",
+    "pipeline_id",
+    "template_id",
+    "test_id",
+)
+
+# Filters for runs on their test's template or pipeline, which aren't columns on the runs table
+RUN_PARENT_FILTERS = {
+    "template_id": "test_id IN (SELECT id FROM tests WHERE template_id = ?)",
+    "pipeline_id": "test_id IN (SELECT id FROM tests WHERE template_id IN "
+    "(SELECT id FROM templates WHERE pipeline_id = ?))",
+}
+
+# Range filters, which map to a comparison on a timestamp column
+RANGE_FILTERS = {
+    "created_before": ("created_at", "<"),
+    "created_after": ("created_at", ">"),
+    "finished_before": ("finished_at", "<"),
+    "finished_after": ("finished_at", ">"),
+}
+
+# Pattern for one key in a sort param, e.g. asc(name)
+SORT_KEY_PATTERN = re.compile(r"^(asc|desc)\((\w+)\)$")
+
+
+def connect():
+    """
+    Opens the mirror database for the current server, creating it if it doesn't exist, or logs an
+    error and exits if there is no server address configured or the database can't be opened
+
+    Returns
+    -------
+    An sqlite3 Connection to the database
+    """
+    server_address = config.load_var("carrot_server_address")
+    mirror_dir = os.path.expanduser(MIRROR_DIR)
+    path = os.path.join(mirror_dir, urllib.parse.quote(server_address, safe="") + ".sqlite")
+    try:
+        os.makedirs(mirror_dir, exist_ok=True)
+        connection = sqlite3.connect(path)
+        __create_schema(connection)
+    except (OSError, sqlite3.Error) as e:
+        LOGGER.error("Failed to open mirror database at %s: %s", path, e)
+        sys.exit(1)
+    return connection
+
+
+def sync(connection, full=False):
+    """
+    Pulls records from the server into the mirror.  Unless full is true, only requests records
+    created since the last sync, along with runs that finished since the last sync
+
+    Parameters
+    ----------
+    connection - an sqlite3 Connection, as returned by connect
+    full - if true, requests all records instead of only new ones
+
+    Returns
+    -------
+    A dict mapping each type of entity to the number of records added or updated
+    """
+    counts = {}
+    for entity in ENTITIES:
+        if entity == "runs":
+            continue
+        created_after = "" if full else __get_watermark(connection, entity, "created_at")
+
+        def find_page(limit, offset, module=ENTITIES[entity]["module"], after=created_after):
+            return module.find(
+                created_after=after, sort="asc(created_at)", limit=limit, offset=offset
+            )
+
+        counts[entity] = __store(connection, entity, __fetch_all(find_page))
+    counts["runs"] = __sync_runs(connection, full)
+    return counts
+
+
+def query(connection, entity, filters, sort="", limit=None, offset=0):
+    """
+    Finds records of type entity in the mirror matching filters
+
+    Parameters
+    ----------
+    connection - an sqlite3 Connection, as returned by connect
+    entity - the type of record to find, one of the keys of ENTITIES
+    filters - a dict mapping filter names to values.  Each filter is a column of the entity
+              (matched exactly), its id_key, one of RANGE_FILTERS, or, for runs, one of
+              RUN_PARENT_FILTERS.  Empty values are ignored
+    sort - a comma-separated list of sort keys, enclosed in asc() or desc(), as for find
+    limit - the maximum number of records to return, or None for no limit
+    offset - the number of matching records to skip
+
+    Returns
+    -------
+    A list of the matching records.  Raises a ValueError if any filters or sort keys are invalid
+    """
+    columns = ENTITIES[entity]["columns"]
+    id_key = ENTITIES[entity]["id_key"]
+    conditions = []
+    params = []
+    for key, value in filters.items():
+        if value is None or value == "":
+            continue
+        if key == id_key:
+            conditions.append("id = ?")
+        elif key in RANGE_FILTERS and RANGE_FILTERS[key][0] in columns:
+            column, operator = RANGE_FILTERS[key]
+            conditions.append(f"{column} {operator} ?")
+        elif key in columns:
+            conditions.append(f"{key} = ?")
+        elif entity == "runs" and key in RUN_PARENT_FILTERS:
+            conditions.append(RUN_PARENT_FILTERS[key])
+        else:
+            raise ValueError(f"Cannot filter {entity} by {key}")
+        params.append(value)
+    sql = f"SELECT record FROM {entity}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + __order_by(sort, columns, id_key)
+    # sqlite requires a limit if there's an offset, and treats a negative limit as no limit
+    sql += " LIMIT ? OFFSET ?"
+    params += [-1 if limit is None else limit, offset]
+    return [json.loads(row[0]) for row in connection.execute(sql, params)]
+
+
+def __create_schema(connection):
+    """Creates the tables and indexes for the mirror if they don't already exist"""
+    with connection:
+        for entity, info in ENTITIES.items():
+            column_defs = ", ".join(f"{column} TEXT" for column in info["columns"])
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {entity} "
+                f"(id TEXT PRIMARY KEY, {column_defs}, record TEXT NOT NULL)"
+            )
+            for column in INDEXED_COLUMNS:
+                if column in info["columns"]:
+                    connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {entity}_{column} ON {entity} ({column})"
+                    )
+        # Tracks the latest timestamps we've synced up to
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks "
+            "(entity TEXT, column TEXT, value TEXT, PRIMARY KEY (entity, column))"
+        )
+
+
+def __sync_runs(connection, full):
+    """
+    Pulls runs from the server into the mirror, by pipeline since runs can only be found by their
+    parent.  Unless full is true, only requests runs created or finished since the last sync of
+    each pipeline's runs.  The watermarks are kept per pipeline so that, if a sync fails partway
+    through, runs for the pipelines it didn't get to are still requested next time
+
+    Returns
+    -------
+    The number of runs added or updated
+    """
+    count = 0
+    pipeline_ids = [row[0] for row in connection.execute("SELECT id FROM pipelines")]
+    for pipeline_id in pipeline_ids:
+        watermark_key = f"runs:{pipeline_id}"
+        created_after = "" if full else __get_watermark(connection, watermark_key, "created_at")
+        finished_after = "" if full else __get_watermark(connection, watermark_key, "finished_at")
+        # On an incremental sync, runs that were created earlier but have since finished need to
+        # be requested separately, since they won't come back in the created_after query
+        filters = [{"created_after": created_after}]
+        if finished_after != "":
+            filters.append({"finished_after": finished_after})
+        for run_filters in filters:
+
+            def find_page(limit, offset, pipeline_id=pipeline_id, run_filters=run_filters):
+                return runs.find(
+                    parent_entity="pipelines",
+                    parent_entity_id=pipeline_id,
+                    sort="asc(created_at)",
+                    limit=limit,
+                    offset=offset,
+                    **run_filters,
+                )
+
+            count += __store(connection, "runs", __fetch_all(find_page), watermark_key)
+    return count
+
+
+def __fetch_all(find_page):
+    """
+    Generator that retrieves all the records from find_page, like request_handler.paginate, but
+    treats a 404 as there being no records.  Logs an error and exits if a request fails
+    """
+    try:
+        yield from request_handler.paginate(find_page, SYNC_PAGE_SIZE)
+    except request_handler.PaginationError as e:
+        # The server returns a 404 if there aren't any matching records
+        if isinstance(e.response, request_handler.ErrorResponse) and e.response.status == 404:
+            return
+        LOGGER.error("Failed to sync records: %s", output.format_result(e.response))
+        sys.exit(1)
+
+
+def __store(connection, entity, records, watermark_key=None):
+    """
+    Inserts or replaces records of type entity in the mirror and advances the watermarks stored
+    under watermark_key (entity by default) to the latest timestamps among them
+
+    Returns
+    -------
+    The number of records stored
+    """
+    info = ENTITIES[entity]
+    columns = info["columns"]
+    sql = (
+        f"INSERT OR REPLACE INTO {entity} (id, {', '.join(columns)}, record) "
+        f"VALUES ({', '.join('?' for _ in range(len(columns) + 2))})"
+    )
+    watermark_key = watermark_key or entity
+    count = 0
+    latest = {}
+    with connection:
+        for record in records:
+            connection.execute(
+                sql,
+                [record[info["id_key"]]]
+                + [__column_value(record.get(column)) for column in columns]
+                + [json.dumps(record)],
+            )
+            count += 1
+            for column in ("created_at", "finished_at"):
+                value = record.get(column)
+                if value and value > latest.get(column, ""):
+                    latest[column] = value
+        for column, value in latest.items():
+            if value > __get_stored_watermark(connection, watermark_key, column):
+                connection.execute(
+                    "INSERT OR REPLACE INTO watermarks (entity, column, value) VALUES (?, ?, ?)",
+                    (watermark_key, column, value),
+                )
+    return count
+
+
+def __get_watermark(connection, entity, column):
+    """
+    Returns a timestamp just before the latest value of column that has been synced for entity,
+    for use as a created_after or finished_after filter, or an empty string if nothing has been
+    synced
+    """
+    value = __get_stored_watermark(connection, entity, column)
+    if value == "":
+        return ""
+    # Back up a second in case the filter doesn't include records at exactly that time.  We
+    # replace records we've already stored, so getting them again is harmless
+    try:
+        watermark = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+    except ValueError:
+        return value
+    return (watermark - datetime.timedelta(seconds=1)).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def __get_stored_watermark(connection, entity, column):
+    """
+    Returns the latest value of column that has been synced for entity, or an empty string if
+    nothing has been synced
+    """
+    row = connection.execute(
+        "SELECT value FROM watermarks WHERE entity = ? AND column = ?", (entity, column)
+    ).fetchone()
+    return "" if row is None else row[0]
+
+
+def __column_value(value):
+    """Returns value in a form that can be stored in a TEXT column"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def __order_by(sort, columns, id_key):
+    """
+    Converts sort, a comma-separated list of sort keys like asc(name),desc(created_at), to an sql
+    ORDER BY clause, or raises a ValueError if any of the keys are invalid.  Defaults to sorting
+    by created_at
+    """
+    order_by = []
+    for key in filter(None, sort.split(",")):
+        match = SORT_KEY_PATTERN.match(key.strip())
+        if match is None:
+            raise ValueError(f"Invalid sort key: {key}")
+        direction, column = match.groups()
+        if column == id_key:
+            column = "id"
+        elif column not in columns:
+            raise ValueError(f"Cannot sort by {column}")
+        order_by.append(f"{column} {direction.upper()}")
+    # Always end with the id so the order is deterministic
+    return ", ".join(order_by + ["created_at ASC", "id ASC"])
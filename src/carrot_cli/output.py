@@ -0,0 +1,121 @@
+import json
+import logging
+import sys
+import textwrap
+
+from .rest.request_handler import ErrorResponse, PaginationError
+
+LOGGER = logging.getLogger(__name__)
+
+# Ways json output can be formatted: indented with sorted keys, on one line with no extra
+# whitespace, or on one line per record
+OUTPUT_FORMATS = ("pretty", "compact", "ndjson")
+
+# The format used for output, set via the --output option
+__OUTPUT_FORMAT = "pretty"
+
+
+def set_output_format(output_format):
+    """Sets the format for output to output_format, which should be one of OUTPUT_FORMATS"""
+    global __OUTPUT_FORMAT
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    __OUTPUT_FORMAT = output_format
+
+
+def get_output_format():
+    """Returns the format currently used for output"""
+    return __OUTPUT_FORMAT
+
+
+def format_result(result):
+    """
+    Formats result, the value returned by one of the functions in the rest package, as a string for
+    printing: records are printed as pretty json, and errors as their message or body
+    """
+    # Strings are already formatted messages
+    if isinstance(result, str):
+        return result
+    if isinstance(result, ErrorResponse):
+        return __format_error(result)
+    if __OUTPUT_FORMAT == "ndjson" and isinstance(result, list):
+        return "\n".join(__dumps(record) for record in result)
+    return __dumps(result)
+
+
+def print_result(result):
+    """Prints result, the value returned by one of the functions in the rest package"""
+    print(format_result(result))
+
+
+def print_event(event):
+    """
+    Prints event, a dict describing something that happened, as compact json on its own line and
+    flushes it immediately, so events can be consumed as an ndjson stream as they happen
+    """
+    print(json.dumps(event, separators=(",", ":")), flush=True)
+
+
+def print_records(records):
+    """
+    Prints records, an iterable of records such as the generator returned by
+    request_handler.paginate, as a json array (or one record per line in ndjson format),
+    printing each record as soon as it is available.  If retrieving records fails before any are
+    printed, prints the error.  If it fails partway through, closes the array, logs the error and
+    exits
+    """
+    if __OUTPUT_FORMAT == "ndjson":
+        start, separator, end = "", "\n", "\n"
+    elif __OUTPUT_FORMAT == "compact":
+        start, separator, end = "[", ",", "]\n"
+    else:
+        start, separator, end = "[\n", ",\n", "\n]\n"
+    printed_any = False
+    try:
+        for record in records:
+            formatted = __dumps(record)
+            if __OUTPUT_FORMAT == "pretty":
+                # Indent each record to match how it would look in a pretty-printed array
+                formatted = textwrap.indent(formatted, "    ")
+            print(separator if printed_any else start, end="")
+            print(formatted, end="", flush=True)
+            printed_any = True
+    except PaginationError as e:
+        if not printed_any:
+            print_result(e.response)
+            return
+        print(end, end="")
+        LOGGER.error("Failed to retrieve all records: %s", format_result(e.response))
+        sys.exit(1)
+    if printed_any:
+        print(end, end="")
+    elif __OUTPUT_FORMAT != "ndjson":
+        print("[]")
+
+
+def __dumps(value):
+    """Serializes value as json in the current output format"""
+    if __OUTPUT_FORMAT == "pretty":
+        return json.dumps(value, indent=4, sort_keys=True)
+    # Skipping indentation and sorting keeps compact output small and fast to produce
+    return json.dumps(value, separators=(",", ":"))
+
+
+def __format_error(error):
+    """
+    Formats error as a string for printing
+
+    Parameters
+    ----------
+    error - An ErrorResponse
+
+    Returns
+    -------
+    The error's message if it has one, its json body if it has one, or otherwise a json object
+    with its status and text
+    """
+    if error.message is not None:
+        return error.message
+    if error.body is not None:
+        return __dumps(error.body)
+    return __dumps({"Status": error.status, "Body": error.text})
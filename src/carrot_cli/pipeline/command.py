@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import sys
@@ -7,6 +8,7 @@ import click
 from .. import command_util
 from .. import dependency_util
 from .. import file_util
+from .. import output
 from ..config import manager as config
 from ..rest import pipelines, runs
 
@@ -22,7 +24,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a pipeline by its ID"""
-    print(pipelines.find_by_id(id))
+    output.print_result(pipelines.find_by_id(id))
 
 
 @main.command(name="find")
@@ -66,6 +68,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching pipeline records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     pipeline_id,
     name,
@@ -76,21 +86,21 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve pipelines filtered to match the specified parameters"""
-    print(
-        pipelines.find(
-            pipeline_id,
-            name,
-            description,
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        pipelines.find,
+        pipeline_id,
+        name,
+        description,
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -114,7 +124,7 @@ def create(name, description, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    print(pipelines.create(name, description, created_by))
+    output.print_result(pipelines.create(name, description, created_by))
 
 
 @main.command(name="update")
@@ -125,7 +135,7 @@ def update(pipeline, name, description):
     """Update pipeline specified by PIPELINE (id or name) with the specified parameters"""
     # Process pipeline to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
-    print(pipelines.update(id, name, description))
+    output.print_result(pipelines.update(id, name, description))
 
 
 @main.command(name="delete")
@@ -225,6 +235,22 @@ def delete(pipeline, yes):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching run records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
+@click.option(
+    "--prefetch",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="With --all, the number of pages to request in parallel.  Pages are all --limit "
+    "records long, and are still printed in order",
+)
 def find_runs(
     pipeline,
     name,
@@ -243,6 +269,8 @@ def find_runs(
     sort,
     limit,
     offset,
+    all_records,
+    prefetch,
 ):
     """
     Retrieve runs related to the pipeline specified by PIPELINE (id or name), filtered by the
@@ -255,27 +283,28 @@ def find_runs(
     eval_options = file_util.read_file_to_json(eval_options)
     # Process pipeline to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
-    print(
-        runs.find(
-            "pipelines",
-            id,
-            name,
-            status,
-            test_input,
-            test_options,
-            eval_input,
-            eval_options,
-            test_cromwell_job_id,
-            eval_cromwell_job_id,
-            created_before,
-            created_after,
-            created_by,
-            finished_before,
-            finished_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        runs.find,
+        "pipelines",
+        id,
+        name,
+        status,
+        test_input,
+        test_options,
+        eval_input,
+        eval_options,
+        test_cromwell_job_id,
+        eval_cromwell_job_id,
+        created_before,
+        created_after,
+        created_by,
+        finished_before,
+        finished_after,
+        sort,
+    )
+    command_util.print_find_results(
+        find_page, limit, offset, all_records, prefetch
     )
 
 
@@ -303,7 +332,7 @@ def subscribe(pipeline, email):
             sys.exit(1)
     # Process pipeline to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
-    print(pipelines.subscribe(id, email))
+    output.print_result(pipelines.subscribe(id, email))
 
 
 @main.command(name="unsubscribe")
@@ -330,4 +359,4 @@ def unsubscribe(pipeline, email):
             sys.exit(1)
     # Process pipeline to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
-    print(pipelines.unsubscribe(id, email))
+    output.print_result(pipelines.unsubscribe(id, email))
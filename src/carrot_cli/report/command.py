@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import sys
@@ -7,6 +8,7 @@ import click
 from .. import command_util
 from .. import dependency_util
 from .. import file_util
+from .. import output
 
 # Naming this differently here than in other files because reports have a config attribute
 from ..config import manager as config_manager
@@ -24,7 +26,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a report by its ID"""
-    print(reports.find_by_id(id))
+    output.print_result(reports.find_by_id(id))
 
 
 @main.command(name="find")
@@ -79,6 +81,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching report records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     report_id,
     name,
@@ -91,23 +101,23 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve reports filtered to match the specified parameters"""
-    print(
-        reports.find(
-            report_id,
-            name,
-            description,
-            file_util.read_file_to_json(notebook),
-            file_util.read_file_to_json(config),
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        reports.find,
+        report_id,
+        name,
+        description,
+        file_util.read_file_to_json(notebook),
+        file_util.read_file_to_json(config),
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -144,7 +154,7 @@ def create(name, description, notebook, config, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    print(
+    output.print_result(
         reports.create(
             name,
             description,
@@ -175,7 +185,7 @@ def update(report, name, description, notebook, config):
     """Update report specified by REPORT (id or name) with the specified parameters"""
     # Process report to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    print(
+    output.print_result(
         reports.update(
             id,
             name,
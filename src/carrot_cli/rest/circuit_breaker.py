@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+
+from ..config import manager as config
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl isn't available on Windows, so the state is only shared within one process there
+    fcntl = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Directory for the state files, which holds one file per server
+CIRCUIT_BREAKER_DIR = "~/.carrot_cli/circuit_breaker"
+
+# Defaults used if they are not set in the config: the number of consecutive failed requests
+# after which we stop sending requests (0 means never), and how long (in seconds) to stop for
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = 30.0
+
+# State for servers whose state file can't be used, mapping server addresses to their state
+__STATES = {}
+__LOCK = threading.Lock()
+
+
+def allow_request():
+    """
+    Checks whether a request should be sent to the current server.  Once the server has failed
+    circuit_breaker_threshold requests in a row (across every carrot_cli process on this host),
+    requests fail fast for circuit_breaker_cooldown seconds.  After that, a single request is
+    let through to check whether the server has recovered, while the rest keep failing fast until
+    its result is recorded with record_success or record_failure
+
+    Returns
+    -------
+    None if the request should be sent, or a message explaining why not
+    """
+    threshold = config.load_var_with_default(
+        "circuit_breaker_threshold", DEFAULT_CIRCUIT_BREAKER_THRESHOLD
+    )
+    if threshold <= 0:
+        return None
+    cooldown = config.load_var_with_default(
+        "circuit_breaker_cooldown", DEFAULT_CIRCUIT_BREAKER_COOLDOWN
+    )
+
+    def check(state):
+        if state["failures"] < threshold:
+            return None
+        now = time.time()
+        # Let one request through once the cool-down has passed.  If a check has been going for
+        # longer than the cool-down, whoever sent it probably died, so let another through
+        if now - state["opened_at"] >= cooldown and (
+            state["probe_started_at"] is None or now - state["probe_started_at"] >= cooldown
+        ):
+            LOGGER.debug("Sending a request to check whether the server has recovered")
+            state["probe_started_at"] = now
+            return None
+        return (
+            f"Not sending request because the last {state['failures']} requests to the server "
+            "failed. Requests will be retried in "
+            f"{max(1, round(state['opened_at'] + cooldown - now))} seconds"
+        )
+
+    return __update_state(check)
+
+
+def record_success():
+    """Records that a request to the current server succeeded, closing the circuit"""
+
+    def reset(state):
+        if state["failures"] > 0:
+            LOGGER.debug("Server responded, so resetting failure count")
+        state.update(__new_state())
+
+    __update_state(reset)
+
+
+def record_failure():
+    """
+    Records that a request to the current server failed, opening the circuit if there have been
+    circuit_breaker_threshold failures in a row
+    """
+    threshold = config.load_var_with_default(
+        "circuit_breaker_threshold", DEFAULT_CIRCUIT_BREAKER_THRESHOLD
+    )
+    if threshold <= 0:
+        return
+
+    def fail(state):
+        state["failures"] += 1
+        state["probe_started_at"] = None
+        if state["failures"] >= threshold:
+            LOGGER.debug("%i requests in a row failed, so pausing requests", state["failures"])
+            state["opened_at"] = time.time()
+
+    __update_state(fail)
+
+
+def __new_state():
+    """Returns the state of a server that hasn't failed"""
+    return {"failures": 0, "opened_at": None, "probe_started_at": None}
+
+
+def __update_state(func):
+    """
+    Calls func with the state of the current server (a dict with the number of consecutive
+    failures, when the circuit was opened, and when the request checking whether the server has
+    recovered was sent), which it may modify, and saves the state.  The state file is locked while
+    this happens so other processes don't change it at the same time
+
+    Returns
+    -------
+    The value returned by func
+    """
+    server_address = config.load_var_no_error("carrot_server_address") or ""
+    with __LOCK:
+        handle = __open_state_file(server_address)
+        if handle is None:
+            state = __STATES.setdefault(server_address, __new_state())
+            return func(state)
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                state = dict(__new_state(), **json.load(handle))
+            except (ValueError, TypeError):
+                state = __new_state()
+            original_state = dict(state)
+            result = func(state)
+            if state != original_state:
+                handle.seek(0)
+                handle.truncate()
+                json.dump(state, handle)
+                handle.flush()
+            return result
+        finally:
+            handle.close()
+
+
+def __open_state_file(server_address):
+    """
+    Opens (creating if necessary) the state file for server_address, or returns None if file
+    locking isn't available or the file can't be opened
+    """
+    if fcntl is None:
+        return None
+    state_dir = os.path.expanduser(CIRCUIT_BREAKER_DIR)
+    path = os.path.join(state_dir, urllib.parse.quote(server_address, safe="") + ".json")
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        return open(os.open(path, os.O_RDWR | os.O_CREAT), "r+")
+    except OSError as e:
+        LOGGER.debug("Failed to open circuit breaker state file %s: %s", path, e)
+        return None
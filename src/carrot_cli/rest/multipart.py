@@ -0,0 +1,161 @@
+import logging
+import os
+import sys
+import time
+import uuid
+
+LOGGER = logging.getLogger(__name__)
+
+# Number of bytes to read from a file at a time, and to hand to the connection when it iterates
+UPLOAD_CHUNK_SIZE = 65536
+
+# Minimum time (in seconds) between progress updates
+PROGRESS_INTERVAL = 0.5
+
+
+class MultipartEncoder:
+    """
+    A multipart/form-data request body made of the form fields in fields (a dict mapping names to
+    values, or to lists of values) and the files in files (a dict mapping names to file paths).
+    It's a file-like object with a length, so requests sends it with a Content-Length and reads it
+    a chunk at a time, and the files are read from disk as the body is sent instead of being
+    loaded into memory.  If progress is True, the upload's progress and throughput are written to
+    stream (stderr by default) as it's sent.  The files are opened when the encoder is created, so
+    it raises an OSError then if one can't be opened, and are closed by close
+    """
+
+    def __init__(self, fields, files, progress=False, stream=None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.parts = []
+        self.open_files = []
+        try:
+            for name, values in (fields or {}).items():
+                for value in values if isinstance(values, list) else [values]:
+                    self.parts.append(
+                        self.part_header(name) + self.to_bytes(value) + b"\r\n"
+                    )
+            for name, path in (files or {}).items():
+                file = open(path, "rb")
+                self.open_files.append(file)
+                self.parts += [self.part_header(name, os.path.basename(path)), file, b"\r\n"]
+        except OSError:
+            self.close()
+            raise
+        self.parts.append(f"--{self.boundary}--\r\n".encode())
+        self.length = sum(
+            len(part) if isinstance(part, bytes) else os.fstat(part.fileno()).st_size
+            for part in self.parts
+        )
+        self.part_index = 0
+        self.buffer = b""
+        self.bytes_read = 0
+        self.progress_stream = (stream or sys.stderr) if progress else None
+        self.start_time = None
+        self.last_progress_time = None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        """Returns up to size bytes of the body (or the rest of it if size is negative)"""
+        if size is None or size < 0:
+            size = self.length - self.bytes_read
+        chunks = []
+        remaining = size
+        while remaining > 0 and (self.buffer or self.part_index < len(self.parts)):
+            if not self.buffer:
+                self.buffer = self.read_part(min(remaining, UPLOAD_CHUNK_SIZE))
+                if not self.buffer:
+                    continue
+            chunk, self.buffer = self.buffer[:remaining], self.buffer[remaining:]
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        data = b"".join(chunks)
+        self.bytes_read += len(data)
+        if data and self.progress_stream is not None:
+            self.report_progress()
+        return data
+
+    def read_part(self, size):
+        """
+        Returns the next bytes of the current part, reading at most size bytes from a file, and
+        moves on to the next part when this one is done
+        """
+        part = self.parts[self.part_index]
+        if isinstance(part, bytes):
+            self.part_index += 1
+            return part
+        data = part.read(size)
+        if not data:
+            self.part_index += 1
+        return data
+
+    def report_progress(self):
+        """Writes how much of the body has been sent, and how quickly, to the progress stream"""
+        now = time.monotonic()
+        if self.start_time is None:
+            self.start_time = now
+        finished = self.bytes_read >= self.length
+        if (
+            not finished
+            and self.last_progress_time is not None
+            and now - self.last_progress_time < PROGRESS_INTERVAL
+        ):
+            return
+        self.last_progress_time = now
+        elapsed = now - self.start_time
+        throughput = self.bytes_read / elapsed if elapsed > 0 else 0.0
+        percent = 100.0 * self.bytes_read / self.length if self.length else 100.0
+        self.progress_stream.write(
+            f"\rUploaded {self.format_size(self.bytes_read)} of {self.format_size(self.length)} "
+            f"({percent:.0f}%) at {self.format_size(throughput)}/s"
+        )
+        if finished:
+            self.progress_stream.write("\n")
+        self.progress_stream.flush()
+
+    def close(self):
+        """Closes the files in the body"""
+        for file in self.open_files:
+            file.close()
+
+    def part_header(self, name, filename=None):
+        """Returns the boundary and headers that start the part for the field called name"""
+        disposition = f'form-data; name="{self.quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{self.quote(filename)}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if filename is not None:
+            header += "Content-Type: application/octet-stream\r\n"
+        return (header + "\r\n").encode("utf-8")
+
+    @staticmethod
+    def quote(value):
+        """Escapes value for use in a quoted header parameter"""
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "").replace("\n", "")
+
+    @staticmethod
+    def to_bytes(value):
+        """Returns value, a form field value, as bytes"""
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    @staticmethod
+    def format_size(size):
+        """Returns size, a number of bytes, formatted for people to read"""
+        if size < 1024:
+            return f"{size:.0f} B"
+        for unit in ("KB", "MB"):
+            size /= 1024
+            if size < 1024:
+                return f"{size:.1f} {unit}"
+        return f"{size / 1024:.1f} GB"
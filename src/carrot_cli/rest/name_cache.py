@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+import time
+
+from .. import file_util
+from ..config import manager as config
+
+LOGGER = logging.getLogger(__name__)
+
+# Location of the cache file, which maps server addresses to entity types to names to ids
+NAME_CACHE_PATH = "~/.carrot_cli/name_cache.json"
+
+# How long (in seconds) a cached id is trusted, if not set in the config
+DEFAULT_NAME_CACHE_TTL = 3600
+
+# The key for the id in records of each type of entity that can be looked up by name
+ID_KEYS = {
+    "pipelines": "pipeline_id",
+    "templates": "template_id",
+    "tests": "test_id",
+    "results": "result_id",
+    "reports": "report_id",
+    "runs": "run_id",
+    "software": "software_id",
+}
+
+__CACHE_LOCK = threading.Lock()
+
+
+def get(entity, name):
+    """
+    Returns the cached id for the record of type entity with the specified name, or None if there
+    isn't one cached or the cached one has expired
+    """
+    server_address = __get_server_address()
+    if server_address is None:
+        return None
+    ttl = config.load_var_with_default("name_cache_ttl", DEFAULT_NAME_CACHE_TTL)
+    with __CACHE_LOCK:
+        entry = __load().get(server_address, {}).get(entity, {}).get(name)
+    if entry is None:
+        return None
+    if time.time() - entry["cached_at"] > ttl:
+        LOGGER.debug("Cached id for %s with name %s has expired", entity, name)
+        return None
+    LOGGER.debug("Found cached id %s for %s with name %s", entry["id"], entity, name)
+    return entry["id"]
+
+
+def put(entity, name, id):
+    """Caches id as the id for the record of type entity with the specified name"""
+    server_address = __get_server_address()
+    if server_address is None:
+        return
+    with __CACHE_LOCK:
+        cache = __load()
+        entity_cache = cache.setdefault(server_address, {}).setdefault(entity, {})
+        # Names are unique, so if this id was cached under a different name, that's outdated
+        __remove_id_from_entity_cache(entity_cache, id)
+        entity_cache[name] = {"id": id, "cached_at": time.time()}
+        __save(cache)
+
+
+def remove_id(entity, id):
+    """Removes any cached names for the record of type entity with the specified id"""
+    server_address = __get_server_address()
+    if server_address is None:
+        return
+    with __CACHE_LOCK:
+        cache = __load()
+        entity_cache = cache.get(server_address, {}).get(entity, {})
+        if __remove_id_from_entity_cache(entity_cache, id):
+            __save(cache)
+
+
+def clear(entity=None):
+    """
+    Clears the cached ids for the current server.  If entity is specified, only clears ids for that
+    type of entity
+    """
+    server_address = __get_server_address()
+    if server_address is None:
+        return
+    with __CACHE_LOCK:
+        cache = __load()
+        if entity is None:
+            cache.pop(server_address, None)
+        else:
+            cache.get(server_address, {}).pop(entity, None)
+        __save(cache)
+
+
+def cache_from_response(entity, response):
+    """
+    If response (the output of a create or update request) is a record of type entity with a name
+    and an id, caches the id for that name
+    """
+    if entity not in ID_KEYS or not isinstance(response, dict):
+        return
+    id_key = ID_KEYS[entity]
+    if response.get("name") and response.get(id_key):
+        put(entity, response["name"], response[id_key])
+
+
+def __remove_id_from_entity_cache(entity_cache, id):
+    """
+    Removes any entries from entity_cache (a dict mapping names to cache entries) for id
+
+    Returns
+    -------
+    True if anything was removed, False if not
+    """
+    names = [name for name, entry in entity_cache.items() if entry["id"] == id]
+    for name in names:
+        del entity_cache[name]
+    return len(names) > 0
+
+
+def __get_server_address():
+    """
+    Returns the address of the current server, which we use to keep ids cached for different
+    servers separate, or None if it isn't set (in which case we don't cache anything)
+    """
+    return config.load_var_no_error("carrot_server_address")
+
+
+def __load():
+    """Returns the contents of the cache file as a dict, or an empty dict if it can't be read"""
+    return file_util.load_json(os.path.expanduser(NAME_CACHE_PATH), {})
+
+
+def __save(cache):
+    """Writes cache to the cache file"""
+    cache_path = os.path.expanduser(NAME_CACHE_PATH)
+    try:
+        file_util.save_json(cache_path, cache)
+    except OSError as e:
+        LOGGER.debug("Failed to write name cache to %s: %s", cache_path, e)
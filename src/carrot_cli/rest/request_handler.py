@@ -1,22 +1,150 @@
+import codecs
+import collections
+import contextlib
+import datetime
+import email.utils
+import gzip
 import json as json_lib
 import logging
-import os
 import pprint
+import random
+import threading
+import time
+import types
 import urllib
-
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 from ..config import manager as config
+from . import circuit_breaker, multipart, name_cache, response_cache, throttle
 
 LOGGER = logging.getLogger(__name__)
 
+# Defaults for the connection pool settings, used if they are not set in the config
+DEFAULT_CONNECTION_POOL_SIZE = 10
+DEFAULT_CONNECTION_POOL_MAXSIZE = 10
+DEFAULT_KEEP_ALIVE = True
+
+# Defaults for how long (in seconds) to wait to connect to the server and for it to respond, used
+# if they are not set in the config
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 300.0
+
+# Defaults for retrying failed requests, used if they are not set in the config: the number of
+# times to retry, the delay (in seconds) before the first retry, which doubles with each retry,
+# and the maximum delay
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_MAX_RETRY_BACKOFF = 30.0
+
+# Defaults for compressing json request bodies, used if they are not set in the config: whether
+# to compress them, and the minimum size (in bytes) of body worth compressing
+DEFAULT_COMPRESS_REQUESTS = False
+DEFAULT_COMPRESSION_THRESHOLD = 16384
+
+# Default for whether to write the progress of file uploads to stderr, used if it is not set in
+# the config
+DEFAULT_UPLOAD_PROGRESS = False
+
+# Requests with these methods are safe to send again, so they are retried if they fail with a
+# connection error, a timeout, or one of RETRY_STATUSES
+RETRY_METHODS = ("GET", "PUT", "DELETE")
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Bounds on the page size used when paginating, and the response time we adapt it toward
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 1000
+TARGET_PAGE_SECONDS = 1.0
+
+# Number of bytes to read at a time when streaming a response
+STREAM_CHUNK_SIZE = 65536
+
+# Session shared by every request we send, so connections to the server are pooled and reused
+__SESSION = None
+__SESSION_LOCK = threading.Lock()
+
+# Tracks whether find requests on each thread should stream their records, set with streaming()
+__STREAMING = threading.local()
+
+
+@dataclass
+class ErrorResponse:
+    """
+    Represents a request that did not get a successful json response.  status is the status code
+    of the response (None if no response was received), body is the parsed json body if the
+    response had one, text is the raw body if it wasn't json, and message describes any failure
+    that happened before we got a response
+    """
+
+    status: int = None
+    body: object = None
+    text: str = None
+    message: str = None
+
+
+class PaginationError(Exception):
+    """
+    Represents a failure to retrieve a page of records while paginating or streaming.  response
+    is the value returned for the failed page, or an ErrorResponse describing why reading a
+    streamed page failed
+    """
+
+    def __init__(self, response):
+        super().__init__(response)
+        self.response = response
 
-def find_by_id(entity, id):
-    """Submits a request to the find_by_id mapping for the specified entity with the specified id"""
+
+def find_by_id(entity, id, revalidate=False):
+    """
+    Submits a request to the find_by_id mapping for the specified entity with the specified id.
+    Records are cached on disk by response_cache, so if the record was retrieved recently (or is a
+    finished run), returns the cached record without sending a request, unless revalidate is True.
+    If the cached record has expired (or revalidate is True) but the server sent an ETag or
+    Last-Modified header with it, sends a conditional request, so the record is only sent again
+    if it has changed
+    """
+    cached_record = None if revalidate else response_cache.get(entity, id)
+    if cached_record is not None:
+        return cached_record
+    if response_cache.get_mode() == "cache_only":
+        return ErrorResponse(
+            message=f"No cached record found in {entity} with id {id}, and requests to the "
+            "server are disabled by --cache_only"
+        )
+    # If we have an expired copy, ask the server to only send the record if it has changed
+    stale_record, validators = response_cache.get_validators(entity, id)
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
     # Build request address and send
     server_address = config.load_var("carrot_server_address")
     address = f"http://{server_address}/api/v1/{entity}/{id}"
-    return send_request("GET", address)
+    response_headers = {}
+    response = send_request(
+        "GET", address, headers=headers, response_headers=response_headers
+    )
+    if isinstance(response, ErrorResponse) and response.status == 304 and stale_record is not None:
+        LOGGER.debug("Cached %s record with id %s has not been modified", entity, id)
+        response = stale_record
+    else:
+        validators = __get_validators(response_headers)
+    response_cache.put(entity, id, response, validators)
+    return response
+
+
+def __get_validators(response_headers):
+    """
+    Returns a dict containing the etag and last_modified validators from response_headers, for
+    sending with conditional requests
+    """
+    # Header names are case-insensitive
+    response_headers = {name.lower(): value for name, value in response_headers.items()}
+    return {
+        "etag": response_headers.get("etag"),
+        "last_modified": response_headers.get("last-modified"),
+    }
 
 
 def find(entity, params):
@@ -27,7 +155,26 @@ def find(entity, params):
     # Filter out params that are not set
     params = list(filter(lambda param: param[1] != "", params))
     # Create and send request
-    return send_request("GET", address, params=params)
+    return send_request(
+        "GET", address, params=params, stream=getattr(__STREAMING, "enabled", False)
+    )
+
+
+@contextlib.contextmanager
+def streaming():
+    """
+    Context manager within which find, find_runs and find_maps requests sent from this thread
+    stream their results: if the server responds with an array of records, instead of a list,
+    they return a generator that parses and yields each record as it arrives, so the first
+    records can be used right away and only one is held in memory at a time.  The generator
+    raises a PaginationError if reading the response fails partway through
+    """
+    previous = getattr(__STREAMING, "enabled", False)
+    __STREAMING.enabled = True
+    try:
+        yield
+    finally:
+        __STREAMING.enabled = previous
 
 
 def create(entity, params, files=None):
@@ -47,10 +194,13 @@ def create(entity, params, files=None):
     # Build and send request
     # If we have files, send multipart
     if files:
-        return send_request("POST", address, body=body, files=files)
+        response = send_request("POST", address, body=body, files=files)
     # Otherwise, send json
     else:
-        return send_request("POST", address, json=body)
+        response = send_request("POST", address, json=body)
+    # Cache the id for the new record's name
+    name_cache.cache_from_response(entity, response)
+    return response
 
 
 def update(entity, id, params, files=None):
@@ -70,10 +220,15 @@ def update(entity, id, params, files=None):
     # Build and send request
     # If we have files, send multipart
     if files:
-        return send_request("PUT", address, body=body, files=files)
+        response = send_request("PUT", address, body=body, files=files)
     # Otherwise, send json
     else:
-        return send_request("PUT", address, json=body)
+        response = send_request("PUT", address, json=body)
+    # The name might have changed, so replace any cached name for this id
+    name_cache.remove_id(entity, id)
+    name_cache.cache_from_response(entity, response)
+    response_cache.remove(entity, id)
+    return response
 
 
 def delete(entity, id):
@@ -83,7 +238,11 @@ def delete(entity, id):
     # Build request address and send
     server_address = config.load_var("carrot_server_address")
     address = f"http://{server_address}/api/v1/{entity}/{id}"
-    return send_request("DELETE", address)
+    response = send_request("DELETE", address)
+    # Make sure we don't keep resolving names to the deleted record
+    name_cache.remove_id(entity, id)
+    response_cache.remove(entity, id)
+    return response
 
 
 def subscribe(entity, id, email):
@@ -127,7 +286,10 @@ def run(test_id, params):
         if param[1] != "":
             body[param[0]] = param[1]
     # Build and send request
-    return send_request("POST", address, json=body)
+    response = send_request("POST", address, json=body)
+    # Cache the id for the new run's name
+    name_cache.cache_from_response("runs", response)
+    return response
 
 
 def find_runs(entity, id, params):
@@ -141,7 +303,9 @@ def find_runs(entity, id, params):
     # Filter out params that are not set
     params = list(filter(lambda param: param[1] != "", params))
     # Create and send request
-    return send_request("GET", address, params=params)
+    return send_request(
+        "GET", address, params=params, stream=getattr(__STREAMING, "enabled", False)
+    )
 
 
 def create_map(entity1, entity1_id, entity2, entity2_id, params, query_params=None):
@@ -188,7 +352,9 @@ def find_maps(entity1, entity1_id, entity2, params):
     # Filter out params that are not set
     params = list(filter(lambda param: param[1] != "", params))
     # Create and send request
-    return send_request("GET", address, params=params)
+    return send_request(
+        "GET", address, params=params, stream=getattr(__STREAMING, "enabled", False)
+    )
 
 
 def delete_map_by_ids(entity1, entity1_id, entity2, entity2_id):
@@ -205,125 +371,534 @@ def delete_map_by_ids(entity1, entity1_id, entity2, entity2_id):
     return send_request("DELETE", address)
 
 
-def send_request(method, url, params=None, json=None, body=None, files=None):
+def paginate(find_page, page_size, offset=0, prefetch=1):
     """
-    Sends a request to url with method, optionally with query params, json, form data body, and
-    files, and handles potential errors
+    Generator that retrieves all the records from a find mapping by requesting them a page at a
+    time, yielding each record as its page arrives, so only a few pages are held in memory at a
+    time.  If prefetch is 1, the page size is adjusted after each page to keep response times
+    near TARGET_PAGE_SECONDS.  If it's more than 1, up to prefetch pages of page_size records are
+    requested in parallel, and records are still yielded in order
+
+    Parameters
+    ----------
+    find_page - a function that accepts a limit and offset and returns the records in that range,
+                e.g. one of the rest modules' find functions with all the other params filled in
+    page_size - the number of records to request in the first page
+    offset - the offset of the first record to retrieve
+    prefetch - the maximum number of page requests to have in flight at once
+
+    Returns
+    -------
+    A generator of records.  Raises a PaginationError if a page request fails.  find_page may
+    also return a generator, as find does within streaming(), in which case each record is yielded
+    as soon as it's parsed.  Prefetched pages are requested from other threads, so they are never
+    streamed
     """
-    processed_files = None
-    try:
-        # Convert files into the format we need to pass to requests
-        processed_files = __process_file_dict(files)
-        # Send request
-        LOGGER.debug(
-            "Sending %s request to %s with params %s and json %s and data %s and files %s",
-            method,
-            url,
-            params,
-            json,
-            body,
-            files
-        )
-        response = requests.request(method, url, params=params, json=json, data=body, files=processed_files)
-        LOGGER.debug(
-            "Received response with status %i and body %s",
-            response.status_code,
-            response.text,
-        )
-        # Parse json body from request and return
-        json_body = response.json()
-        if json_body is None:
-            return (
-                "Received response with status %i and empty body" % response.status_code
-            )
-        return json_lib.dumps(json_body, indent=4, sort_keys=True)
-    except (AttributeError, json_lib.decoder.JSONDecodeError):
-        LOGGER.debug("Failed to parse json from response body: %s", response.text)
-        return json_lib.dumps(
-            {"Status": response.status_code, "Body": response.text},
-            indent=4,
-            sort_keys=True,
-        )
-    except requests.ConnectionError as err:
-        LOGGER.debug(err)
-        if LOGGER.getEffectiveLevel() == logging.DEBUG:
-            return "Encountered a connection error."
-        else:
-            return "Encountered a connection error. Enable verbose logging (-v) for more info"
-    except requests.URLRequired as err:
-        LOGGER.debug(err)
-        if LOGGER.getEffectiveLevel() == logging.DEBUG:
-            return "Invalid URL."
-        else:
-            return "Invalid URL. Enable verbose logging (-v) for more info"
-    except requests.Timeout as err:
-        LOGGER.debug(err)
-        if LOGGER.getEffectiveLevel() == logging.DEBUG:
-            return "Request timed out."
-        else:
-            return "Request timed out. Enable verbose logging (-v) for more info"
-    except requests.TooManyRedirects as err:
-        LOGGER.debug(err)
-        if LOGGER.getEffectiveLevel() == logging.DEBUG:
-            return "Too many redirects"
-        else:
-            return "Too many redirects. Enable verbose logging (-v) for more info"
-    except IOError as err:
-        LOGGER.debug(err)
-        if LOGGER.getEffectiveLevel() == logging.DEBUG:
-            return "Encountered an IO error"
+    if prefetch > 1:
+        yield from __paginate_parallel(find_page, page_size, offset, prefetch)
+        return
+    first_page = True
+    while True:
+        start_time = time.monotonic()
+        page = find_page(page_size, offset)
+        elapsed = time.monotonic() - start_time
+        if isinstance(page, types.GeneratorType):
+            # A streamed page yields its records as they arrive, so we only know its size, and
+            # how long it took, once we've gone through it
+            page_length = 0
+            for record in page:
+                page_length += 1
+                yield record
+            elapsed = time.monotonic() - start_time
+            if page_length < page_size:
+                return
         else:
-            return "Encountered an IO error. Enable verbose logging (-v) for more info"
+            if __is_last_page(page, page_size, first_page):
+                if isinstance(page, list):
+                    yield from page
+                return
+            yield from page
+            page_length = len(page)
+        first_page = False
+        offset += page_length
+        page_size = __adapt_page_size(page_size, elapsed)
+
+
+def __paginate_parallel(find_page, page_size, offset, prefetch):
+    """
+    Does the work of paginate when prefetching, keeping up to prefetch requests for consecutive
+    pages of page_size records in flight and yielding the records from each page in order
+    """
+    pending = collections.deque()
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    try:
+        for _ in range(prefetch):
+            pending.append(executor.submit(find_page, page_size, offset))
+            offset += page_size
+        first_page = True
+        while True:
+            page = pending.popleft().result()
+            if __is_last_page(page, page_size, first_page):
+                if isinstance(page, list):
+                    yield from page
+                return
+            # Keep the pipeline full while the caller works through this page
+            pending.append(executor.submit(find_page, page_size, offset))
+            offset += page_size
+            yield from page
+            first_page = False
     finally:
-        # Close any open files
-        if processed_files is not None:
-            __close_files(processed_files)
+        # We don't need the pages past the last one, so don't wait for them
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
 
-def __process_file_dict(files):
+def __is_last_page(page, page_size, first_page):
     """
-    Accepts a dict of file params mapped to file paths and returns a dict formatted for passing
-    files to requests
+    Returns True if page is the last page we need to request, i.e. it's short or, for a page
+    after the first, it's the 404 the server sends when there are no more records.  Raises a
+    PaginationError if page is any other error
 
     Parameters
     ----------
-    files - A dict mapping file param names to file paths
+    page - the value returned by the find function for the page
+    page_size - the number of records that were requested for the page
+    first_page - True if page is the first page requested
+    """
+    if not isinstance(page, list):
+        # Once we're past the first page, the server tells us we've run out of records with a
+        # 404, so that just means we're done
+        if not first_page and isinstance(page, ErrorResponse) and page.status == 404:
+            return True
+        raise PaginationError(page)
+    # A short page means there aren't any more records
+    return len(page) < page_size
+
+
+def __adapt_page_size(page_size, elapsed):
+    """
+    Returns a new page size based on page_size and elapsed, the number of seconds it took to
+    retrieve the last page: doubles it if the page was fast and halves it if it was slow, staying
+    within MIN_PAGE_SIZE and MAX_PAGE_SIZE
+    """
+    if elapsed < TARGET_PAGE_SECONDS / 2:
+        page_size *= 2
+    elif elapsed > TARGET_PAGE_SECONDS * 2:
+        page_size //= 2
+    return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, page_size))
+
+
+def send_request(
+    method,
+    url,
+    params=None,
+    json=None,
+    body=None,
+    files=None,
+    headers=None,
+    response_headers=None,
+    stream=False,
+):
+    """
+    Sends a request to url with method, optionally with query params, json, form data body, files,
+    and headers, and handles potential errors.  If response_headers is a dict, it is filled with
+    the headers of the response
 
     Returns
     -------
-    A dict mapping file param names to 2-tuples containing the file's basename and a file object
-    for the open file
+    The response body parsed from json if the request succeeded, or an ErrorResponse if it did not.
+    If stream is true and the body is a json array, returns a generator that yields each element
+    as it's parsed from the response instead (see __stream_array)
     """
-    if files is None:
-        return None
-    # Dict we'll return containing the files
-    processed_files = {}
-    # Loop through the values in files, open each file, and add it to processed files with its filename
-    for param_name in files:
-        file_path = files[param_name]
+    # requests takes a while to import, so we wait until we actually need it
+    import requests  # pylint: disable=C0415
+
+    timeout = __get_timeout()
+    # Compress large json bodies once up front, rather than for each attempt
+    if json is not None and body is None and files is None:
+        compressed_body = __compress_json(json)
+        if compressed_body is not None:
+            headers = dict(headers or {})
+            headers["Content-Type"] = "application/json"
+            headers["Content-Encoding"] = "gzip"
+            json, body = None, compressed_body
+    max_retries = 0
+    if method.upper() in RETRY_METHODS:
+        max_retries = config.load_var_with_default("max_retries", DEFAULT_MAX_RETRIES)
+    # If the server has been failing, don't wait for this request to fail too
+    circuit_message = circuit_breaker.allow_request()
+    if circuit_message is not None:
+        return ErrorResponse(message=circuit_message)
+    attempt = 0
+    while True:
+        upload = None
         try:
-            file = open(file_path, "rb")
-            processed_files[param_name] = (os.path.basename(file.name), file)
-        except IOError as e:
-            LOGGER.error(f"Failed to open {param_name} file with path {file_path}.")
-            # Close all the open files
-            __close_files(processed_files)
-            raise e
-    return processed_files
+            # Encode files into a multipart body that reads them from disk as it's sent.  This is
+            # done for each attempt since sending the files reads them
+            data, request_headers = body, headers
+            if files is not None:
+                upload = __encode_multipart(body, files)
+                data = upload
+                request_headers = dict(headers or {})
+                request_headers["Content-Type"] = upload.content_type
+            # Send request
+            LOGGER.debug(
+                "Sending %s request to %s with params %s and json %s and data %s and files %s",
+                method,
+                url,
+                params,
+                json,
+                body,
+                files
+            )
+            # Stay within the configured limits on how hard we hit the server
+            with throttle.limit():
+                response = get_session().request(
+                    method,
+                    url,
+                    params=params,
+                    json=json,
+                    data=data,
+                    files=None,
+                    headers=request_headers,
+                    timeout=timeout,
+                    stream=stream,
+                )
+            if stream:
+                # Reading the text would read the whole body, which is what we're trying to avoid
+                LOGGER.debug("Received response with status %i", response.status_code)
+            else:
+                LOGGER.debug(
+                    "Received response with status %i and body %s",
+                    response.status_code,
+                    response.text,
+                )
+            delay = None
+            if attempt < max_retries and response.status_code in RETRY_STATUSES:
+                delay = __get_retry_delay(attempt, response.headers.get("Retry-After"))
+            if delay is None:
+                if response_headers is not None:
+                    response_headers.update(response.headers)
+                # Server errors mean the server is struggling, but anything else means it's up
+                if response.status_code >= 500:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+                if stream and 200 <= response.status_code < 300:
+                    return __stream_response(response)
+                return __parse_response(response)
+            # Make sure the connection goes back to the pool if we didn't read the body
+            response.close()
+            LOGGER.debug("Retrying after status %i", response.status_code)
+        except (requests.ConnectionError, requests.Timeout) as err:
+            if attempt >= max_retries:
+                circuit_breaker.record_failure()
+                # ConnectTimeout is both, and it's really a connection error
+                if isinstance(err, requests.ConnectionError):
+                    return __error_for_exception(err, "Encountered a connection error")
+                return __error_for_exception(err, "Request timed out")
+            delay = __get_retry_delay(attempt)
+            LOGGER.debug("Retrying after error: %s", err)
+        except requests.URLRequired as err:
+            return __error_for_exception(err, "Invalid URL")
+        except requests.TooManyRedirects as err:
+            return __error_for_exception(err, "Too many redirects")
+        except IOError as err:
+            return __error_for_exception(err, "Encountered an IO error")
+        finally:
+            # Close any open files
+            if upload is not None:
+                upload.close()
+        LOGGER.debug(
+            "Waiting %.2f seconds before retry %i of %i", delay, attempt + 1, max_retries
+        )
+        time.sleep(delay)
+        attempt += 1
+
+
+def __compress_json(json):
+    """
+    If the compress_requests config variable is on and json, serialized, is at least
+    compression_threshold bytes, returns it serialized and gzipped.  Otherwise, returns None
+    """
+    if not config.load_var_with_default("compress_requests", DEFAULT_COMPRESS_REQUESTS):
+        return None
+    threshold = config.load_var_with_default(
+        "compression_threshold", DEFAULT_COMPRESSION_THRESHOLD
+    )
+    serialized = json_lib.dumps(json, allow_nan=False).encode("utf-8")
+    if len(serialized) < threshold:
+        return None
+    compressed = gzip.compress(serialized)
+    LOGGER.debug(
+        "Compressed request body from %i bytes to %i bytes", len(serialized), len(compressed)
+    )
+    return compressed
+
+
+def __get_timeout():
+    """
+    Returns the (connect, read) timeout to use for requests, from the connect_timeout and
+    read_timeout config variables.  A timeout of 0 or less means wait indefinitely
+    """
+    connect_timeout = config.load_var_with_default("connect_timeout", DEFAULT_CONNECT_TIMEOUT)
+    read_timeout = config.load_var_with_default("read_timeout", DEFAULT_READ_TIMEOUT)
+    return (
+        connect_timeout if connect_timeout > 0 else None,
+        read_timeout if read_timeout > 0 else None,
+    )
+
 
-def __close_files(files):
+def __get_retry_delay(attempt, retry_after=None):
+    """
+    Returns the number of seconds to wait before retrying a request that has already been retried
+    attempt times.  If the server sent a Retry-After header, its value is used, unless it asks us
+    to wait longer than the max_retry_backoff config variable, in which case returns None to
+    indicate we shouldn't retry.  Otherwise, the delay is picked at random between 0 and an
+    exponentially increasing cap (retry_backoff * 2^attempt, up to max_retry_backoff), so many
+    clients retrying at once don't all hit the server at the same time
     """
-    Closes all the files in files
+    backoff = config.load_var_with_default("retry_backoff", DEFAULT_RETRY_BACKOFF)
+    max_backoff = config.load_var_with_default("max_retry_backoff", DEFAULT_MAX_RETRY_BACKOFF)
+    if retry_after is not None:
+        delay = __parse_retry_after(retry_after)
+        if delay is not None:
+            return delay if delay <= max_backoff else None
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+def __parse_retry_after(retry_after):
+    """
+    Parses retry_after, the value of a Retry-After header, which is either a number of seconds or
+    an HTTP date, and returns the number of seconds to wait, or None if it's invalid
+    """
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_time = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_time is None:
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_time - now).total_seconds())
+
+
+def __stream_response(response):
+    """
+    Starts reading the body of response, a successful response sent with stream=True.  If it's a
+    json array, returns a generator that yields its elements as they're parsed.  Otherwise,
+    reads and parses the rest of it like __parse_response
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    chunks = response.iter_content(STREAM_CHUNK_SIZE)
+    text = ""
+    # Read until we know what kind of value the body is
+    for chunk in chunks:
+        text += decoder.decode(chunk)
+        if text.strip():
+            break
+    if text.lstrip().startswith("["):
+        return __stream_array(response, text, chunks, decoder)
+    text += "".join(decoder.decode(chunk) for chunk in chunks) + decoder.decode(b"", final=True)
+    response.close()
+    try:
+        json_body = json_lib.loads(text)
+    except json_lib.decoder.JSONDecodeError:
+        LOGGER.debug("Failed to parse json from response body: %s", text)
+        return ErrorResponse(status=response.status_code, text=text)
+    if json_body is None:
+        return ErrorResponse(
+            status=response.status_code,
+            message="Received response with status %i and empty body" % response.status_code,
+        )
+    return json_body
+
+
+def __stream_array(response, text, chunks, decoder):
+    """
+    Generator that parses the elements of a json array from the body of response, yielding each
+    one as soon as it's complete, and only keeping the unparsed part of the body in memory
 
     Parameters
     ----------
-    files - A files dict formatted to match requests' files param (keys are the name of the param,
-            mapped to tuples where the second value is a file object)
+    response - the response the array is being read from, which is closed when we're done
+    text - the start of the body, which has been read already
+    chunks - an iterator of the remaining chunks of the body, as bytes
+    decoder - an incremental decoder for converting chunks to text
 
     Returns
     -------
-    None
+    A generator of the parsed elements.  Raises a PaginationError if the body can't be read or
+    isn't a valid json array
     """
-    if files is None:
-        return
-    for param_name in files:
-        files[param_name][1].close()
+    # requests takes a while to import, so we wait until we actually need it
+    import requests  # pylint: disable=C0415
+
+    json_decoder = json_lib.JSONDecoder()
+    # Skip the opening bracket
+    position = text.index("[") + 1
+    finished_reading = False
+    expecting_element = True
+    try:
+        while True:
+            # Skip whitespace and commas between elements
+            while position < len(text) and (
+                text[position].isspace() or (text[position] == "," and not expecting_element)
+            ):
+                if text[position] == ",":
+                    expecting_element = True
+                position += 1
+            if position < len(text) and text[position] == "]":
+                return
+            if position < len(text):
+                try:
+                    element, end = json_decoder.raw_decode(text, position)
+                except json_lib.decoder.JSONDecodeError:
+                    end = None
+                # If the element runs right to the end of what we've read so far, it might
+                # continue in the next chunk (e.g. a number), so only trust it if we're done
+                if end is not None and (end < len(text) or finished_reading):
+                    if not expecting_element:
+                        raise ValueError(f"Expected , or ] at position {position}")
+                    yield element
+                    expecting_element = False
+                    # Drop what we've parsed so we only hold on to one element at a time
+                    text = text[end:]
+                    position = 0
+                    continue
+            if finished_reading:
+                raise ValueError("Response is not a complete json array")
+            chunk = next(chunks, None)
+            if chunk is None:
+                finished_reading = True
+                text += decoder.decode(b"", final=True)
+            else:
+                text += decoder.decode(chunk)
+    except (ValueError, requests.RequestException) as err:
+        LOGGER.debug(err)
+        raise PaginationError(
+            ErrorResponse(message=f"Failed to read records from response: {err}")
+        ) from err
+    finally:
+        response.close()
+
+
+def __parse_response(response):
+    """
+    Parses the json body from response
+
+    Returns
+    -------
+    The parsed body if response has a successful status and a json body, or an ErrorResponse if not
+    """
+    try:
+        json_body = response.json()
+    except (AttributeError, json_lib.decoder.JSONDecodeError):
+        LOGGER.debug("Failed to parse json from response body: %s", response.text)
+        return ErrorResponse(status=response.status_code, text=response.text)
+    if json_body is None:
+        return ErrorResponse(
+            status=response.status_code,
+            message="Received response with status %i and empty body"
+            % response.status_code,
+        )
+    if not 200 <= response.status_code < 300:
+        return ErrorResponse(status=response.status_code, body=json_body)
+    return json_body
+
+
+def __error_for_exception(err, message):
+    """
+    Logs err and returns an ErrorResponse with message, along with a suggestion to turn on verbose
+    logging if it's not on already
+    """
+    LOGGER.debug(err)
+    if LOGGER.getEffectiveLevel() == logging.DEBUG:
+        return ErrorResponse(message=f"{message}.")
+    return ErrorResponse(message=f"{message}. Enable verbose logging (-v) for more info")
+
+
+def get_session():
+    """
+    Returns the requests Session shared by all requests sent through this module, creating it on
+    first use.  The session's connection pool is configured using the connection_pool_size,
+    connection_pool_maxsize and keep_alive config variables
+    """
+    global __SESSION
+    # Lock so threads sending requests at the same time don't each build their own session
+    with __SESSION_LOCK:
+        if __SESSION is None:
+            __SESSION = __create_session()
+        return __SESSION
+
+
+def close_session():
+    """Closes the shared session, if there is one, along with all of its pooled connections"""
+    global __SESSION
+    with __SESSION_LOCK:
+        if __SESSION is not None:
+            __SESSION.close()
+            __SESSION = None
+
+
+def __create_session():
+    """
+    Creates a requests Session with an HTTPAdapter configured from the connection pool config
+    variables
+
+    Returns
+    -------
+    A requests Session
+    """
+    import requests  # pylint: disable=C0415
+    from urllib3.util.request import ACCEPT_ENCODING  # pylint: disable=C0415
+
+    pool_size = config.load_var_with_default(
+        "connection_pool_size", DEFAULT_CONNECTION_POOL_SIZE
+    )
+    pool_maxsize = config.load_var_with_default(
+        "connection_pool_maxsize", DEFAULT_CONNECTION_POOL_MAXSIZE
+    )
+    keep_alive = config.load_var_with_default("keep_alive", DEFAULT_KEEP_ALIVE)
+    LOGGER.debug(
+        "Creating session with pool size %i, max connections per host %i and keep-alive %s",
+        pool_size,
+        pool_maxsize,
+        keep_alive,
+    )
+    session = requests.Session()
+    # Ask for compressed responses in every encoding we can decode, which includes brotli and
+    # zstd if the packages for them are installed
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    # pool_connections is the number of hosts we keep pools for, and pool_maxsize is the number of
+    # connections kept open to each one
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_maxsize
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Connections are kept alive by default, so we only need to do something if keep-alive is off
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def __encode_multipart(body, files):
+    """
+    Returns a MultipartEncoder for a multipart request body with the form fields in body and the
+    files in files, a dict mapping file param names to file paths.  If the upload_progress config
+    variable is on, the encoder writes the upload's progress to stderr.  Logs and raises an
+    OSError if a file can't be opened
+    """
+    progress = config.load_var_with_default("upload_progress", DEFAULT_UPLOAD_PROGRESS)
+    try:
+        return multipart.MultipartEncoder(body, files, progress=progress)
+    except OSError as e:
+        LOGGER.error("Failed to open file with path %s", e.filename)
+        raise
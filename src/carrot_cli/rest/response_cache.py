@@ -0,0 +1,168 @@
+import logging
+import os
+import shutil
+import time
+import urllib.parse
+
+from .. import file_util
+from ..config import manager as config
+from . import run_status
+
+LOGGER = logging.getLogger(__name__)
+
+# Directory for cached records, which holds a directory per server, containing a directory per
+# type of entity, containing a file per record
+RESPONSE_CACHE_DIR = "~/.carrot_cli/response_cache"
+
+# How long (in seconds) a cached record is trusted, if not set in the config.  Finished runs never
+# change, so they don't expire
+DEFAULT_RESPONSE_CACHE_TTL = 3600
+
+# Types of entities whose records are cached when retrieved by id.  Runs are only cached once
+# they've finished
+CACHED_ENTITIES = ("pipelines", "templates", "tests", "results", "reports", "runs")
+
+# Ways of using the cache: check it before sending a request (default), only check it and never
+# send a request (cache_only), or always send a request and update it (refresh)
+MODES = ("default", "cache_only", "refresh")
+
+# The current mode, set via the --cache_only and --refresh options
+__MODE = "default"
+
+
+def set_mode(mode):
+    """Sets the way the cache is used to mode, which should be one of MODES"""
+    global __MODE
+    if mode not in MODES:
+        raise ValueError(f"Unsupported cache mode: {mode}")
+    __MODE = mode
+
+
+def get_mode():
+    """Returns the way the cache is currently used"""
+    return __MODE
+
+
+def get(entity, id):
+    """
+    Returns the cached record of type entity with the specified id, or None if there isn't one
+    cached, it has expired, or the cache is being refreshed
+    """
+    if __MODE == "refresh":
+        return None
+    entry = __load_entry(entity, id)
+    if entry is None:
+        return None
+    if not entry.get("immutable"):
+        ttl = config.load_var_with_default("response_cache_ttl", DEFAULT_RESPONSE_CACHE_TTL)
+        if time.time() - entry.get("cached_at", 0) > ttl:
+            LOGGER.debug("Cached %s record with id %s has expired", entity, id)
+            return None
+    LOGGER.debug("Using cached %s record with id %s", entity, id)
+    return entry.get("record")
+
+
+def get_validators(entity, id):
+    """
+    Returns the cached record of type entity with the specified id, whether or not it has
+    expired, along with the validators (a dict with the etag and last_modified values the server
+    sent with it) for checking whether it has changed.  Returns None and an empty dict if there
+    isn't a cached record with validators, or the cache is being refreshed
+    """
+    if __MODE == "refresh":
+        return None, {}
+    entry = __load_entry(entity, id)
+    if entry is None or not any((entry.get("validators") or {}).values()):
+        return None, {}
+    return entry.get("record"), entry["validators"]
+
+
+def put(entity, id, record, validators=None):
+    """
+    Caches record as the record of type entity with the specified id, if it's a record for a type
+    of entity we cache, along with validators (a dict with the etag and last_modified values the
+    server sent with it), if set.  Unfinished runs aren't cached, since their statuses change
+    """
+    if entity not in CACHED_ENTITIES or not isinstance(record, dict):
+        return
+    immutable = False
+    if entity == "runs":
+        status = record.get("status")
+        if not isinstance(status, str) or not run_status.is_terminal(status):
+            return
+        immutable = True
+    path = __get_path(entity, id)
+    if path is None:
+        return
+    entry = {
+        "cached_at": time.time(),
+        "immutable": immutable,
+        "validators": validators or {},
+        "record": record,
+    }
+    try:
+        file_util.save_json(path, entry)
+    except OSError as e:
+        LOGGER.debug("Failed to write cached record to %s: %s", path, e)
+
+
+def remove(entity, id):
+    """Removes the cached record of type entity with the specified id, if there is one"""
+    path = __get_path(entity, id)
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        LOGGER.debug("Failed to remove cached record at %s: %s", path, e)
+
+
+def clear(entity=None):
+    """
+    Clears the cached records for the current server.  If entity is specified, only clears
+    records of that type
+    """
+    server_dir = __get_server_dir()
+    if server_dir is None:
+        return
+    target = server_dir if entity is None else os.path.join(server_dir, entity)
+    shutil.rmtree(target, ignore_errors=True)
+
+
+def __load_entry(entity, id):
+    """
+    Returns the cache entry (a dict with the record and when it was cached) for the record of type
+    entity with the specified id, or None if there isn't one
+    """
+    if entity not in CACHED_ENTITIES:
+        return None
+    path = __get_path(entity, id)
+    if path is None:
+        return None
+    return file_util.load_json(path)
+
+
+def __get_path(entity, id):
+    """
+    Returns the path to the cache file for the record of type entity with the specified id, or None
+    if the server address isn't set (in which case we don't cache anything)
+    """
+    server_dir = __get_server_dir()
+    if server_dir is None:
+        return None
+    return os.path.join(server_dir, entity, urllib.parse.quote(str(id), safe="") + ".json")
+
+
+def __get_server_dir():
+    """
+    Returns the directory for records cached for the current server, which we use to keep records
+    for different servers separate, or None if the server address isn't set
+    """
+    server_address = config.load_var_no_error("carrot_server_address")
+    if server_address is None:
+        return None
+    return os.path.join(
+        os.path.expanduser(RESPONSE_CACHE_DIR), urllib.parse.quote(server_address, safe="")
+    )
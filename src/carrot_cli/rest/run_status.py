@@ -0,0 +1,3 @@
+def is_terminal(status):
+    """Returns True if status is one a run won't leave: succeeded, or any failed or aborted status"""
+    return status == "succeeded" or status.endswith("failed") or status.endswith("aborted")
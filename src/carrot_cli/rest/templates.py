@@ -1,7 +1,7 @@
 import logging
 import os
 
-from . import request_handler
+from . import request_handler, upload_manifest
 
 LOGGER = logging.getLogger(__name__)
 
@@ -72,8 +72,13 @@ def create(
     __process_maybe_file_field(params, files, "eval_wdl", eval_wdl)
     if eval_wdl_dependencies:
         __process_maybe_file_field(params, files, "eval_wdl_dependencies", eval_wdl_dependencies)
+    # Hash the files before sending them, so we can skip uploading them again in later updates
+    file_hashes = __hash_files(files)
     # Make the request
-    return request_handler.create("templates", params, files=(files if files else None))
+    response = request_handler.create("templates", params, files=(files if files else None))
+    if file_hashes and isinstance(response, dict) and response.get("template_id"):
+        upload_manifest.record_uploads(response["template_id"], file_hashes, response)
+    return response
 
 
 def update(
@@ -83,9 +88,14 @@ def update(
     test_wdl,
     test_wdl_dependencies,
     eval_wdl,
-    eval_wdl_dependencies
+    eval_wdl_dependencies,
+    force_upload=False
 ):
-    """Submits a request to CARROT's templates update mapping"""
+    """
+    Submits a request to CARROT's templates update mapping.  Local files that are the same as the
+    ones last uploaded for the template (according to the upload manifest), and that the template
+    still uses, are not uploaded again unless force_upload is True
+    """
     # Create parameter list
     params = [
         ("name", name),
@@ -103,13 +113,24 @@ def update(
         __process_maybe_file_field(params, files, "eval_wdl", eval_wdl)
     if eval_wdl_dependencies:
         __process_maybe_file_field(params, files, "eval_wdl_dependencies", eval_wdl_dependencies)
+    file_hashes = __hash_files(files)
+    if not force_upload:
+        __skip_unchanged_files(template_id, files, file_hashes)
     # Make the request
-    return request_handler.update("templates", template_id, params, files=(files if files else None))
+    response = request_handler.update(
+        "templates", template_id, params, files=(files if files else None)
+    )
+    if file_hashes:
+        upload_manifest.record_uploads(template_id, file_hashes, response)
+    return response
 
 
 def delete(template_id):
     """Submits a request to CARROT's templates delete mapping"""
-    return request_handler.delete("templates", template_id)
+    response = request_handler.delete("templates", template_id)
+    if not isinstance(response, request_handler.ErrorResponse):
+        upload_manifest.remove_template(template_id)
+    return response
 
 
 def subscribe(template_id, email):
@@ -146,4 +167,47 @@ def __process_maybe_file_field(params, files, field_name, field_val):
         params.append((field_name, field_val))
     # Otherwise, assume field_val is a file, so we'll throw it in the files list
     else:
-        files[f'{field_name}_file'] = field_val
\ No newline at end of file
+        files[f'{field_name}_file'] = field_val
+
+def __hash_files(files):
+    """
+    Returns a dict mapping the names of the fields for the files in files (a files dict for a
+    request, as filled by __process_maybe_file_field) to the hashes of their contents
+    """
+    return {
+        file_field[: -len("_file")]: upload_manifest.hash_file(path)
+        for file_field, path in files.items()
+    }
+
+
+def __skip_unchanged_files(template_id, files, file_hashes):
+    """
+    Removes files from files (a files dict for an update request for the template with
+    template_id) that are the same as the ones last uploaded for the template, if the template
+    still uses the copies the server made of them.  Also removes them from file_hashes (which maps
+    field names to the hashes of the files for them) so the manifest entries for them are kept
+    """
+    uploaded_locations = {
+        field: upload_manifest.get_location(template_id, field, file_hash)
+        for field, file_hash in file_hashes.items()
+    }
+    uploaded_locations = {
+        field: location for field, location in uploaded_locations.items() if location is not None
+    }
+    # Only retrieve the template if there's a file we might be able to skip.  It's checked with
+    # the server rather than taken from the response cache, since the cached copy might be from
+    # before someone else changed the template's files
+    if not uploaded_locations:
+        return
+    template = request_handler.find_by_id("templates", template_id, revalidate=True)
+    if not isinstance(template, dict):
+        return
+    for field, location in uploaded_locations.items():
+        if template.get(field) == location:
+            LOGGER.info(
+                "Not uploading %s for %s because it hasn't changed since it was last uploaded",
+                files[f"{field}_file"],
+                field,
+            )
+            del files[f"{field}_file"]
+            del file_hashes[field]
@@ -0,0 +1,207 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+
+from ..config import manager as config
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl isn't available on Windows, so limits only apply within one process there
+    fcntl = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Directory for the files that share limit state between processes, which holds a token bucket
+# file and a set of in-flight slot files per server
+THROTTLE_DIR = "~/.carrot_cli/throttle"
+
+# Defaults for the limits, used if they are not set in the config.  0 means no limit
+DEFAULT_RATE_LIMIT = 0.0
+DEFAULT_MAX_IN_FLIGHT = 0
+
+# How long (in seconds) to wait before checking again for a free in-flight slot
+SLOT_POLL_INTERVAL = 0.05
+
+# State for limiting within this process, used if the limit files can't be used.  Maps server
+# addresses to token buckets (a dict with the number of tokens and when it was updated) and to
+# semaphores limiting the requests in flight
+__BUCKETS = {}
+__SEMAPHORES = {}
+__LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def limit():
+    """
+    Context manager that wraps sending a request to the current server, so requests are limited
+    to at most rate_limit per second (with bursts of up to rate_burst) and at most max_in_flight
+    at a time, as set in the config, or in server_limits for the current server.  The limits are
+    shared by every thread and, where file locking is available, every carrot_cli process on this
+    host sending requests to the server
+    """
+    server_address = config.load_var_no_error("carrot_server_address") or ""
+    server_limits = __get_server_limits(server_address)
+    rate = __load_limit(server_limits, "rate_limit", DEFAULT_RATE_LIMIT)
+    max_in_flight = __load_limit(server_limits, "max_in_flight", DEFAULT_MAX_IN_FLIGHT)
+    if rate > 0:
+        burst = __load_limit(server_limits, "rate_burst", max(1.0, rate))
+        wait_time = __reserve_token(server_address, rate, max(1.0, burst))
+        if wait_time > 0:
+            LOGGER.debug("Waiting %.2f seconds to stay within rate limit", wait_time)
+            time.sleep(wait_time)
+    if max_in_flight > 0:
+        with __in_flight_slot(server_address, max_in_flight):
+            yield
+    else:
+        yield
+
+
+def __get_server_limits(server_address):
+    """
+    Returns the limits set for server_address in the server_limits config variable, a json object
+    mapping server addresses to objects with any of rate_limit, rate_burst and max_in_flight, or
+    an empty dict if none are set for it
+    """
+    server_limits = config.load_var_no_error("server_limits")
+    if server_limits is None:
+        return {}
+    try:
+        # It's a string if it was set with config set or an environment variable
+        if isinstance(server_limits, str):
+            server_limits = json.loads(server_limits)
+        limits = server_limits.get(server_address, {})
+        if not isinstance(limits, dict):
+            raise ValueError(f"limits for {server_address} are not an object")
+    except (AttributeError, ValueError) as e:
+        LOGGER.warning("Config variable server_limits is invalid (%s), so ignoring it", e)
+        return {}
+    return limits
+
+
+def __load_limit(server_limits, name, default):
+    """
+    Returns the limit called name from server_limits, the limits for the current server, converted
+    to the type of default, or, if it isn't set there, the config variable called name
+    """
+    if name in server_limits:
+        try:
+            return type(default)(server_limits[name])
+        except (TypeError, ValueError):
+            LOGGER.warning(
+                "%s in server_limits has invalid value %s, so ignoring it",
+                name,
+                server_limits[name],
+            )
+    return config.load_var_with_default(name, default)
+
+
+def __reserve_token(server_address, rate, burst):
+    """
+    Takes a token from the token bucket for server_address, which refills at rate tokens per
+    second up to burst tokens.  If the bucket is empty, the token is reserved from the future, so
+    requests waiting on the bucket are spaced out in the order they arrived
+
+    Returns
+    -------
+    The number of seconds to wait before sending the request
+    """
+    with __LOCK:
+        handle = __open_state_file(server_address, "bucket")
+        try:
+            if handle is None:
+                bucket = __BUCKETS.get(server_address)
+            else:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                bucket = __read_bucket(handle)
+            now = time.time()
+            if bucket is None:
+                bucket = {"tokens": burst, "updated_at": now}
+            tokens = min(burst, bucket["tokens"] + (now - bucket["updated_at"]) * rate) - 1
+            bucket = {"tokens": tokens, "updated_at": now}
+            if handle is None:
+                __BUCKETS[server_address] = bucket
+            else:
+                handle.seek(0)
+                handle.truncate()
+                json.dump(bucket, handle)
+                handle.flush()
+        finally:
+            if handle is not None:
+                handle.close()
+    return -tokens / rate if tokens < 0 else 0.0
+
+
+def __read_bucket(handle):
+    """Returns the token bucket stored in handle, or None if it's empty or invalid"""
+    try:
+        handle.seek(0)
+        bucket = json.load(handle)
+        return {"tokens": float(bucket["tokens"]), "updated_at": float(bucket["updated_at"])}
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+@contextlib.contextmanager
+def __in_flight_slot(server_address, max_in_flight):
+    """
+    Context manager that holds one of max_in_flight slots for requests to server_address, waiting
+    for one to be free.  Each slot is a file that's locked while it's held, so if a process dies,
+    its slots are freed
+    """
+    slot_files = [
+        __open_state_file(server_address, f"slot{index}") for index in range(max_in_flight)
+    ]
+    try:
+        if None in slot_files:
+            with __get_semaphore(server_address, max_in_flight):
+                yield
+            return
+        while True:
+            for slot_file in slot_files:
+                try:
+                    fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(slot_file, fcntl.LOCK_UN)
+                return
+            time.sleep(SLOT_POLL_INTERVAL)
+    finally:
+        for slot_file in slot_files:
+            if slot_file is not None:
+                slot_file.close()
+
+
+def __get_semaphore(server_address, max_in_flight):
+    """Returns the semaphore limiting requests in flight to server_address in this process"""
+    key = (server_address, max_in_flight)
+    with __LOCK:
+        if key not in __SEMAPHORES:
+            __SEMAPHORES[key] = threading.BoundedSemaphore(max_in_flight)
+        return __SEMAPHORES[key]
+
+
+def __open_state_file(server_address, name):
+    """
+    Opens (creating if necessary) the state file called name for server_address, or returns None
+    if file locking isn't available or the file can't be opened
+    """
+    if fcntl is None:
+        return None
+    server_dir = os.path.join(
+        os.path.expanduser(THROTTLE_DIR), urllib.parse.quote(server_address, safe="")
+    )
+    path = os.path.join(server_dir, name)
+    try:
+        os.makedirs(server_dir, exist_ok=True)
+        return open(os.open(path, os.O_RDWR | os.O_CREAT), "r+")
+    except OSError as e:
+        LOGGER.debug("Failed to open throttle state file %s: %s", path, e)
+        return None
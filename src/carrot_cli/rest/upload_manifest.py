@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import time
+
+from .. import file_util
+from ..config import manager as config
+
+LOGGER = logging.getLogger(__name__)
+
+# Location of the manifest file, which maps server addresses to template ids to the names of
+# template fields to the file last uploaded for that field
+UPLOAD_MANIFEST_PATH = "~/.carrot_cli/upload_manifest.json"
+
+__MANIFEST_LOCK = threading.Lock()
+
+
+def hash_file(path):
+    """
+    Returns the hex sha256 digest of the contents of the file at path, or None if it can't be
+    read
+    """
+    try:
+        return file_util.hash_file(path)
+    except OSError as e:
+        LOGGER.debug("Failed to hash %s: %s", path, e)
+        return None
+
+
+def get_upload(template_id, field):
+    """
+    Returns the manifest entry for the file last uploaded for field of the template with
+    template_id (a dict with its sha256, the location the server put it and when it was
+    uploaded), or None if nothing has been recorded for it
+    """
+    server_address = __get_server_address()
+    if server_address is None:
+        return None
+    with __MANIFEST_LOCK:
+        return __load().get(server_address, {}).get(template_id, {}).get(field)
+
+
+def get_location(template_id, field, file_hash):
+    """
+    Returns where the server put the file last uploaded for field of the template with
+    template_id, if that file's contents had file_hash, or None if a different file (or no file)
+    was last uploaded for it
+    """
+    if file_hash is None:
+        return None
+    entry = get_upload(template_id, field)
+    if entry is None or entry["sha256"] != file_hash:
+        return None
+    return entry["location"]
+
+
+def record_uploads(template_id, file_hashes, response):
+    """
+    Records the files uploaded for the template with template_id, where file_hashes maps the
+    names of the fields they were uploaded for to their hashes, and response is the template
+    returned by the create or update request, which holds where the server put each file
+    """
+    server_address = __get_server_address()
+    if server_address is None or not isinstance(response, dict):
+        return
+    with __MANIFEST_LOCK:
+        manifest = __load()
+        template_manifest = manifest.setdefault(server_address, {}).setdefault(template_id, {})
+        for field, file_hash in file_hashes.items():
+            if file_hash is None or not response.get(field):
+                template_manifest.pop(field, None)
+                continue
+            template_manifest[field] = {
+                "sha256": file_hash,
+                "location": response[field],
+                "uploaded_at": time.time(),
+            }
+        __save(manifest)
+
+
+def remove_template(template_id):
+    """Removes the recorded uploads for the template with template_id"""
+    server_address = __get_server_address()
+    if server_address is None:
+        return
+    with __MANIFEST_LOCK:
+        manifest = __load()
+        if manifest.get(server_address, {}).pop(template_id, None) is not None:
+            __save(manifest)
+
+
+def clear():
+    """Clears the recorded uploads for the current server"""
+    server_address = __get_server_address()
+    if server_address is None:
+        return
+    with __MANIFEST_LOCK:
+        manifest = __load()
+        if manifest.pop(server_address, None) is not None:
+            __save(manifest)
+
+
+def __get_server_address():
+    """
+    Returns the address of the current server, which we use to keep uploads to different servers
+    separate, or None if it isn't set (in which case we don't record anything)
+    """
+    return config.load_var_no_error("carrot_server_address")
+
+
+def __load():
+    """Returns the contents of the manifest file as a dict, or an empty dict if it can't be read"""
+    return file_util.load_json(os.path.expanduser(UPLOAD_MANIFEST_PATH), {})
+
+
+def __save(manifest):
+    """Writes manifest to the manifest file"""
+    manifest_path = os.path.expanduser(UPLOAD_MANIFEST_PATH)
+    try:
+        file_util.save_json(manifest_path, manifest)
+    except OSError as e:
+        LOGGER.debug("Failed to write upload manifest to %s: %s", manifest_path, e)
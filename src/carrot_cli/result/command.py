@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import sys
@@ -6,6 +7,7 @@ import click
 
 from .. import command_util
 from .. import dependency_util
+from .. import output
 from ..config import manager as config
 from ..rest import results, template_results, templates
 
@@ -21,7 +23,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a result definition by its ID"""
-    print(results.find_by_id(id))
+    output.print_result(results.find_by_id(id))
 
 
 @main.command(name="find")
@@ -68,6 +70,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching result records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     result_id,
     name,
@@ -79,22 +89,22 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve results filtered to match the specified parameters"""
-    print(
-        results.find(
-            result_id,
-            name,
-            description,
-            result_type,
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        results.find,
+        result_id,
+        name,
+        description,
+        result_type,
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -123,7 +133,7 @@ def create(name, description, result_type, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    print(results.create(name, description, result_type, created_by))
+    output.print_result(results.create(name, description, result_type, created_by))
 
 
 @main.command(name="update")
@@ -134,7 +144,7 @@ def update(result, name, description):
     """Update result for RESULT (id or name) with the specified parameters"""
     # Process result to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
-    print(results.update(id, name, description))
+    output.print_result(results.update(id, name, description))
 
 
 @main.command(name="delete")
@@ -182,8 +192,8 @@ def map_to_template(result, template, result_key, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    # Process result to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
-    # Same for template
-    template_id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    print(template_results.create_map(template_id, id, result_key, created_by))
+    # Process result and template to get ids if they're names
+    id, template_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(result, results, "result_id", "result"), (template, templates, "template_id", "template")]
+    )
+    output.print_result(template_results.create_map(template_id, id, result_key, created_by))
@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import sys
@@ -7,8 +8,10 @@ import click
 from .. import command_util
 from .. import dependency_util
 from .. import file_util
+from .. import output
+from .. import watch_util
 from ..config import manager as config
-from ..rest import reports, run_reports, runs
+from ..rest import reports, request_handler, run_reports, runs
 
 LOGGER = logging.getLogger(__name__)
 
@@ -22,7 +25,94 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a run by its ID"""
-    print(runs.find_by_id(id))
+    output.print_result(runs.find_by_id(id))
+
+
+def __watch_options(command):
+    """Adds the options shared by the wait and watch commands to command"""
+    command = click.option(
+        "--max_interval",
+        default=watch_util.DEFAULT_MAX_POLL_INTERVAL,
+        show_default=True,
+        type=click.FloatRange(min=0),
+        help="The maximum number of seconds to wait between checks of a run's status",
+    )(command)
+    command = click.option(
+        "--min_interval",
+        default=watch_util.DEFAULT_MIN_POLL_INTERVAL,
+        show_default=True,
+        type=click.FloatRange(min=0),
+        help="The minimum number of seconds to wait between checks of a run's status.  Runs are "
+        "checked less often as they get older, and while they are queued or building",
+    )(command)
+    command = click.option(
+        "--timeout",
+        default=None,
+        type=click.FloatRange(min=0),
+        help="The maximum number of seconds to wait for the runs to finish.  Waits indefinitely "
+        "if not specified",
+    )(command)
+    command = click.option(
+        "--poll_strategy",
+        default="per_run",
+        show_default=True,
+        type=click.Choice(watch_util.POLL_STRATEGIES),
+        help="How to check the runs' statuses.  per_run retrieves each run by its ID.  by_test "
+        "retrieves all the runs for a test with one request, which takes far fewer requests "
+        "when watching many runs of the same test",
+    )(command)
+    return click.argument("run", nargs=-1, required=True)(command)
+
+
+def __get_run_ids(run):
+    """Returns a list of the ids for each id or name in run, exiting if any can't be found"""
+    # Names are resolved together, so waiting on many runs by name doesn't look them up one by one
+    return dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(id_or_name, runs, "run_id", "run") for id_or_name in run]
+    )
+
+
+def __wait_result(run_id, record):
+    """
+    Returns record, the last record retrieved for the run with run_id, for printing.  If it's an
+    ErrorResponse, returns a dict with the run's id and the error instead
+    """
+    if isinstance(record, request_handler.ErrorResponse):
+        return {"run_id": run_id, "error": output.format_result(record)}
+    return record
+
+
+@main.command(name="wait")
+@__watch_options
+def wait(run, timeout, min_interval, max_interval, poll_strategy):
+    """
+    Wait for the runs specified by RUN (ids or names) to finish and print their records.  Exits
+    with 0 if all the runs succeeded, 1 if any failed or were aborted, or 2 if --timeout passed
+    before they all finished
+    """
+    run_ids = __get_run_ids(run)
+    records, exit_code = watch_util.watch_runs(
+        run_ids, timeout, min_interval, max_interval, strategy=poll_strategy
+    )
+    output.print_result(
+        [__wait_result(run_id, records[run_id]) for run_id in run_ids if run_id in records]
+    )
+    sys.exit(exit_code)
+
+
+@main.command(name="watch")
+@__watch_options
+def watch(run, timeout, min_interval, max_interval, poll_strategy):
+    """
+    Watch the runs specified by RUN (ids or names) until they finish, printing an ndjson event
+    each time a run's status changes.  Exits with 0 if all the runs succeeded, 1 if any failed or
+    were aborted, or 2 if --timeout passed before they all finished
+    """
+    run_ids = __get_run_ids(run)
+    _, exit_code = watch_util.watch_runs(
+        run_ids, timeout, min_interval, max_interval, output.print_event, poll_strategy
+    )
+    sys.exit(exit_code)
 
 
 @main.command(name="delete")
@@ -70,11 +160,11 @@ def create_report(run, report, created_by, delete_failed):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    # Process run to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(run, runs, "run_id", "run")
-    # Do the same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    print(run_reports.create_map(id, report_id, created_by, delete_failed))
+    # Process run and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(run, runs, "run_id", "run"), (report, reports, "report_id", "report")]
+    )
+    output.print_result(run_reports.create_map(id, report_id, created_by, delete_failed))
 
 
 @main.command(name="find_report_by_ids")
@@ -85,11 +175,11 @@ def find_report_by_ids(run, report):
     Retrieve the report record for the run specified by RUN (id or name) and the report specified
     by REPORT (id or name)
     """
-    # Process run to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(run, runs, "run_id", "run")
-    # Do the same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    print(run_reports.find_map_by_ids(id, report_id))
+    # Process run and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(run, runs, "run_id", "run"), (report, reports, "report_id", "report")]
+    )
+    output.print_result(run_reports.find_map_by_ids(id, report_id))
 
 
 @main.command(name="find_reports")
@@ -153,6 +243,14 @@ def find_report_by_ids(run, report):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching report records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find_reports(
     run,
     report,
@@ -167,34 +265,31 @@ def find_reports(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """
     Retrieve the report records for the run specified by RUN (id or name) for the specified params
     """
-    # Process run to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(run, runs, "run_id", "run")
-    # Same for report
-    if report:
-        report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    else:
-        report_id = ""
-    print(
-        run_reports.find_maps(
-            id,
-            report_id,
-            status,
-            cromwell_job_id,
-            file_util.read_file_to_json(results),
-            created_before,
-            created_after,
-            created_by,
-            finished_before,
-            finished_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Process run and report to get ids if they're names (report is optional)
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(run, runs, "run_id", "run"), (report, reports, "report_id", "report")]
     )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        run_reports.find_maps,
+        id,
+        report_id,
+        status,
+        cromwell_job_id,
+        file_util.read_file_to_json(results),
+        created_before,
+        created_after,
+        created_by,
+        finished_before,
+        finished_after,
+        sort,
+    )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="delete_report_by_ids")
@@ -213,8 +308,8 @@ def delete_report_by_ids(run, report, yes):
     Delete the report record for the run specified by RUN (id or name) to the report specified by
     REPORT (id or name)
     """
-    # Process run to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(run, runs, "run_id", "run")
-    # Do the same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
+    # Process run and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(run, runs, "run_id", "run"), (report, reports, "report_id", "report")]
+    )
     command_util.delete_map(id, report_id, yes, run_reports, "run", "report")
@@ -1,9 +1,12 @@
+import functools
 import logging
 import sys
 
 import click
 
+from .. import command_util
 from .. import dependency_util
+from .. import output
 from ..config import manager as config
 from ..rest import software as software_rest
 from .software_version import command as software_version
@@ -20,7 +23,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a software definition by its ID"""
-    print(software_rest.find_by_id(id))
+    output.print_result(software_rest.find_by_id(id))
 
 
 @main.command(name="find")
@@ -69,6 +72,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching software records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     software_id,
     name,
@@ -80,22 +91,22 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve software definitions filtered to match the specified parameters"""
-    print(
-        software_rest.find(
-            software_id,
-            name,
-            description,
-            repository_url,
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        software_rest.find,
+        software_id,
+        name,
+        description,
+        repository_url,
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -125,7 +136,7 @@ def create(name, description, repository_url, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    print(software_rest.create(name, description, repository_url, created_by))
+    output.print_result(software_rest.create(name, description, repository_url, created_by))
 
 
 @main.command(name="update")
@@ -136,7 +147,7 @@ def update(software, name, description):
     """Update software definition for SOFTWARE (id or name) with the specified parameters"""
     # Process software to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(software, software_rest, "software_id", "software")
-    print(software_rest.update(id, name, description))
+    output.print_result(software_rest.update(id, name, description))
 
 
 main.add_command(software_version.main)
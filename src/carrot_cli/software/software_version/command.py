@@ -1,8 +1,11 @@
+import functools
 import logging
 
 import click
 
+from ... import command_util
 from ... import dependency_util
+from ... import output
 from ...rest import software_versions
 from ...rest import software as software_rest
 from .software_build import command as software_build
@@ -19,7 +22,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a software version record by its ID"""
-    print(software_versions.find_by_id(id))
+    output.print_result(software_versions.find_by_id(id))
 
 
 @main.command(name="find")
@@ -67,6 +70,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching software version records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     software_version_id,
     software,
@@ -76,6 +87,7 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve software version records filtered to match the specified parameters"""
     # Process software to get id if it's a name
@@ -83,18 +95,17 @@ def find(
         software_id = dependency_util.get_id_from_id_or_name_and_handle_error(software, software_rest, "software_id", "software")
     else:
         software_id = ""
-    print(
-        software_versions.find(
-            software_version_id,
-            software_id,
-            commit,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        software_versions.find,
+        software_version_id,
+        software_id,
+        commit,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 main.add_command(software_build.main)
@@ -1,7 +1,10 @@
+import functools
 import logging
 
 import click
 
+from .... import command_util
+from .... import output
 from ....rest import software_builds
 
 LOGGER = logging.getLogger(__name__)
@@ -16,7 +19,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a software build record by its ID"""
-    print(software_builds.find_by_id(id))
+    output.print_result(software_builds.find_by_id(id))
 
 
 @main.command(name="find")
@@ -90,6 +93,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching software build records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     software_build_id,
     software_version_id,
@@ -103,21 +114,21 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve software build records filtered to match the specified parameters"""
-    print(
-        software_builds.find(
-            software_build_id,
-            software_version_id,
-            build_job_id,
-            status,
-            image_url,
-            created_before,
-            created_after,
-            finished_before,
-            finished_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        software_builds.find,
+        software_build_id,
+        software_version_id,
+        build_job_id,
+        status,
+        image_url,
+        created_before,
+        created_after,
+        finished_before,
+        finished_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
@@ -1,9 +1,12 @@
+import functools
 import logging
 import sys
 
 import click
 
+from .. import command_util
 from .. import dependency_util
+from .. import output
 from ..rest import pipelines, subscriptions, templates, tests
 
 LOGGER = logging.getLogger(__name__)
@@ -18,7 +21,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a subscription by its ID"""
-    print(subscriptions.find_by_id(id))
+    output.print_result(subscriptions.find_by_id(id))
 
 
 @main.command(name="find")
@@ -62,6 +65,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching subscription records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     subscription_id,
     entity_type,
@@ -72,6 +83,7 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve subscriptions filtered to match the specified parameters"""
     # Process entity in case it's a name
@@ -85,16 +97,15 @@ def find(
         LOGGER.error("Invalid value for entity_type.  Must be pipeline, template, or test")
         sys.exit(1)
 
-    print(
-        subscriptions.find(
-            subscription_id,
-            entity_type,
-            entity_id,
-            created_before,
-            created_after,
-            email,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        subscriptions.find,
+        subscription_id,
+        entity_type,
+        entity_id,
+        created_before,
+        created_after,
+        email,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import sys
@@ -7,6 +8,8 @@ import click
 from .. import command_util
 from .. import dependency_util
 from .. import file_util
+from .. import output
+from .. import wdl_util
 from ..config import manager as config
 from ..rest import pipelines, reports, results, runs, template_reports, template_results, templates
 
@@ -22,7 +25,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a template by its ID"""
-    print(templates.find_by_id(id))
+    output.print_result(templates.find_by_id(id))
 
 
 @main.command(name="find")
@@ -85,6 +88,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching template records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     template_id,
     pipeline,
@@ -98,6 +109,7 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve templates filtered to match the specified parameters"""
     # Process pipeline in case it's a name
@@ -105,22 +117,21 @@ def find(
         pipeline_id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
     else:
         pipeline_id = ""
-    print(
-        templates.find(
-            template_id,
-            pipeline_id,
-            name,
-            description,
-            test_wdl,
-            eval_wdl,
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        templates.find,
+        template_id,
+        pipeline_id,
+        name,
+        description,
+        test_wdl,
+        eval_wdl,
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -154,6 +165,14 @@ def find(
     help="The location where the eval WDL dependencies zip for this template is hosted, or its"
     "local file path. The zip should be formatted the same as it would be for cromwell",
 )
+@click.option(
+    "--build_dependencies",
+    is_flag=True,
+    default=False,
+    help="Build the dependencies zip for each local WDL file that doesn't have one specified from "
+    "the local files it imports (directly or through other imports), which must be within the "
+    "directory containing the WDL",
+)
 @click.option(
     "--created_by",
     default="",
@@ -167,6 +186,7 @@ def create(
     test_wdl_dependencies,
     eval_wdl,
     eval_wdl_dependencies,
+    build_dependencies,
     created_by
 ):
     """Create template with the specified parameters"""
@@ -183,8 +203,11 @@ def create(
             sys.exit(1)
     # Process pipeline to get id if it's a name
     pipeline_id = dependency_util.get_id_from_id_or_name_and_handle_error(pipeline, pipelines, "pipeline_id", "pipeline")
+    if build_dependencies:
+        test_wdl_dependencies = __build_dependencies(test_wdl, test_wdl_dependencies)
+        eval_wdl_dependencies = __build_dependencies(eval_wdl, eval_wdl_dependencies)
 
-    print(
+    output.print_result(
         templates.create(
             name,
             pipeline_id,
@@ -230,12 +253,54 @@ def create(
     "local file path.  Updating this parameter is allowed only if the specified template has no "
     "non-failed (i.e. successful or currently running) runs associated with it",
 )
-def update(template, name, description, test_wdl, test_wdl_dependencies, eval_wdl, eval_wdl_dependencies):
-    """Update template with TEMPLATE (id or name) with the specified parameters"""
+@click.option(
+    "--build_dependencies",
+    is_flag=True,
+    default=False,
+    help="Build the dependencies zip for each local WDL file that doesn't have one specified from "
+    "the local files it imports (directly or through other imports), which must be within the "
+    "directory containing the WDL",
+)
+@click.option(
+    "--force_upload",
+    is_flag=True,
+    default=False,
+    help="Upload local files even if they are the same as the files last uploaded for the "
+    "template",
+)
+def update(
+    template,
+    name,
+    description,
+    test_wdl,
+    test_wdl_dependencies,
+    eval_wdl,
+    eval_wdl_dependencies,
+    build_dependencies,
+    force_upload
+):
+    """
+    Update template with TEMPLATE (id or name) with the specified parameters.  Local files that
+    haven't changed since they were last uploaded for the template are not uploaded again
+    """
     # Process template to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
+    if build_dependencies:
+        test_wdl_dependencies = __build_dependencies(test_wdl, test_wdl_dependencies)
+        eval_wdl_dependencies = __build_dependencies(eval_wdl, eval_wdl_dependencies)
 
-    print(templates.update(id, name, description, test_wdl, test_wdl_dependencies, eval_wdl, eval_wdl_dependencies))
+    output.print_result(
+        templates.update(
+            id,
+            name,
+            description,
+            test_wdl,
+            test_wdl_dependencies,
+            eval_wdl,
+            eval_wdl_dependencies,
+            force_upload=force_upload
+        )
+    )
 
 
 
@@ -337,6 +402,22 @@ def delete(template, yes):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching run records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
+@click.option(
+    "--prefetch",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="With --all, the number of pages to request in parallel.  Pages are all --limit "
+    "records long, and are still printed in order",
+)
 def find_runs(
     template,
     name,
@@ -355,6 +436,8 @@ def find_runs(
     sort,
     limit,
     offset,
+    all_records,
+    prefetch,
 ):
     """
     Retrieve runs related to the template specified by TEMPLATE (id or name), filtered by the
@@ -369,27 +452,28 @@ def find_runs(
     # Process template to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
 
-    print(
-        runs.find(
-            "templates",
-            id,
-            name,
-            status,
-            test_input,
-            test_options,
-            eval_input,
-            eval_options,
-            test_cromwell_job_id,
-            eval_cromwell_job_id,
-            created_before,
-            created_after,
-            created_by,
-            finished_before,
-            finished_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        runs.find,
+        "templates",
+        id,
+        name,
+        status,
+        test_input,
+        test_options,
+        eval_input,
+        eval_options,
+        test_cromwell_job_id,
+        eval_cromwell_job_id,
+        created_before,
+        created_after,
+        created_by,
+        finished_before,
+        finished_after,
+        sort,
+    )
+    command_util.print_find_results(
+        find_page, limit, offset, all_records, prefetch
     )
 
 
@@ -418,7 +502,7 @@ def subscribe(template, email):
     # Process template to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
 
-    print(templates.subscribe(id, email))
+    output.print_result(templates.subscribe(id, email))
 
 
 @main.command(name="unsubscribe")
@@ -446,7 +530,7 @@ def unsubscribe(template, email):
     # Process template to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
 
-    print(templates.unsubscribe(id, email))
+    output.print_result(templates.unsubscribe(id, email))
 
 
 @main.command(name="map_to_result")
@@ -470,11 +554,11 @@ def map_to_result(template, result, result_key, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for result
-    result_id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
-    print(template_results.create_map(id, result_id, result_key, created_by))
+    # Process template and result to get ids if they're names
+    id, result_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (result, results, "result_id", "result")]
+    )
+    output.print_result(template_results.create_map(id, result_id, result_key, created_by))
 
 
 @main.command(name="find_result_map_by_id")
@@ -485,11 +569,11 @@ def find_result_map_by_id(template, result):
     Retrieve the mapping record from the template specified by TEMPLATE (id or name) to the result
     specified by RESULT (id or name)
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for result
-    result_id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
-    print(template_results.find_map_by_ids(id, result_id))
+    # Process template and result to get ids if they're names
+    id, result_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (result, results, "result_id", "result")]
+    )
+    output.print_result(template_results.find_map_by_ids(id, result_id))
 
 
 @main.command(name="find_result_maps")
@@ -533,6 +617,14 @@ def find_result_map_by_id(template, result):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching map records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find_result_maps(
     template,
     result,
@@ -543,31 +635,28 @@ def find_result_maps(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """
     Retrieve the mapping record from the template specified by ID to the result specified by
     RESULT_ID
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for result
-    if result:
-        result_id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
-    else:
-        result_id = ""
-    print(
-        template_results.find_maps(
-            id,
-            result_id,
-            result_key,
-            created_before,
-            created_after,
-            created_by,
-            sort,
-            limit,
-            offset,
-        )
+    # Process template and result to get ids if they're names (result is optional)
+    id, result_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (result, results, "result_id", "result")]
+    )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        template_results.find_maps,
+        id,
+        result_id,
+        result_key,
+        created_before,
+        created_after,
+        created_by,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="delete_result_map_by_id")
@@ -587,10 +676,10 @@ def delete_result_map_by_id(template, result, yes):
     specified by RESULT (id or name), if the specified template has no non-failed (i.e. successful
     or currently running) runs associated with it
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for result
-    result_id = dependency_util.get_id_from_id_or_name_and_handle_error(result, results, "result_id", "result")
+    # Process template and result to get ids if they're names
+    id, result_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (result, results, "result_id", "result")]
+    )
     command_util.delete_map(id, result_id, yes, template_results, "template", "result")
 
 
@@ -614,11 +703,11 @@ def map_to_report(template, report, created_by):
                 "there must be a value set for email."
             )
             sys.exit(1)
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    print(template_reports.create_map(id, report_id, created_by))
+    # Process template and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (report, reports, "report_id", "report")]
+    )
+    output.print_result(template_reports.create_map(id, report_id, created_by))
 
 
 @main.command(name="find_report_map_by_id")
@@ -629,11 +718,11 @@ def find_report_map_by_id(template, report):
     Retrieve the mapping record from the template specified by TEMPLATE (id or name) to the report
     specified by REPORT (id or name)
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    print(template_reports.find_map_by_ids(id, report_id))
+    # Process template and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (report, reports, "report_id", "report")]
+    )
+    output.print_result(template_reports.find_map_by_ids(id, report_id))
 
 
 @main.command(name="find_report_maps")
@@ -672,6 +761,14 @@ def find_report_map_by_id(template, report):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching map records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find_report_maps(
     template,
     report,
@@ -681,30 +778,27 @@ def find_report_maps(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """
     Retrieve the mapping record from the template specified by ID to the report specified by
     REPORT_ID
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for report
-    if report:
-        report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
-    else:
-        report_id = ""
-    print(
-        template_reports.find_maps(
-            id,
-            report_id,
-            created_before,
-            created_after,
-            created_by,
-            sort,
-            limit,
-            offset,
-        )
+    # Process template and report to get ids if they're names (report is optional)
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (report, reports, "report_id", "report")]
+    )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        template_reports.find_maps,
+        id,
+        report_id,
+        created_before,
+        created_after,
+        created_by,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="delete_report_map_by_id")
@@ -724,8 +818,30 @@ def delete_report_map_by_id(template, report, yes):
     specified by REPORT (id or name), if the specified template has no non-failed (i.e. successful
     or currently running) runs associated with it
     """
-    # Process template to get id if it's a name
-    id = dependency_util.get_id_from_id_or_name_and_handle_error(template, templates, "template_id", "template")
-    # Same for report
-    report_id = dependency_util.get_id_from_id_or_name_and_handle_error(report, reports, "report_id", "report")
+    # Process template and report to get ids if they're names
+    id, report_id = dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [(template, templates, "template_id", "template"), (report, reports, "report_id", "report")]
+    )
     command_util.delete_map(id, report_id, yes, template_reports, "template", "report")
+
+
+def __build_dependencies(wdl, wdl_dependencies):
+    """
+    Returns the dependencies zip to use for wdl: wdl_dependencies if it's set, or the path to a
+    zip built from the local files wdl imports (or an empty string if it doesn't import any, or if
+    wdl isn't set).  Exits if wdl isn't a local file or the zip can't be built
+    """
+    if wdl_dependencies or not wdl:
+        return wdl_dependencies
+    if wdl.startswith(wdl_util.URI_PREFIXES):
+        LOGGER.error(
+            "Can't build the dependencies zip for %s because it's not a local file.  Specify the "
+            "dependencies zip for it instead",
+            wdl,
+        )
+        sys.exit(1)
+    try:
+        return wdl_util.build_dependency_zip(wdl) or ""
+    except wdl_util.WdlImportError as e:
+        LOGGER.error(e.message)
+        sys.exit(1)
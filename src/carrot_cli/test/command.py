@@ -1,12 +1,15 @@
+import functools
 import json
 import logging
 import sys
 
 import click
 
+from .. import batch_util
 from .. import command_util
 from .. import dependency_util
 from .. import file_util
+from .. import output
 from ..config import manager as config
 from ..rest import runs, templates, tests
 
@@ -22,7 +25,7 @@ def main():
 @click.argument("id")
 def find_by_id(id):
     """Retrieve a test by its ID"""
-    print(tests.find_by_id(id))
+    output.print_result(tests.find_by_id(id))
 
 
 @main.command(name="find")
@@ -91,6 +94,14 @@ def find_by_id(id):
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching test records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
 def find(
     test_id,
     template,
@@ -106,6 +117,7 @@ def find(
     sort,
     limit,
     offset,
+    all_records,
 ):
     """Retrieve tests filtered to match the specified parameters"""
     # Process template in case it's a name
@@ -120,24 +132,23 @@ def find(
     test_option_defaults = file_util.read_file_to_json(test_option_defaults)
     eval_option_defaults = file_util.read_file_to_json(eval_option_defaults)
 
-    print(
-        tests.find(
-            test_id,
-            template_id,
-            name,
-            description,
-            test_input_defaults,
-            test_option_defaults,
-            eval_input_defaults,
-            eval_option_defaults,
-            created_by,
-            created_before,
-            created_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        tests.find,
+        test_id,
+        template_id,
+        name,
+        description,
+        test_input_defaults,
+        test_option_defaults,
+        eval_input_defaults,
+        eval_option_defaults,
+        created_by,
+        created_before,
+        created_after,
+        sort,
     )
+    command_util.print_find_results(find_page, limit, offset, all_records)
 
 
 @main.command(name="create")
@@ -204,7 +215,7 @@ def create(
     eval_input_defaults = file_util.read_file_to_json(eval_input_defaults)
     test_option_defaults = file_util.read_file_to_json(test_option_defaults)
     eval_option_defaults = file_util.read_file_to_json(eval_option_defaults)
-    print(
+    output.print_result(
         tests.create(
             name,
             template_id,
@@ -260,7 +271,7 @@ def update(test, name, description, test_input_defaults, test_option_defaults, e
     eval_input_defaults = file_util.read_file_to_json(eval_input_defaults)
     test_option_defaults = file_util.read_file_to_json(test_option_defaults)
     eval_option_defaults = file_util.read_file_to_json(eval_option_defaults)
-    print(tests.update(
+    output.print_result(tests.update(
         id, name, description, test_input_defaults, test_option_defaults, eval_input_defaults, eval_option_defaults
     ))
 
@@ -334,7 +345,55 @@ def run(test, name, test_input, test_options, eval_input, eval_options, created_
     test_options = file_util.read_file_to_json(test_options)
     eval_input = file_util.read_file_to_json(eval_input)
     eval_options = file_util.read_file_to_json(eval_options)
-    print(tests.run(id, name, test_input, test_options, eval_input, eval_options, created_by))
+    output.print_result(tests.run(id, name, test_input, test_options, eval_input, eval_options, created_by))
+
+
+@main.command(name="run_batch")
+@click.argument("manifest")
+@click.option(
+    "--created_by",
+    default="",
+    help="Email of the creator of the runs, for rows in the manifest that don't specify "
+    "created_by.  Defaults to email config variable",
+)
+@click.option(
+    "--parallelism",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="The maximum number of runs to submit at once",
+)
+@click.option(
+    "--rate_limit",
+    default=0.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="The maximum number of runs to submit per second, or 0 for no limit",
+)
+def run_batch(manifest, created_by, parallelism, rate_limit):
+    """
+    Start a run for each row in MANIFEST, a csv file (ending in .csv) with a header row or a json
+    lines file with one json object per line.  Each row must specify a test (id or name), and can
+    specify a name, test_input, test_options, eval_input, eval_options (json files, relative to
+    the directory containing MANIFEST) and created_by for its run.  Prints the status of each row,
+    and exits with an error if any rows failed
+    """
+    rows = batch_util.read_manifest(manifest)
+    # If created_by is not set and there is an email config variable, fill with that
+    if created_by == "":
+        email_config_val = config.load_var_no_error("email")
+        if email_config_val is not None:
+            created_by = email_config_val
+        elif any(not row.get("created_by") for row in rows):
+            LOGGER.error(
+                "No email config variable set.  If a value is not specified for --created by "
+                "or for every row in the manifest, there must be a value set for email."
+            )
+            sys.exit(1)
+    report = batch_util.run_batch(rows, created_by, parallelism, rate_limit)
+    output.print_result(report)
+    if any(row["status"] == "failed" for row in report):
+        sys.exit(1)
 
 
 @main.command(name="find_runs")
@@ -417,6 +476,22 @@ def run(test, name, test_input, test_options, eval_input, eval_options, created_
     "asc(created_at) with offset=1 would return records sorted by when they were created "
     "starting from the second record to be created",
 )
+@click.option(
+    "--all",
+    "all_records",
+    is_flag=True,
+    default=False,
+    help="Retrieve all matching run records, starting at --offset, instead of at most --limit of them. "
+    "Records are fetched and printed a page at a time",
+)
+@click.option(
+    "--prefetch",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="With --all, the number of pages to request in parallel.  Pages are all --limit "
+    "records long, and are still printed in order",
+)
 def find_runs(
     test,
     name,
@@ -435,6 +510,8 @@ def find_runs(
     sort,
     limit,
     offset,
+    all_records,
+    prefetch,
 ):
     """Retrieve runs of the test specified by TEST (id or name), filtered by the specified parameters"""
     # Process test to get id if it's a name
@@ -444,27 +521,28 @@ def find_runs(
     test_options = file_util.read_file_to_json(test_options)
     eval_input = file_util.read_file_to_json(eval_input)
     eval_options = file_util.read_file_to_json(eval_options)
-    print(
-        runs.find(
-            "tests",
-            id,
-            name,
-            status,
-            test_input,
-            test_options,
-            eval_input,
-            eval_options,
-            test_cromwell_job_id,
-            eval_cromwell_job_id,
-            created_before,
-            created_after,
-            created_by,
-            finished_before,
-            finished_after,
-            sort,
-            limit,
-            offset,
-        )
+    # Fill in everything but limit and offset so we can request one page at a time if needed
+    find_page = functools.partial(
+        runs.find,
+        "tests",
+        id,
+        name,
+        status,
+        test_input,
+        test_options,
+        eval_input,
+        eval_options,
+        test_cromwell_job_id,
+        eval_cromwell_job_id,
+        created_before,
+        created_after,
+        created_by,
+        finished_before,
+        finished_after,
+        sort,
+    )
+    command_util.print_find_results(
+        find_page, limit, offset, all_records, prefetch
     )
 
 
@@ -492,7 +570,7 @@ def subscribe(test, email):
             sys.exit(1)
     # Process test to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(test, tests, "test_id", "test")
-    print(tests.subscribe(id, email))
+    output.print_result(tests.subscribe(id, email))
 
 
 @main.command(name="unsubscribe")
@@ -519,4 +597,4 @@ def unsubscribe(test, email):
             sys.exit(1)
     # Process test to get id if it's a name
     id = dependency_util.get_id_from_id_or_name_and_handle_error(test, tests, "test_id", "test")
-    print(tests.unsubscribe(id, email))
+    output.print_result(tests.unsubscribe(id, email))
@@ -0,0 +1,269 @@
+import datetime
+import logging
+import time
+
+from . import output
+from .rest import request_handler, run_status, runs
+from .rest.request_handler import ErrorResponse
+
+LOGGER = logging.getLogger(__name__)
+
+# Exit codes for waiting on runs: all succeeded, at least one failed or was aborted, or we gave up
+# waiting before they all finished
+EXIT_SUCCEEDED = 0
+EXIT_FAILED = 1
+EXIT_TIMED_OUT = 2
+
+# Bounds on how long (in seconds) to wait between polls of a run
+DEFAULT_MIN_POLL_INTERVAL = 5.0
+DEFAULT_MAX_POLL_INTERVAL = 60.0
+
+# Fraction of a run's age to wait between polls, so long-running runs are polled less often
+AGE_POLL_FACTOR = 0.1
+
+# Ways of polling runs: by id, one run at a time, or in batches by the test they belong to
+POLL_STRATEGIES = ("per_run", "by_test")
+
+# Page size for retrieving a test's runs when polling by test
+FIND_RUNS_PAGE_SIZE = 100
+
+# Formats CARROT uses for timestamps, which are in UTC
+TIMESTAMP_FORMATS = ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S")
+
+# Status for a run that we couldn't find, which we treat as failed
+NOT_FOUND_STATUS = "not_found"
+
+
+def watch_runs(
+    run_ids,
+    timeout=None,
+    min_interval=DEFAULT_MIN_POLL_INTERVAL,
+    max_interval=DEFAULT_MAX_POLL_INTERVAL,
+    on_event=None,
+    strategy="per_run",
+):
+    """
+    Polls the runs with ids in run_ids until they have all finished or timeout seconds have passed.
+    Each run is polled on its own schedule, more often while it's young and less often while it's
+    waiting in a queue or has been running for a while, so watching many runs only takes a few
+    requests per interval.  Requests all go through request_handler's pooled session
+
+    Parameters
+    ----------
+    run_ids - the ids of the runs to watch
+    timeout - the maximum number of seconds to wait, or None to wait indefinitely
+    min_interval - the minimum number of seconds between polls of a run
+    max_interval - the maximum number of seconds between polls of a run
+    on_event - optional function to call with a dict describing each change in a run's status
+    strategy - one of POLL_STRATEGIES.  per_run retrieves each run that's due for a poll by its id.
+               by_test groups runs by their test and, whenever any run in a group is due,
+               retrieves all the group's runs with one find_runs query for the test, so the
+               number of requests per poll scales with the number of tests instead of runs
+
+    Returns
+    -------
+    A tuple of a dict mapping each run id to the last record retrieved for it (or an ErrorResponse
+    if it couldn't be retrieved), and an exit code: EXIT_SUCCEEDED if every run succeeded,
+    EXIT_FAILED if any failed, were aborted or couldn't be found, or EXIT_TIMED_OUT if we stopped
+    waiting before they all finished
+    """
+    records = {}
+    statuses = {}
+    next_polls = {run_id: 0.0 for run_id in run_ids}
+
+    def update(run_id, record, now):
+        """Updates the state of run_id based on record, which was just retrieved for it"""
+        status = __get_status(record)
+        if status is None:
+            # Probably a temporary problem, so log it and try again later
+            LOGGER.warning(
+                "Failed to retrieve status of run %s: %s",
+                run_id,
+                output.format_result(record),
+            )
+            records.setdefault(run_id, record)
+            next_polls[run_id] = now + max_interval
+            return
+        records[run_id] = record
+        if status != statuses.get(run_id):
+            if on_event is not None:
+                on_event(__status_event(run_id, record, status, statuses.get(run_id)))
+            statuses[run_id] = status
+        if status == NOT_FOUND_STATUS or run_status.is_terminal(status):
+            del next_polls[run_id]
+        else:
+            next_polls[run_id] = now + __poll_interval(record, status, min_interval, max_interval)
+
+    start_time = time.monotonic()
+    while next_polls:
+        now = time.monotonic()
+        due = [run_id for run_id, next_poll in next_polls.items() if next_poll <= now]
+        if strategy == "by_test":
+            found = __poll_by_test(due, next_polls, records)
+            # Poll everything that was in a group with a due run, along with any due runs that
+            # we couldn't retrieve as part of a group
+            due = list(found) + [run_id for run_id in due if run_id not in found]
+        else:
+            found = {}
+        for run_id in due:
+            record = found[run_id] if run_id in found else runs.find_by_id(run_id)
+            update(run_id, record, now)
+        if not next_polls:
+            break
+        # Sleep until the next run is due, or until we time out
+        wake_time = min(next_polls.values())
+        if timeout is not None:
+            if time.monotonic() - start_time >= timeout:
+                LOGGER.error("Timed out waiting for %i run(s) to finish", len(next_polls))
+                return records, EXIT_TIMED_OUT
+            wake_time = min(wake_time, start_time + timeout)
+        time.sleep(max(0.0, wake_time - time.monotonic()))
+    if all(statuses.get(run_id) == "succeeded" for run_id in run_ids):
+        return records, EXIT_SUCCEEDED
+    return records, EXIT_FAILED
+
+
+def __poll_by_test(due, pending, records):
+    """
+    Retrieves the current records for runs in pending by test, with one find_runs query for each
+    test that has at least two pending runs, including one in due.  Runs whose test isn't known
+    yet (because they haven't been retrieved before) aren't included
+
+    Parameters
+    ----------
+    due - the ids of runs that are due to be polled
+    pending - the ids of all the runs that haven't finished
+    records - a dict mapping run ids to the last record retrieved for them
+
+    Returns
+    -------
+    A dict mapping run ids to their current records, for runs that were retrieved
+    """
+    groups = {}
+    for run_id in pending:
+        record = records.get(run_id)
+        if isinstance(record, dict) and record.get("test_id") is not None:
+            groups.setdefault(record["test_id"], []).append(run_id)
+    due = set(due)
+    found = {}
+    for test_id, group in groups.items():
+        # A single run is cheaper to retrieve by itself
+        if len(group) < 2 or due.isdisjoint(group):
+            continue
+        found.update(__find_runs_for_test(test_id, group, records))
+    return found
+
+
+def __find_runs_for_test(test_id, run_ids, records):
+    """
+    Retrieves the runs with ids in run_ids, which all belong to the test with test_id, with a
+    single find_runs query for that test, filtered to runs created no earlier than the oldest of
+    them
+
+    Parameters
+    ----------
+    test_id - the id of the test the runs belong to
+    run_ids - the ids of the runs to retrieve
+    records - a dict mapping run ids to the last record retrieved for them, used to get the
+              earliest created_at
+
+    Returns
+    -------
+    A dict mapping run ids to their current records, for the runs in run_ids that were found
+    """
+    created_after = __earliest_created_at(run_ids, records)
+
+    def find_page(limit, offset):
+        return runs.find(
+            parent_entity="tests",
+            parent_entity_id=test_id,
+            created_after=created_after,
+            sort="asc(created_at)",
+            limit=limit,
+            offset=offset,
+        )
+
+    wanted = set(run_ids)
+    found = {}
+    try:
+        for record in request_handler.paginate(find_page, FIND_RUNS_PAGE_SIZE):
+            if isinstance(record, dict) and record.get("run_id") in wanted:
+                found[record["run_id"]] = record
+                # Stop early once we have everything, so we don't page through later runs
+                if len(found) == len(wanted):
+                    break
+    except request_handler.PaginationError as e:
+        LOGGER.warning(
+            "Failed to retrieve runs for test %s: %s", test_id, output.format_result(e.response)
+        )
+    return found
+
+
+def __earliest_created_at(run_ids, records):
+    """
+    Returns a timestamp just before the earliest created_at in the records for run_ids, for use
+    as a created_after filter, or an empty string (meaning no filter) if any are missing one
+    """
+    earliest = None
+    for run_id in run_ids:
+        created_at = __parse_timestamp(records[run_id].get("created_at"))
+        if created_at is None:
+            return ""
+        if earliest is None or created_at < earliest:
+            earliest = created_at
+    # Back up a second in case created_after doesn't include runs created at exactly that time
+    return (earliest - datetime.timedelta(seconds=1)).strftime(TIMESTAMP_FORMATS[0])
+
+
+def __get_status(record):
+    """
+    Returns the status of record, NOT_FOUND_STATUS if record is a 404 response, or None if the
+    status couldn't be retrieved for some other reason
+    """
+    if isinstance(record, dict) and isinstance(record.get("status"), str):
+        return record["status"]
+    if isinstance(record, ErrorResponse) and record.status == 404:
+        return NOT_FOUND_STATUS
+    return None
+
+
+def __status_event(run_id, record, status, previous_status):
+    """Returns a dict describing run_id's status changing from previous_status to status"""
+    return {
+        "event": "status_changed",
+        "run_id": run_id,
+        "name": record.get("name") if isinstance(record, dict) else None,
+        "previous_status": previous_status,
+        "status": status,
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+    }
+
+
+def __poll_interval(record, status, min_interval, max_interval):
+    """
+    Returns the number of seconds to wait before polling the run described by record again.  Runs
+    are polled in proportion to their age, since a run that has been going for an hour is unlikely
+    to finish in the next few seconds, and half as often while waiting in a queue or building
+    """
+    interval = max(min_interval, __age_seconds(record) * AGE_POLL_FACTOR)
+    if status == "building" or "queue" in status or status.startswith("waiting"):
+        interval *= 2
+    return min(interval, max_interval)
+
+
+def __age_seconds(record):
+    """Returns the number of seconds since the run described by record was created, or 0"""
+    created_at = __parse_timestamp(record.get("created_at"))
+    if created_at is None:
+        return 0.0
+    return max(0.0, (datetime.datetime.utcnow() - created_at).total_seconds())
+
+
+def __parse_timestamp(timestamp):
+    """Parses timestamp, a timestamp string from CARROT, as a datetime, or returns None if invalid"""
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return datetime.datetime.strptime(timestamp, timestamp_format)
+        except (TypeError, ValueError):
+            continue
+    return None
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import zipfile
+
+from . import file_util
+
+LOGGER = logging.getLogger(__name__)
+
+# Directory for built dependency zips, which are named after the hash of the files in them, so a
+# zip is only built once for each version of an import graph
+DEPENDENCY_ZIP_DIR = "~/.carrot_cli/wdl_dependencies"
+
+# Matches the location in a WDL import statement, e.g. import "tasks/align.wdl" as align
+IMPORT_PATTERN = re.compile(r"""^\s*import\s+(["'])(?P<location>[^"']+)\1""")
+
+# Prefixes for imports the engine retrieves itself, which don't go in the zip
+URI_PREFIXES = ("http://", "https://", "gs://")
+
+# Timestamp given to every file in a zip (the earliest a zip can hold), so zips of the same files
+# are identical
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Size of the chunks files are read in when copying them into zips
+CHUNK_SIZE = 1024 * 1024
+
+
+class WdlImportError(Exception):
+    """Represents a problem with the import graph of a WDL, described by message"""
+
+    # Constructor takes a message describing the problem
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def find_imports(wdl_path):
+    """
+    Returns the locations of the files imported by the WDL at wdl_path, in the order they are
+    imported, or raises a WdlImportError if it can't be read
+    """
+    imports = []
+    try:
+        with open(wdl_path, "r") as wdl_file:
+            for line in wdl_file:
+                match = IMPORT_PATTERN.match(line)
+                if match:
+                    imports.append(match.group("location"))
+    except OSError as e:
+        raise WdlImportError(f"Failed to read {wdl_path}: {e}")
+    except UnicodeDecodeError as e:
+        raise WdlImportError(f"Failed to read {wdl_path} as text: {e}")
+    return imports
+
+
+def resolve_import_graph(wdl_path):
+    """
+    Finds every local file imported by the WDL at wdl_path, directly or through other imports.
+    Imports are resolved relative to the file that imports them, and every imported file must be
+    within the directory containing wdl_path, which is the root of the zip they're put in.  Imports
+    of http, https and gs URIs are left for the engine to retrieve
+
+    Returns
+    -------
+    A list of tuples of the path of each imported file within the zip and its path on disk, sorted
+    by path within the zip.  Raises a WdlImportError if a file can't be read or is outside the
+    root directory
+    """
+    root_dir = os.path.dirname(os.path.abspath(wdl_path))
+    root_path = os.path.abspath(wdl_path)
+    files = {}
+    to_visit = [root_path]
+    visited = {root_path}
+    while to_visit:
+        importer = to_visit.pop()
+        for location in find_imports(importer):
+            if location.startswith(URI_PREFIXES):
+                continue
+            path = os.path.normpath(os.path.join(os.path.dirname(importer), location))
+            if path in visited:
+                continue
+            visited.add(path)
+            arcname = os.path.relpath(path, root_dir)
+            if arcname == os.pardir or arcname.startswith(os.pardir + os.sep):
+                raise WdlImportError(
+                    f"{importer} imports {location}, which is outside {root_dir}.  Imports must be "
+                    "within the directory containing the WDL"
+                )
+            files[arcname.replace(os.sep, "/")] = path
+            to_visit.append(path)
+    return sorted(files.items())
+
+
+def build_dependency_zip(wdl_path):
+    """
+    Builds a zip of the files imported by the WDL at wdl_path, as found by resolve_import_graph, in
+    the format the engine expects for WDL dependencies.  The zip is deterministic (the same files
+    always produce the same bytes) and named after a hash of the files in it, so it's only rebuilt
+    when a file in the import graph changes, and an unchanged zip can be recognized as already
+    uploaded.  Files are streamed into the zip without being copied anywhere first
+
+    Returns
+    -------
+    The path to the zip, or None if the WDL doesn't import any local files.  Raises a
+    WdlImportError if the import graph can't be resolved or the zip can't be written
+    """
+    files = resolve_import_graph(wdl_path)
+    if not files:
+        LOGGER.debug("%s doesn't import any local files, so there are no dependencies", wdl_path)
+        return None
+    file_hashes = [(arcname, __hash_file(path)) for arcname, path in files]
+    graph_hash = hashlib.sha256(json.dumps(file_hashes).encode()).hexdigest()
+    zip_path = os.path.join(os.path.expanduser(DEPENDENCY_ZIP_DIR), f"{graph_hash}.zip")
+    if os.path.exists(zip_path):
+        LOGGER.debug("Using previously built dependencies zip %s for %s", zip_path, wdl_path)
+        return zip_path
+    LOGGER.info("Building dependencies zip for %s with %i files", wdl_path, len(files))
+    try:
+        with file_util.atomic_write_path(zip_path) as temp_path:
+            with zipfile.ZipFile(temp_path, "w") as dependency_zip:
+                for arcname, path in files:
+                    info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    with open(path, "rb") as source, dependency_zip.open(info, "w") as dest:
+                        shutil.copyfileobj(source, dest, CHUNK_SIZE)
+    except OSError as e:
+        raise WdlImportError(f"Failed to build dependencies zip for {wdl_path}: {e}")
+    return zip_path
+
+
+def clear_dependency_zips():
+    """Deletes all the built dependency zips"""
+    shutil.rmtree(os.path.expanduser(DEPENDENCY_ZIP_DIR), ignore_errors=True)
+
+
+def __hash_file(path):
+    """
+    Returns the hex sha256 digest of the contents of the file at path.  Raises a WdlImportError if
+    it can't be read
+    """
+    try:
+        return file_util.hash_file(path)
+    except OSError as e:
+        raise WdlImportError(f"Failed to read {path}: {e}")
@@ -0,0 +1,116 @@
+import json
+
+from click.testing import CliRunner
+
+import mockito
+import pytest
+from carrot_cli.__main__ import main_entry as carrot
+from carrot_cli.apply import spec as spec_util
+from carrot_cli.config import manager as config
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def no_email():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+
+
+ITEMS = [{"entity": "pipelines", "name": "Sword pipeline", "fields": {}, "parent": None}]
+
+CHANGES = [
+    {
+        "action": "create",
+        "entity": "pipelines",
+        "name": "Sword pipeline",
+        "fields": {},
+        "parent": None,
+    }
+]
+
+
+def test_apply():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=False).thenReturn((CHANGES, {}))
+    reports = [{"action": "create", "entity": "pipelines", "status": "succeeded", "id": "p1"}]
+    mockito.when(spec_util).apply_changes(
+        CHANGES, {}, "adora@example.com", 2, force_upload=False
+    ).thenReturn(reports)
+    runner = CliRunner()
+    result = runner.invoke(
+        carrot,
+        ["apply", "spec.json", "--created_by", "adora@example.com", "--parallelism", 2],
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output) == reports
+
+
+def test_apply_force_upload():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=True).thenReturn((CHANGES, {}))
+    reports = [{"action": "create", "entity": "pipelines", "status": "succeeded", "id": "p1"}]
+    mockito.when(spec_util).apply_changes(
+        CHANGES, {}, "adora@example.com", 4, force_upload=True
+    ).thenReturn(reports)
+    runner = CliRunner()
+    result = runner.invoke(
+        carrot, ["apply", "spec.json", "--created_by", "adora@example.com", "--force_upload"]
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output) == reports
+
+
+def test_apply_failed():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=False).thenReturn((CHANGES, {}))
+    reports = [{"action": "create", "entity": "pipelines", "status": "failed", "error": "500"}]
+    mockito.when(spec_util).apply_changes(...).thenReturn(reports)
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["apply", "spec.json", "--created_by", "adora@example.com"])
+    assert result.exit_code == 1
+    assert json.loads(result.output) == reports
+
+
+def test_apply_dry_run():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=False).thenReturn((CHANGES, {}))
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["apply", "spec.json", "--dry_run"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == [
+        {"action": "create", "entity": "pipelines", "name": "Sword pipeline"}
+    ]
+    mockito.verify(spec_util, times=0).apply_changes(...)
+
+
+def test_apply_up_to_date():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=False).thenReturn(([], {}))
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["apply", "spec.json"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == []
+    mockito.verify(spec_util, times=0).apply_changes(...)
+
+
+def test_apply_no_email():
+    mockito.when(spec_util).load_spec("spec.json").thenReturn(ITEMS)
+    mockito.when(spec_util).plan(ITEMS, force_upload=False).thenReturn((CHANGES, {}))
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["apply", "spec.json"])
+    assert result.exit_code == 1
+    mockito.verify(spec_util, times=0).apply_changes(...)
+
+
+def test_apply_invalid_spec(caplog):
+    mockito.when(spec_util).load_spec("spec.json").thenRaise(
+        spec_util.SpecError("Failed to read spec.json")
+    )
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["apply", "spec.json"])
+    assert result.exit_code == 1
+    assert "Failed to read spec.json" in caplog.text
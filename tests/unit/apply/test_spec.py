@@ -0,0 +1,451 @@
+import hashlib
+import json
+
+import mockito
+import pytest
+from carrot_cli import wdl_util
+from carrot_cli.apply import spec as spec_util
+from carrot_cli.rest import (
+    pipelines,
+    reports,
+    request_handler,
+    results,
+    template_reports,
+    template_results,
+    templates,
+    tests,
+    upload_manifest,
+)
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture
+def spec_file(tmp_path):
+    (tmp_path / "inputs.json").write_text(json.dumps({"in_file": "gs://example/in.vcf"}))
+    spec = {
+        "pipelines": [
+            {
+                "name": "Sword pipeline",
+                "description": "The sword",
+                "templates": [
+                    {
+                        "name": "Sword template",
+                        "test_wdl": "gs://example/test.wdl",
+                        "eval_wdl": "gs://example/eval.wdl",
+                        "tests": [
+                            {"name": "Sword test", "test_input_defaults": "inputs.json"}
+                        ],
+                        "results": [{"name": "Sword result", "result_key": "out_vcf"}],
+                        "reports": [{"name": "Sword report"}],
+                    }
+                ],
+            }
+        ],
+        "results": [{"name": "Sword result", "result_type": "file"}],
+        "reports": [{"name": "Sword report", "notebook": {"cells": []}}],
+    }
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec))
+    return str(path)
+
+
+def not_found():
+    return request_handler.ErrorResponse(status=404, message="No records found")
+
+
+def stub_existing(existing=None, template_results_maps=None, template_reports_maps=None):
+    """Stubs the find functions to return the records in existing, keyed by (entity, name)"""
+    existing = existing or {}
+    for entity, module in (
+        ("pipelines", pipelines),
+        ("templates", templates),
+        ("tests", tests),
+        ("results", results),
+        ("reports", reports),
+    ):
+        mockito.when(module).find(name=mockito.ANY, limit=2).thenReturn(not_found())
+    for (entity, name), record in existing.items():
+        module = spec_util.ENTITIES[entity]["module"]
+        mockito.when(module).find(name=name, limit=2).thenReturn([record])
+    mockito.when(template_results).find_maps(...).thenReturn(template_results_maps or [])
+    mockito.when(template_reports).find_maps(...).thenReturn(template_reports_maps or [])
+
+
+EXISTING = {
+    ("pipelines", "Sword pipeline"): {
+        "pipeline_id": "p1",
+        "name": "Sword pipeline",
+        "description": "The sword",
+    },
+    ("templates", "Sword template"): {
+        "template_id": "t1",
+        "pipeline_id": "p1",
+        "name": "Sword template",
+        "description": None,
+        "test_wdl": "gs://example/test.wdl",
+        "test_wdl_dependencies": None,
+        "eval_wdl": "gs://example/eval.wdl",
+        "eval_wdl_dependencies": None,
+    },
+    ("tests", "Sword test"): {
+        "test_id": "s1",
+        "template_id": "t1",
+        "name": "Sword test",
+        "description": None,
+        "test_input_defaults": {"in_file": "gs://example/in.vcf"},
+        "test_option_defaults": None,
+        "eval_input_defaults": None,
+        "eval_option_defaults": None,
+    },
+    ("results", "Sword result"): {
+        "result_id": "r1",
+        "name": "Sword result",
+        "description": None,
+        "result_type": "file",
+    },
+    ("reports", "Sword report"): {
+        "report_id": "n1",
+        "name": "Sword report",
+        "description": None,
+        "notebook": {"cells": []},
+        "config": None,
+    },
+}
+
+
+def test_load_spec(spec_file):
+    items = spec_util.load_spec(spec_file)
+    assert [(item["entity"], item.get("name")) for item in items] == [
+        ("pipelines", "Sword pipeline"),
+        ("templates", "Sword template"),
+        ("tests", "Sword test"),
+        ("template_results", None),
+        ("template_reports", None),
+        ("results", "Sword result"),
+        ("reports", "Sword report"),
+    ]
+    # Json files should be loaded relative to the spec
+    assert items[2]["fields"]["test_input_defaults"] == {"in_file": "gs://example/in.vcf"}
+    assert items[3]["result_key"] == "out_vcf"
+
+
+def test_flatten_spec_build_dependencies(tmp_path):
+    template = {
+        "name": "Sword template",
+        "test_wdl": "test.wdl",
+        "eval_wdl": "eval.wdl",
+        "eval_wdl_dependencies": "eval_deps.zip",
+        "build_dependencies": True,
+    }
+    mockito.when(wdl_util).build_dependency_zip(str(tmp_path / "test.wdl")).thenReturn(
+        "/home/adora/test_deps.zip"
+    )
+    items = spec_util.flatten_spec(
+        {"pipelines": [{"name": "Sword pipeline", "templates": [template]}]}, str(tmp_path)
+    )
+    # Only the WDL without a dependencies zip should have one built
+    assert items[1]["fields"]["test_wdl_dependencies"] == "/home/adora/test_deps.zip"
+    assert items[1]["fields"]["eval_wdl_dependencies"] == str(tmp_path / "eval_deps.zip")
+    mockito.verify(wdl_util, times=1).build_dependency_zip(...)
+
+
+@pytest.fixture(
+    params=[
+        ({"pipelines": [{"description": "No name"}]}, "must have a name"),
+        ({"results": [{"name": "Sword result"}]}, "must have a result_type"),
+        ({"pipelines": [{"name": "Sword", "color": "silver"}]}, "Unrecognized fields"),
+        ({"pipelines": [{"name": "Sword"}, {"name": "Sword"}]}, "more than once"),
+        ({"runs": []}, "Unrecognized keys"),
+    ]
+)
+def invalid_spec_data(request):
+    return request.param
+
+
+def test_flatten_spec_invalid(invalid_spec_data, tmp_path):
+    spec, message = invalid_spec_data
+    with pytest.raises(spec_util.SpecError, match=message):
+        spec_util.flatten_spec(spec, str(tmp_path))
+
+
+def test_plan_nothing_exists(spec_file):
+    stub_existing()
+    changes, ids = spec_util.plan(spec_util.load_spec(spec_file))
+    assert ids == {}
+    assert [(change["action"], change["entity"]) for change in changes] == [
+        ("create", "pipelines"),
+        ("create", "results"),
+        ("create", "reports"),
+        ("create", "templates"),
+        ("create", "tests"),
+        ("map", "template_results"),
+        ("map", "template_reports"),
+    ]
+
+
+def test_plan_up_to_date(spec_file):
+    stub_existing(
+        EXISTING,
+        [{"template_id": "t1", "result_id": "r1", "result_key": "out_vcf"}],
+        [{"template_id": "t1", "report_id": "n1"}],
+    )
+    changes, ids = spec_util.plan(spec_util.load_spec(spec_file))
+    assert changes == []
+    assert ids[("templates", "Sword template")] == "t1"
+
+
+def test_plan_update(spec_file):
+    existing = dict(EXISTING)
+    existing[("pipelines", "Sword pipeline")] = dict(
+        EXISTING[("pipelines", "Sword pipeline")], description="The old sword"
+    )
+    stub_existing(existing, [], [{"template_id": "t1", "report_id": "n1"}])
+    changes, _ = spec_util.plan(spec_util.load_spec(spec_file))
+    assert [spec_util.describe_change(change) for change in changes] == [
+        {
+            "action": "update",
+            "entity": "pipelines",
+            "name": "Sword pipeline",
+            "fields": ["description"],
+        },
+        {
+            "action": "map",
+            "entity": "template_results",
+            "template": "Sword template",
+            "result": "Sword result",
+            "result_key": "out_vcf",
+        },
+    ]
+
+
+@pytest.fixture(
+    params=[
+        # The same file was uploaded last time
+        {"uploaded": "same", "changed": False},
+        # A different file was uploaded last time
+        {"uploaded": "different", "changed": True},
+        # There's no record of an upload, so we can't tell whether it's changed
+        {"uploaded": None, "changed": False},
+        {"uploaded": "same", "force_upload": True, "changed": True},
+        {"uploaded": None, "force_upload": True, "changed": True},
+    ]
+)
+def local_wdl_data(request, tmp_path):
+    (tmp_path / "test.wdl").write_text("workflow sword {}")
+    spec = {
+        "pipelines": [
+            {
+                "name": "Sword pipeline",
+                "description": "The sword",
+                "templates": [
+                    {
+                        "name": "Sword template",
+                        "test_wdl": "test.wdl",
+                        "eval_wdl": "gs://example/eval.wdl",
+                    }
+                ],
+            }
+        ]
+    }
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec))
+    upload = None
+    if request.param["uploaded"] is not None:
+        contents = "workflow sword {}"
+        if request.param["uploaded"] == "different":
+            contents = "workflow shield {}"
+        upload = {
+            "sha256": hashlib.sha256(contents.encode()).hexdigest(),
+            "location": "gs://carrot/test.wdl",
+            "uploaded_at": 1600000000.0,
+        }
+    mockito.when(upload_manifest).get_upload("t1", "test_wdl").thenReturn(upload)
+    return {"spec_file": str(path), **request.param}
+
+
+def test_plan_local_wdl(local_wdl_data):
+    existing = dict(EXISTING)
+    existing[("templates", "Sword template")] = dict(
+        EXISTING[("templates", "Sword template")], test_wdl="gs://carrot/test.wdl"
+    )
+    stub_existing(existing)
+    changes, _ = spec_util.plan(
+        spec_util.load_spec(local_wdl_data["spec_file"]),
+        force_upload=local_wdl_data.get("force_upload", False),
+    )
+    # The WDL should only be uploaded again if it's changed since it was last uploaded, or if
+    # the upload is forced
+    if local_wdl_data["changed"]:
+        assert [spec_util.describe_change(change) for change in changes] == [
+            {
+                "action": "update",
+                "entity": "templates",
+                "name": "Sword template",
+                "fields": ["test_wdl"],
+            }
+        ]
+    else:
+        assert changes == []
+
+
+@pytest.fixture(
+    params=[
+        (("results", "Sword result"), {"result_type": "numeric"}, "result_type"),
+        (("templates", "Sword template"), {"pipeline_id": "p2"}, "different pipeline"),
+        (("tests", "Sword test"), {"template_id": "t2"}, "different template"),
+    ]
+)
+def immutable_data(request):
+    return request.param
+
+
+def test_plan_immutable_mismatch(spec_file, immutable_data):
+    key, changed_fields, message = immutable_data
+    existing = dict(EXISTING)
+    existing[key] = dict(EXISTING[key], **changed_fields)
+    stub_existing(existing)
+    with pytest.raises(spec_util.SpecError, match=message):
+        spec_util.plan(spec_util.load_spec(spec_file))
+
+
+@pytest.mark.parametrize("on_server", [True, False])
+def test_plan_mapped_record_missing(tmp_path, on_server):
+    spec = {
+        "pipelines": [
+            {
+                "name": "Sword pipeline",
+                "templates": [
+                    {
+                        "name": "Sword template",
+                        "test_wdl": "gs://example/test.wdl",
+                        "eval_wdl": "gs://example/eval.wdl",
+                        "results": [{"name": "Shield result", "result_key": "out_vcf"}],
+                    }
+                ],
+            }
+        ]
+    }
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec))
+    existing = {}
+    if on_server:
+        existing[("results", "Shield result")] = {"result_id": "r2", "name": "Shield result"}
+    stub_existing(existing)
+    items = spec_util.load_spec(str(path))
+    # A mapping to a result that's neither in the spec nor on the server should be rejected
+    # before anything is created
+    if on_server:
+        changes, _ = spec_util.plan(items)
+        assert changes[-1]["action"] == "map"
+    else:
+        with pytest.raises(spec_util.SpecError, match="result Shield result is not in the spec"):
+            spec_util.plan(items)
+
+
+def test_plan_result_key_mismatch(spec_file):
+    stub_existing(
+        EXISTING, [{"template_id": "t1", "result_id": "r1", "result_key": "other_key"}]
+    )
+    with pytest.raises(spec_util.SpecError, match="result_key"):
+        spec_util.plan(spec_util.load_spec(spec_file))
+
+
+def test_apply_changes(spec_file):
+    stub_existing()
+    changes, ids = spec_util.plan(spec_util.load_spec(spec_file))
+    mockito.when(pipelines).create("Sword pipeline", "The sword", "adora@example.com").thenReturn(
+        {"pipeline_id": "p1"}
+    )
+    mockito.when(results).create("Sword result", "", "file", "adora@example.com").thenReturn(
+        {"result_id": "r1"}
+    )
+    mockito.when(reports).create(
+        "Sword report", "", {"cells": []}, "", "adora@example.com"
+    ).thenReturn(request_handler.ErrorResponse(status=500, message="Server error"))
+    mockito.when(templates).create(
+        "Sword template",
+        "p1",
+        "",
+        "gs://example/test.wdl",
+        "",
+        "gs://example/eval.wdl",
+        "",
+        "adora@example.com",
+    ).thenReturn({"template_id": "t1"})
+    mockito.when(tests).create(
+        "Sword test",
+        "t1",
+        "",
+        {"in_file": "gs://example/in.vcf"},
+        "",
+        "",
+        "",
+        "adora@example.com",
+    ).thenReturn({"test_id": "s1"})
+    mockito.when(template_results).create_map(
+        "t1", "r1", "out_vcf", "adora@example.com"
+    ).thenReturn({"template_id": "t1", "result_id": "r1"})
+    change_reports = spec_util.apply_changes(changes, ids, "adora@example.com", 2)
+    assert [(report["entity"], report["status"]) for report in change_reports] == [
+        ("pipelines", "succeeded"),
+        ("results", "succeeded"),
+        ("reports", "failed"),
+        ("templates", "succeeded"),
+        ("tests", "succeeded"),
+        ("template_results", "succeeded"),
+        ("template_reports", "skipped"),
+    ]
+    assert change_reports[4]["id"] == "s1"
+    assert "Report Sword report was not created" in change_reports[6]["error"]
+    # The report's mapping should never be attempted
+    mockito.verify(template_reports, times=0).create_map(...)
+
+
+def test_apply_changes_update():
+    changes = [
+        {
+            "action": "update",
+            "entity": "reports",
+            "name": "Sword report",
+            "fields": {"config": {"cpu": 2}},
+        }
+    ]
+    mockito.when(reports).update("n1", "", "", "", {"cpu": 2}).thenReturn(
+        {"report_id": "n1"}
+    )
+    change_reports = spec_util.apply_changes(
+        changes, {("reports", "Sword report"): "n1"}, "adora@example.com", 1
+    )
+    assert change_reports == [
+        {
+            "action": "update",
+            "entity": "reports",
+            "name": "Sword report",
+            "fields": ["config"],
+            "status": "succeeded",
+            "id": "n1",
+        }
+    ]
+
+
+def test_apply_changes_force_upload():
+    changes = [
+        {
+            "action": "update",
+            "entity": "templates",
+            "name": "Sword template",
+            "fields": {"test_wdl": "test.wdl"},
+        }
+    ]
+    mockito.when(templates).update(
+        "t1", "", "", "test.wdl", "", "", "", force_upload=True
+    ).thenReturn({"template_id": "t1"})
+    change_reports = spec_util.apply_changes(
+        changes, {("templates", "Sword template"): "t1"}, "adora@example.com", 1, force_upload=True
+    )
+    assert change_reports[0]["status"] == "succeeded"
@@ -0,0 +1,48 @@
+from click.testing import CliRunner
+
+import mockito
+import pytest
+from carrot_cli.__main__ import main_entry as carrot
+from carrot_cli import wdl_util
+from carrot_cli.config import manager as config
+from carrot_cli.rest import name_cache, response_cache, upload_manifest
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def no_config():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+
+
+@pytest.fixture(
+    params=[
+        {"args": ["cache", "clear"], "entity": None, "clears_uploads": True},
+        {
+            "args": ["cache", "clear", "--entity", "templates"],
+            "entity": "templates",
+            "clears_uploads": True,
+        },
+        {"args": ["cache", "clear", "--entity", "runs"], "entity": "runs", "clears_uploads": False},
+    ]
+)
+def clear_data(request):
+    mockito.when(name_cache).clear(...).thenReturn(None)
+    mockito.when(response_cache).clear(...).thenReturn(None)
+    mockito.when(upload_manifest).clear().thenReturn(None)
+    mockito.when(wdl_util).clear_dependency_zips().thenReturn(None)
+    return request.param
+
+
+def test_clear(clear_data):
+    runner = CliRunner()
+    result = runner.invoke(carrot, clear_data["args"])
+    assert result.output == "Success!\n"
+    mockito.verify(name_cache).clear(clear_data["entity"])
+    mockito.verify(response_cache).clear(clear_data["entity"])
+    mockito.verify(upload_manifest, times=int(clear_data["clears_uploads"])).clear()
+    mockito.verify(wdl_util, times=int(clear_data["entity"] is None)).clear_dependency_zips()
@@ -0,0 +1,94 @@
+import json
+import os
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture
+def config_home(home, monkeypatch):
+    for var_name in config.CONFIG_VARIABLES:
+        monkeypatch.delenv(config.ENV_VAR_PREFIX + var_name.upper(), raising=False)
+    config.create_config_dir_if_not_exists()
+    return home
+
+
+@pytest.fixture(
+    params=[
+        {
+            "config": {"carrot_server_address": "example.com", "email": "adora@example.com"},
+            "env": {},
+            "var_name": "email",
+            "return": "adora@example.com",
+        },
+        {
+            "config": {"carrot_server_address": "example.com"},
+            "env": {},
+            "var_name": "email",
+            "return": None,
+        },
+        {
+            "config": {"carrot_server_address": "example.com", "email": "adora@example.com"},
+            "env": {"CARROT_CLI_EMAIL": "catra@example.com"},
+            "var_name": "email",
+            "return": "catra@example.com",
+        },
+    ]
+)
+def load_var_no_error_data(request, config_home, monkeypatch):
+    with open(os.path.join(config_home, ".carrot_cli", "config.json"), "w") as config_file:
+        json.dump(request.param["config"], config_file)
+    for env_var, value in request.param["env"].items():
+        monkeypatch.setenv(env_var, value)
+    return request.param
+
+
+def test_load_var_no_error(load_var_no_error_data):
+    result = config.load_var_no_error(load_var_no_error_data["var_name"])
+    assert result == load_var_no_error_data["return"]
+
+
+def test_load_var_no_error_caches_config(config_home):
+    config.set_var("email", "adora@example.com")
+    assert config.load_var_no_error("email") == "adora@example.com"
+    # Now that it's cached, loading it again shouldn't open the file
+    mockito.spy2(json.load)
+    assert config.load_var_no_error("email") == "adora@example.com"
+    mockito.verify(json, times=0).load(...)
+
+
+def test_load_var_no_error_reloads_changed_config(config_home):
+    config.set_var("email", "adora@example.com")
+    assert config.load_var_no_error("email") == "adora@example.com"
+    # Change the file out from under the cache
+    with open(os.path.join(config_home, ".carrot_cli", "config.json"), "w") as config_file:
+        json.dump({"email": "glimmer@example.com", "carrot_server_address": "example.com"}, config_file)
+    assert config.load_var_no_error("email") == "glimmer@example.com"
+
+
+@pytest.fixture(
+    params=[
+        {"value": None, "default": 10, "return": 10},
+        {"value": "32", "default": 10, "return": 32},
+        {"value": "lots", "default": 10, "return": 10},
+        {"value": "2.5", "default": 1.0, "return": 2.5},
+        {"value": "false", "default": True, "return": False},
+        {"value": "yes", "default": False, "return": True},
+        {"value": "maybe", "default": False, "return": False},
+    ]
+)
+def load_var_with_default_data(request):
+    mockito.when(config).load_var_no_error("test_var").thenReturn(request.param["value"])
+    return request.param
+
+
+def test_load_var_with_default(load_var_with_default_data):
+    result = config.load_var_with_default("test_var", load_var_with_default_data["default"])
+    assert result == load_var_with_default_data["return"]
@@ -0,0 +1,289 @@
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.mirror import database
+from carrot_cli.rest import pipelines, reports, results, runs, templates, tests
+from carrot_cli.rest.request_handler import ErrorResponse
+
+NOT_FOUND = ErrorResponse(status=404, body={"title": "No records found"})
+
+PIPELINE = {
+    "pipeline_id": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+    "name": "Sword of Protection pipeline",
+    "description": "This pipeline will save Etheria",
+    "created_by": "adora@example.com",
+    "created_at": "2020-09-16T18:48:06.371563",
+}
+TEMPLATE = {
+    "template_id": "4d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8",
+    "pipeline_id": PIPELINE["pipeline_id"],
+    "name": "Sword of Protection template",
+    "description": "",
+    "test_wdl": "example.com/test.wdl",
+    "eval_wdl": "example.com/eval.wdl",
+    "created_by": "adora@example.com",
+    "created_at": "2020-09-16T18:49:06.371563",
+}
+TEST = {
+    "test_id": "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8",
+    "template_id": TEMPLATE["template_id"],
+    "name": "Sword of Protection test",
+    "description": "",
+    "test_input_defaults": {"in_greeted": "Cool Person"},
+    "created_by": "adora@example.com",
+    "created_at": "2020-09-16T18:50:06.371563",
+}
+
+
+def run(run_id, status, created_at, finished_at=None):
+    return {
+        "run_id": run_id,
+        "test_id": TEST["test_id"],
+        "name": f"run {run_id}",
+        "status": status,
+        "test_input": {"in_greeted": "Cool Person"},
+        "created_by": "adora@example.com",
+        "created_at": created_at,
+        "finished_at": finished_at,
+    }
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture
+def connection():
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+    connection = database.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def synced(connection):
+    for module in (pipelines, templates, tests, results, reports):
+        mockito.when(module).find(...).thenReturn(NOT_FOUND)
+    mockito.when(pipelines).find(
+        created_after="", sort="asc(created_at)", limit=500, offset=0
+    ).thenReturn([PIPELINE])
+    mockito.when(templates).find(
+        created_after="", sort="asc(created_at)", limit=500, offset=0
+    ).thenReturn([TEMPLATE])
+    mockito.when(tests).find(
+        created_after="", sort="asc(created_at)", limit=500, offset=0
+    ).thenReturn([TEST])
+    mockito.when(runs).find(...).thenReturn(NOT_FOUND)
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=PIPELINE["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="",
+    ).thenReturn(
+        [
+            run("run1", "succeeded", "2020-09-17T10:00:00.000000", "2020-09-17T11:00:00.000000"),
+            run("run2", "running", "2020-09-18T10:00:00.000000"),
+        ]
+    )
+    counts = database.sync(connection)
+    assert counts == {
+        "pipelines": 1,
+        "templates": 1,
+        "tests": 1,
+        "results": 0,
+        "reports": 0,
+        "runs": 2,
+    }
+    return connection
+
+
+def test_connect_creates_database(connection, home):
+    assert (home / ".carrot_cli" / "mirror" / "example.com.sqlite").exists()
+
+
+def test_sync_incremental(synced):
+    # A second sync should only ask for records created, or runs finished, since the first
+    mockito.when(pipelines).find(
+        created_after="2020-09-16T18:48:05.371563",
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+    ).thenReturn(NOT_FOUND)
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=PIPELINE["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="2020-09-18T09:59:59.000000",
+    ).thenReturn([run("run3", "created", "2020-09-19T10:00:00.000000")])
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=PIPELINE["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        finished_after="2020-09-17T10:59:59.000000",
+    ).thenReturn(
+        [run("run2", "succeeded", "2020-09-18T10:00:00.000000", "2020-09-18T12:00:00.000000")]
+    )
+    counts = database.sync(synced)
+    assert counts["runs"] == 2
+    assert counts["pipelines"] == 0
+    statuses = {
+        record["run_id"]: record["status"] for record in database.query(synced, "runs", {})
+    }
+    assert statuses == {"run1": "succeeded", "run2": "succeeded", "run3": "created"}
+
+
+def test_sync_keeps_latest_watermark(synced):
+    # A record from the second of overlap before the watermark shouldn't move the watermark back
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=PIPELINE["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="2020-09-18T09:59:59.000000",
+    ).thenReturn([run("run2", "running", "2020-09-18T09:59:59.500000")])
+    database.sync(synced)
+    watermark = synced.execute(
+        "SELECT value FROM watermarks WHERE entity = ? AND column = 'created_at'",
+        (f"runs:{PIPELINE['pipeline_id']}",),
+    ).fetchone()[0]
+    assert watermark == "2020-09-18T10:00:00.000000"
+
+
+def test_sync_runs_after_failed_sync(synced):
+    # If a sync fails partway through the pipelines, runs for the pipelines it didn't get to
+    # shouldn't be skipped by the next one
+    other_pipeline = dict(
+        PIPELINE, pipeline_id="0e0b1a4d-4d55-4b5f-a1e8-1e5e4ec3c6e1", name="Other pipeline"
+    )
+    mockito.when(pipelines).find(
+        created_after="2020-09-16T18:48:05.371563",
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+    ).thenReturn([other_pipeline])
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=other_pipeline["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="",
+    ).thenReturn(ErrorResponse(status=500, message="Internal server error"))
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=PIPELINE["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="2020-09-18T09:59:59.000000",
+    ).thenReturn([run("run3", "created", "2020-09-19T10:00:00.000000")])
+    with pytest.raises(SystemExit):
+        database.sync(synced)
+    mockito.when(pipelines).find(
+        created_after="2020-09-16T18:48:05.371563",
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+    ).thenReturn([PIPELINE, other_pipeline])
+    mockito.when(runs).find(
+        parent_entity="pipelines",
+        parent_entity_id=other_pipeline["pipeline_id"],
+        sort="asc(created_at)",
+        limit=500,
+        offset=0,
+        created_after="",
+    ).thenReturn([run("run4", "succeeded", "2020-09-17T12:00:00.000000")])
+    database.sync(synced)
+    run_ids = {record["run_id"] for record in database.query(synced, "runs", {})}
+    assert run_ids == {"run1", "run2", "run3", "run4"}
+
+
+def test_sync_error(connection):
+    mockito.when(pipelines).find(...).thenReturn(ErrorResponse(message="Request timed out."))
+    with pytest.raises(SystemExit):
+        database.sync(connection)
+
+
+@pytest.fixture(
+    params=[
+        {"entity": "pipelines", "filters": {}, "return": ["Sword of Protection pipeline"]},
+        {
+            "entity": "runs",
+            "filters": {"status": "succeeded"},
+            "return": ["run run1"],
+        },
+        {
+            "entity": "runs",
+            "filters": {"pipeline_id": PIPELINE["pipeline_id"]},
+            "sort": "desc(created_at)",
+            "return": ["run run2", "run run1"],
+        },
+        {
+            "entity": "runs",
+            "filters": {"template_id": "nonexistent", "name": "run run1"},
+            "return": [],
+        },
+        {
+            "entity": "runs",
+            "filters": {"created_after": "2020-09-18T00:00:00.000000"},
+            "return": ["run run2"],
+        },
+        {
+            "entity": "runs",
+            "filters": {"finished_before": "2020-09-18T00:00:00.000000"},
+            "return": ["run run1"],
+        },
+        {
+            "entity": "runs",
+            "filters": {},
+            "limit": 1,
+            "offset": 1,
+            "return": ["run run2"],
+        },
+        {
+            "entity": "tests",
+            "filters": {"test_id": TEST["test_id"], "name": ""},
+            "return": ["Sword of Protection test"],
+        },
+    ]
+)
+def query_data(request):
+    return request.param
+
+
+def test_query(synced, query_data):
+    records = database.query(
+        synced,
+        query_data["entity"],
+        query_data["filters"],
+        query_data.get("sort", ""),
+        query_data.get("limit"),
+        query_data.get("offset", 0),
+    )
+    assert [record["name"] for record in records] == query_data["return"]
+
+
+def test_query_returns_full_records(synced):
+    assert database.query(synced, "tests", {}) == [TEST]
+
+
+@pytest.mark.parametrize(
+    "filters,sort",
+    [
+        ({"status": "succeeded"}, ""),
+        ({}, "asc(status)"),
+        ({}, "name"),
+    ],
+)
+def test_query_invalid(synced, filters, sort):
+    with pytest.raises(ValueError):
+        database.query(synced, "pipelines", filters, sort)
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+
+from click.testing import CliRunner
+
+import mockito
+import pytest
+from carrot_cli.__main__ import main_entry as carrot
+from carrot_cli.config import manager as config
+from carrot_cli.mirror import database
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def no_config():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+
+
+@pytest.fixture
+def connection():
+    # Use an in-memory database, closed by the command when it's done
+    connection = sqlite3.connect(":memory:")
+    mockito.when(database).connect().thenReturn(connection)
+    return connection
+
+
+def test_sync(connection):
+    counts = {"pipelines": 1, "templates": 0, "tests": 0, "results": 0, "reports": 0, "runs": 3}
+    mockito.when(database).sync(connection, True).thenReturn(counts)
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["mirror", "sync", "--full"])
+    assert json.loads(result.output) == counts
+
+
+@pytest.fixture(
+    params=[
+        {
+            "args": ["mirror", "query", "runs", "--status", "failed", "--limit", 5],
+            "entity": "runs",
+            "filters": {"run_id": "", "status": "failed"},
+            "sort": "",
+            "limit": 5,
+            "offset": 0,
+        },
+        {
+            "args": ["mirror", "query", "pipelines", "--name", "Sword", "--all", "--offset", 2],
+            "entity": "pipelines",
+            "filters": {"pipeline_id": "", "name": "Sword"},
+            "sort": "",
+            "limit": None,
+            "offset": 2,
+        },
+    ]
+    + [
+        {
+            "args": ["mirror", "query", entity, "--id", "x1"],
+            "entity": entity,
+            "filters": {id_key: "x1"},
+            "sort": "",
+            "limit": 20,
+            "offset": 0,
+        }
+        for entity, id_key in (
+            ("pipelines", "pipeline_id"),
+            ("templates", "template_id"),
+            ("tests", "test_id"),
+        )
+    ]
+)
+def query_data(request):
+    return request.param
+
+
+def test_query(connection, query_data):
+    records = [{"name": "Sword of Protection"}]
+
+    def fake_query(conn, entity, filters, sort, limit, offset):
+        assert conn is connection
+        assert entity == query_data["entity"]
+        assert {key: value for key, value in filters.items() if value} == {
+            key: value for key, value in query_data["filters"].items() if value
+        }
+        assert (sort, limit, offset) == (
+            query_data["sort"],
+            query_data["limit"],
+            query_data["offset"],
+        )
+        return records
+
+    mockito.when(database).query(...).thenAnswer(fake_query)
+    runner = CliRunner()
+    result = runner.invoke(carrot, query_data["args"])
+    assert json.loads(result.output) == records
+
+
+def test_query_invalid_filter(connection, caplog):
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["mirror", "query", "pipelines", "--status", "failed"])
+    assert result.exit_code == 1
+    assert "Cannot filter pipelines by status" in caplog.text
@@ -18,6 +18,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -335,7 +337,7 @@ def update_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(pipelines).update(
@@ -510,10 +512,10 @@ def delete_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up find_by_id return val
     mockito.when(pipelines).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     # Mock up request response
     mockito.when(pipelines).delete(request.param["id"]).thenReturn(
@@ -773,7 +775,7 @@ def find_runs_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     if len(request.param["params"]) > 0:
         mockito.when(runs).find(
@@ -808,6 +810,48 @@ def test_find_runs(find_runs_data, caplog):
         assert result.output == find_runs_data["return"] + "\n"
 
 
+def test_find_runs_all_prefetch():
+    pipeline_id = "986325ba-06fe-4b1a-9e96-47d4f36bf819"
+    filters = [""] * 14
+    mockito.when(runs).find(...).thenReturn(None)
+    mockito.when(runs).find("pipelines", pipeline_id, *filters, 2, 0).thenReturn(
+        [{"name": "Queen of Bright Moon run"}, {"name": "King of Bright Moon run"}]
+    )
+    mockito.when(runs).find("pipelines", pipeline_id, *filters, 2, 2).thenReturn(
+        [{"name": "Princess of Power run"}, {"name": "Princess of Plumeria run"}]
+    )
+    mockito.when(runs).find("pipelines", pipeline_id, *filters, 2, 4).thenReturn(
+        [{"name": "Princess of the Kingdom of Snows run"}]
+    )
+    runner = CliRunner()
+    result = runner.invoke(
+        carrot,
+        ["pipeline", "find_runs", pipeline_id, "--limit", 2, "--all", "--prefetch", 3],
+    )
+    assert json.loads(result.output) == [
+        {"name": "Queen of Bright Moon run"},
+        {"name": "King of Bright Moon run"},
+        {"name": "Princess of Power run"},
+        {"name": "Princess of Plumeria run"},
+        {"name": "Princess of the Kingdom of Snows run"},
+    ]
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_find_runs_all_invalid_limit(limit, caplog):
+    pipeline_id = "986325ba-06fe-4b1a-9e96-47d4f36bf819"
+    mockito.when(runs).find(...).thenReturn([])
+    runner = CliRunner()
+    result = runner.invoke(
+        carrot,
+        ["pipeline", "find_runs", pipeline_id, "--limit", limit, "--all", "--prefetch", 3],
+    )
+    assert result.exit_code == 1
+    assert "--limit must be at least 1" in caplog.text
+    # It shouldn't keep requesting the same page
+    mockito.verify(runs, times=0).find(...)
+
+
 @pytest.fixture(
     params=[
         {
@@ -917,7 +961,7 @@ def subscribe_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(pipelines).subscribe(
         request.param["params"][0], request.param["params"][1]
@@ -1016,7 +1060,7 @@ def unsubscribe_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(pipelines).unsubscribe(
         request.param["params"][0], request.param["params"][1]
@@ -18,6 +18,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -911,7 +913,7 @@ def update_data(request):
         mockito.when(reports).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(reports).update(
@@ -1269,7 +1271,7 @@ def delete_data(request):
         request.param["return"]
     )
     mockito.when(reports).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     return request.param
 
@@ -0,0 +1,96 @@
+import time
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.rest import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True, params=[True, False])
+def circuit_breaker_state(request, monkeypatch):
+    # Test with the state shared through a file and with it kept in this process
+    if not request.param:
+        monkeypatch.setattr(circuit_breaker, "fcntl", None)
+        monkeypatch.setattr(circuit_breaker, "__STATES", {})
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+    mockito.when(config).load_var_no_error("circuit_breaker_threshold").thenReturn("3")
+
+
+# Computed up front since the clock is stubbed in tests
+START_TIME = time.time()
+
+
+def set_clock(offset):
+    mockito.when(circuit_breaker.time).time().thenReturn(START_TIME + offset)
+
+
+def test_allow_request_under_threshold():
+    circuit_breaker.record_failure()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is None
+    # A success should reset the count
+    circuit_breaker.record_success()
+    circuit_breaker.record_failure()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is None
+
+
+def test_allow_request_open_then_half_open():
+    set_clock(0)
+    for _ in range(3):
+        circuit_breaker.record_failure()
+    message = circuit_breaker.allow_request()
+    assert "last 3 requests" in message
+    assert "30 seconds" in message
+    # Once the cool-down has passed, exactly one request should be let through
+    set_clock(31)
+    assert circuit_breaker.allow_request() is None
+    assert circuit_breaker.allow_request() is not None
+    # If it fails, the circuit opens again
+    circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is not None
+    set_clock(62)
+    assert circuit_breaker.allow_request() is None
+    # If it succeeds, everything is let through
+    circuit_breaker.record_success()
+    assert circuit_breaker.allow_request() is None
+    assert circuit_breaker.allow_request() is None
+
+
+def test_allow_request_stale_probe():
+    set_clock(0)
+    for _ in range(3):
+        circuit_breaker.record_failure()
+    set_clock(31)
+    assert circuit_breaker.allow_request() is None
+    # If the check never reports back, another should be let through after another cool-down
+    set_clock(45)
+    assert circuit_breaker.allow_request() is not None
+    set_clock(62)
+    assert circuit_breaker.allow_request() is None
+
+
+def test_allow_request_separate_servers():
+    for _ in range(3):
+        circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is not None
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    assert circuit_breaker.allow_request() is None
+
+
+def test_allow_request_disabled():
+    mockito.when(config).load_var_no_error("circuit_breaker_threshold").thenReturn("0")
+    for _ in range(10):
+        circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is None
@@ -0,0 +1,96 @@
+import email.parser
+import io
+
+import mockito
+import pytest
+from carrot_cli.rest import multipart
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    path = tmp_path / "deps.zip"
+    path.write_bytes(bytes(range(256)) * 20000)
+    return path
+
+
+def parse(encoder, body):
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {encoder.content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): (
+            part.get_filename(),
+            part.get_payload(decode=True),
+        )
+        for part in message.get_payload()
+    }
+
+
+def test_read_all(big_file):
+    encoder = multipart.MultipartEncoder(
+        {"name": "Sword template", "tags": ["a", "b"]}, {"test_wdl_dependencies_file": str(big_file)}
+    )
+    body = encoder.read()
+    encoder.close()
+    assert len(body) == len(encoder)
+    assert encoder.read() == b""
+    parts = parse(encoder, body)
+    assert parts["name"] == (None, b"Sword template")
+    assert parts["test_wdl_dependencies_file"] == ("deps.zip", big_file.read_bytes())
+
+
+def test_read_chunks(big_file):
+    encoder = multipart.MultipartEncoder({"name": "Sword"}, {"file": str(big_file)})
+    chunks = []
+    while True:
+        chunk = encoder.read(8192)
+        if not chunk:
+            break
+        # Only a chunk's worth of the file should be read at a time
+        assert len(chunk) <= 8192
+        chunks.append(chunk)
+    assert len(b"".join(chunks)) == len(encoder)
+    assert parse(encoder, b"".join(chunks))["file"][1] == big_file.read_bytes()
+    # Iterating should give the same body
+    iterated = multipart.MultipartEncoder({"name": "Sword"}, {"file": str(big_file)})
+    assert len(b"".join(iterated)) == len(encoder)
+    for open_encoder in (encoder, iterated):
+        open_encoder.close()
+
+
+def test_missing_file(big_file):
+    with pytest.raises(OSError):
+        multipart.MultipartEncoder({}, {"a": str(big_file), "b": str(big_file) + ".missing"})
+
+
+def test_progress(big_file):
+    stream = io.StringIO()
+    encoder = multipart.MultipartEncoder({}, {"file": str(big_file)}, progress=True, stream=stream)
+    while encoder.read(65536):
+        pass
+    encoder.close()
+    output = stream.getvalue()
+    # Updates are throttled, but the last one should always be written
+    last_update = output.rsplit("\r", 1)[1]
+    assert "(100%)" in last_update
+    assert last_update.endswith("/s\n")
+    assert output.count("(100%)") == 1
+    assert f"of {multipart.MultipartEncoder.format_size(len(encoder))}" in output
+
+
+@pytest.fixture(
+    params=[(512, "512 B"), (2048, "2.0 KB"), (5 * 1024 ** 2, "5.0 MB"), (3 * 1024 ** 3, "3.0 GB")]
+)
+def format_size_data(request):
+    return request.param
+
+
+def test_format_size(format_size_data):
+    size, formatted = format_size_data
+    assert multipart.MultipartEncoder.format_size(size) == formatted
@@ -0,0 +1,122 @@
+import time
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.rest import name_cache
+from carrot_cli.rest.request_handler import ErrorResponse
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def server_address():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+
+
+def test_put_and_get():
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    assert name_cache.get("pipelines", "Sword of Protection") == "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+    # Other entity types should be cached separately
+    assert name_cache.get("templates", "Sword of Protection") is None
+
+
+def test_get_different_server():
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    assert name_cache.get("pipelines", "Sword of Protection") is None
+
+
+def test_get_expired():
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    mockito.when(config).load_var_no_error("name_cache_ttl").thenReturn("60")
+    # Pretend we're two minutes in the future
+    now = time.time()
+    mockito.when(time).time().thenReturn(now + 120)
+    assert name_cache.get("pipelines", "Sword of Protection") is None
+
+
+def test_get_no_server():
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(None)
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    assert name_cache.get("pipelines", "Sword of Protection") is None
+
+
+def test_put_renamed():
+    name_cache.put("pipelines", "Old name", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    name_cache.put("pipelines", "New name", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    assert name_cache.get("pipelines", "Old name") is None
+    assert name_cache.get("pipelines", "New name") == "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+
+
+def test_remove_id():
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    name_cache.put("pipelines", "Queen of Bright Moon", "bd132568-06fe-4b1a-9e96-47d4f36bf819")
+    name_cache.remove_id("pipelines", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    assert name_cache.get("pipelines", "Sword of Protection") is None
+    assert name_cache.get("pipelines", "Queen of Bright Moon") == "bd132568-06fe-4b1a-9e96-47d4f36bf819"
+
+
+@pytest.fixture(params=[None, "pipelines"])
+def clear_data(request):
+    name_cache.put("pipelines", "Sword of Protection", "cd987859-06fe-4b1a-9e96-47d4f36bf819")
+    name_cache.put("templates", "Catra template", "58723b05-6060-4444-9f1b-394aff691cce")
+    return request.param
+
+
+def test_clear(clear_data):
+    name_cache.clear(clear_data)
+    assert name_cache.get("pipelines", "Sword of Protection") is None
+    if clear_data is None:
+        assert name_cache.get("templates", "Catra template") is None
+    else:
+        assert name_cache.get("templates", "Catra template") == "58723b05-6060-4444-9f1b-394aff691cce"
+
+
+@pytest.fixture(
+    params=[
+        {
+            "entity": "pipelines",
+            "response": {
+                "name": "Sword of Protection",
+                "pipeline_id": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+            },
+            "cached": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+        },
+        {
+            "entity": "pipelines",
+            "response": ErrorResponse(
+                status=500,
+                body={
+                    "name": "Sword of Protection",
+                    "pipeline_id": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+                },
+            ),
+            "cached": None,
+        },
+        {
+            "entity": "pipelines",
+            "response": ErrorResponse(message="Encountered a connection error."),
+            "cached": None,
+        },
+    ]
+)
+def cache_from_response_data(request):
+    return request.param
+
+
+def test_cache_from_response(cache_from_response_data):
+    name_cache.cache_from_response(
+        cache_from_response_data["entity"], cache_from_response_data["response"]
+    )
+    result = name_cache.get(cache_from_response_data["entity"], "Sword of Protection")
+    assert result == cache_from_response_data["cached"]
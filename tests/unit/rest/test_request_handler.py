@@ -1,12 +1,19 @@
+import email.parser
+import gzip
+import io
 import json
 import logging
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import requests
 
 import mockito
 import pytest
 from carrot_cli.config import manager as config
-from carrot_cli.rest import request_handler
+from carrot_cli.rest import circuit_breaker, name_cache, request_handler, response_cache
 
 
 @pytest.fixture(autouse=True)
@@ -15,6 +22,29 @@ def unstub():
     mockito.unstub()
 
 
+@pytest.fixture(autouse=True)
+def no_cached_names():
+    # Don't update the real name cache
+    mockito.when(name_cache).cache_from_response(...).thenReturn(None)
+    mockito.when(name_cache).remove_id(...).thenReturn(None)
+
+
+@pytest.fixture(autouse=True)
+def no_circuit_breaker():
+    # Don't read or update the real circuit breaker state
+    mockito.when(circuit_breaker).allow_request().thenReturn(None)
+    mockito.when(circuit_breaker).record_success().thenReturn(None)
+    mockito.when(circuit_breaker).record_failure().thenReturn(None)
+
+
+@pytest.fixture(autouse=True)
+def no_cached_responses():
+    # Don't read or update the real response cache
+    mockito.when(response_cache).get(...).thenReturn(None)
+    mockito.when(response_cache).put(...).thenReturn(None)
+    mockito.when(response_cache).remove(...).thenReturn(None)
+
+
 @pytest.fixture(
     params=[
         {
@@ -63,9 +93,9 @@ def find_by_id_data(request):
         request.param["entity"],
         request.param["id"],
     )
-    mockito.when(request_handler).send_request("GET", address).thenReturn(
-        request.param["return"]
-    )
+    mockito.when(request_handler).send_request(
+        "GET", address, headers={}, response_headers={}
+    ).thenReturn(request.param["return"])
     return request.param
 
 
@@ -76,6 +106,25 @@ def test_find_by_id(find_by_id_data):
     assert result == find_by_id_data["return"]
 
 
+def test_find_by_id_revalidate():
+    # A cached record should be checked with the server if revalidate is set
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+    cached = {"template_id": "t1", "test_wdl": "gs://carrot/old.wdl"}
+    current = {"template_id": "t1", "test_wdl": "gs://carrot/new.wdl"}
+    mockito.when(response_cache).get("templates", "t1").thenReturn(cached)
+    mockito.when(response_cache).get_validators("templates", "t1").thenReturn(
+        (cached, {"etag": '"v1"'})
+    )
+    mockito.when(request_handler).send_request(
+        "GET",
+        "http://example.com/api/v1/templates/t1",
+        headers={"If-None-Match": '"v1"'},
+        response_headers={},
+    ).thenReturn(current)
+    assert request_handler.find_by_id("templates", "t1") == cached
+    assert request_handler.find_by_id("templates", "t1", revalidate=True) == current
+
+
 @pytest.fixture(
     params=[
         {
@@ -120,7 +169,7 @@ def find_data(request):
     # Get params filtered to remove empty ones since the empty ones won't be passed to request
     params = list(filter(lambda param: param[1] != "", request.param["params"]))
     mockito.when(request_handler).send_request(
-        "GET", address, params=params
+        "GET", address, params=params, stream=False
     ).thenReturn(request.param["return"])
     return request.param
 
@@ -176,6 +225,7 @@ def create_data(request):
 def test_create(create_data):
     result = request_handler.create(create_data["entity"], create_data["params"])
     assert result == create_data["return"]
+    mockito.verify(name_cache).cache_from_response(create_data["entity"], result)
 
 
 @pytest.fixture(
@@ -241,6 +291,8 @@ def test_update(update_data):
         update_data["entity"], update_data["id"], update_data["params"]
     )
     assert result == update_data["return"]
+    mockito.verify(name_cache).remove_id(update_data["entity"], update_data["id"])
+    mockito.verify(name_cache).cache_from_response(update_data["entity"], result)
 
 
 @pytest.fixture(
@@ -287,6 +339,7 @@ def delete_data(request):
 def test_delete(delete_data):
     result = request_handler.delete(delete_data["entity"], delete_data["id"])
     assert result == delete_data["return"]
+    mockito.verify(name_cache).remove_id(delete_data["entity"], delete_data["id"])
 
 
 @pytest.fixture(
@@ -527,7 +580,7 @@ def find_runs_data(request):
     # Get params filtered to remove empty ones since the empty ones won't be passed to request
     params = list(filter(lambda param: param[1] != "", request.param["params"]))
     mockito.when(request_handler).send_request(
-        "GET", address, params=params
+        "GET", address, params=params, stream=False
     ).thenReturn(request.param["return"])
     return request.param
 
@@ -806,7 +859,7 @@ def find_maps_data(request):
     # Get params filtered to remove empty ones since the empty ones won't be passed to request
     params = list(filter(lambda param: param[1] != "", request.param["params"]))
     mockito.when(request_handler).send_request(
-        "GET", address, params=params
+        "GET", address, params=params, stream=False
     ).thenReturn(request.param["return"])
     return request.param
 
@@ -825,44 +878,66 @@ def test_find_maps(find_maps_data):
     params=[
         {
             "exception": requests.ConnectionError,
-            "return": "Encountered a connection error. Enable verbose logging (-v) for more info",
+            "return": request_handler.ErrorResponse(
+                message="Encountered a connection error. Enable verbose logging (-v) for more info"
+            ),
         },
         {
             "exception": requests.URLRequired,
-            "return": "Invalid URL. Enable verbose logging (-v) for more info",
+            "return": request_handler.ErrorResponse(
+                message="Invalid URL. Enable verbose logging (-v) for more info"
+            ),
         },
         {
             "exception": requests.Timeout,
-            "return": "Request timed out. Enable verbose logging (-v) for more info",
+            "return": request_handler.ErrorResponse(
+                message="Request timed out. Enable verbose logging (-v) for more info"
+            ),
         },
         {
             "exception": requests.TooManyRedirects,
-            "return": "Too many redirects. Enable verbose logging (-v) for more info",
+            "return": request_handler.ErrorResponse(
+                message="Too many redirects. Enable verbose logging (-v) for more info"
+            ),
         },
         {
             "status_code": 400,
             "text": "",
-            "return": json.dumps({"Body": "", "Status": 400}, indent=4, sort_keys=True),
+            "return": request_handler.ErrorResponse(status=400, text=""),
+        },
+        {
+            "status_code": 404,
+            "text": json.dumps({"title": "No pipelines found", "status": 404}),
+            "return": request_handler.ErrorResponse(
+                status=404, body={"title": "No pipelines found", "status": 404}
+            ),
         },
         {
             "status_code": 200,
-            "text": json.dumps({"test_id": "123456789", "name": "test_name"}),
-            "return": json.dumps(
-                {"name": "test_name", "test_id": "123456789"}, indent=4, sort_keys=True
+            "text": "null",
+            "return": request_handler.ErrorResponse(
+                status=200, message="Received response with status 200 and empty body"
             ),
         },
+        {
+            "status_code": 200,
+            "text": json.dumps({"test_id": "123456789", "name": "test_name"}),
+            "return": {"name": "test_name", "test_id": "123456789"},
+        },
     ]
 )
 def send_request_data(request):
+    # Use the default connection pool settings
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     # Set all requests to return None so only the one we expect will return a value
-    mockito.when(requests).request(...).thenReturn(None)
+    mockito.when(requests.Session).request(...).thenReturn(None)
     # Params to pass to make sure it processes them properly
     params = [("sort", "asc(name)")]
     json_body = {"test", "test"}
     # For exceptions, if we get a request, raise the exception
     if "exception" in request.param:
-        mockito.when(requests).request(
-            "POST", "http://example.com/api/v1/pipelines", params=params, json=json_body, data=None, files=None
+        mockito.when(requests.Session).request(
+            "POST", "http://example.com/api/v1/pipelines", params=params, json=json_body, data=None, files=None, headers=None, timeout=(10.0, 300.0), stream=False
         ).thenRaise(request.param["exception"])
     # Otherwise, set it to return the specified response
     else:
@@ -873,8 +948,8 @@ def send_request_data(request):
         response = mockito.mock(result, spec=requests.Response)
         if request.param["text"] != "":
             mockito.when(response).json().thenReturn(json.loads(request.param["text"]))
-        mockito.when(requests).request(
-            "POST", "http://example.com/api/v1/pipelines", params=params, json=json_body, data=None, files=None
+        mockito.when(requests.Session).request(
+            "POST", "http://example.com/api/v1/pipelines", params=params, json=json_body, data=None, files=None, headers=None, timeout=(10.0, 300.0), stream=False
         ).thenReturn(response)
 
     return request.param["return"]
@@ -891,40 +966,505 @@ def test_send_request(send_request_data):
     assert response == send_request_data
 
 
+def mock_response(status_code, body=None, headers=None):
+    text = "" if body is None else json.dumps(body)
+    response = mockito.mock(
+        {"status_code": status_code, "text": text, "headers": headers or {}},
+        spec=requests.Response,
+    )
+    mockito.when(response).close().thenReturn(None)
+    if body is not None:
+        mockito.when(response).json().thenReturn(body)
+    else:
+        mockito.when(response).json().thenRaise(json.decoder.JSONDecodeError("", "", 0))
+    return response
+
+
 @pytest.fixture(
     params=[
         {
-            "files": {
-                "test_wdl_file": "tests/data/test.wdl",
-                "eval_wdl_file": "tests/data/eval.wdl",
-                "test_wdl_dependencies_file": "tests/data/test_dep.zip",
-                "eval_wdl_dependencies_file": "tests/data/eval_dep.zip"
-            },
-            "success": True
+            "method": "GET",
+            "responses": [(503,), (200, {"name": "Swift Wind"})],
+            "return": {"name": "Swift Wind"},
+            "sleeps": 1,
         },
         {
-            "files": {
-                "test_wdl_file": "tests/data/not_a_real.wdl",
-                "eval_wdl_file": "tests/data/eval.wdl",
-                "test_wdl_dependencies_file": "tests/data/test_dep.zip",
-                "eval_wdl_dependencies_file": "tests/data/eval_dep.zip"
+            "method": "PUT",
+            "responses": [
+                requests.ConnectionError("Connection refused"),
+                requests.ReadTimeout("Read timed out"),
+                (200, {"name": "Swift Wind"}),
+            ],
+            "return": {"name": "Swift Wind"},
+            "sleeps": 2,
+        },
+        {
+            "method": "DELETE",
+            "responses": [(502,)] * 4,
+            "return": request_handler.ErrorResponse(status=502, text=""),
+            "sleeps": 3,
+        },
+        {
+            "method": "GET",
+            "responses": [requests.ReadTimeout("Read timed out")] * 4,
+            "return": request_handler.ErrorResponse(
+                message="Request timed out. Enable verbose logging (-v) for more info"
+            ),
+            "sleeps": 3,
+        },
+        {
+            "method": "POST",
+            "responses": [(503,), (200, {"name": "Swift Wind"})],
+            "return": request_handler.ErrorResponse(status=503, text=""),
+            "sleeps": 0,
+        },
+        {
+            "method": "GET",
+            "responses": [
+                (429, None, {"Retry-After": "120"}),
+                (200, {"name": "Swift Wind"}),
+            ],
+            "return": request_handler.ErrorResponse(status=429, text=""),
+            "sleeps": 0,
+        },
+    ]
+)
+def retry_data(request):
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(request_handler.time).sleep(...).thenReturn(None)
+    stub = mockito.when(requests.Session).request(...)
+    # Responses are built here instead of in the params, since stubs are removed after each test
+    for response in request.param["responses"]:
+        if isinstance(response, Exception):
+            stub = stub.thenRaise(response)
+        else:
+            stub = stub.thenReturn(mock_response(*response))
+    return request.param
+
+
+def test_send_request_retries(retry_data):
+    response = request_handler.send_request(
+        retry_data["method"], "http://example.com/api/v1/pipelines/1"
+    )
+    assert response == retry_data["return"]
+    mockito.verify(request_handler.time, times=retry_data["sleeps"]).sleep(...)
+
+
+@pytest.fixture(
+    params=[
+        {"config": {}, "size": 100000, "compressed": False},
+        {"config": {"compress_requests": "true"}, "size": 100000, "compressed": True},
+        {"config": {"compress_requests": "true"}, "size": 100, "compressed": False},
+        {
+            "config": {"compress_requests": "true", "compression_threshold": "10"},
+            "size": 100,
+            "compressed": True,
+        },
+    ]
+)
+def compression_data(request):
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    for var_name, value in request.param["config"].items():
+        mockito.when(config).load_var_no_error(var_name).thenReturn(value)
+    return request.param
+
+
+def test_send_request_compression(compression_data):
+    body = {"notebook": "x" * compression_data["size"]}
+    sent = {}
+
+    def request(method, url, **kwargs):
+        sent.update(kwargs)
+        return mock_response(200, {"report_id": "1"})
+
+    mockito.when(requests.Session).request(...).thenAnswer(request)
+    response = request_handler.send_request(
+        "POST", "http://example.com/api/v1/reports", json=body
+    )
+    assert response == {"report_id": "1"}
+    if compression_data["compressed"]:
+        assert sent["json"] is None
+        assert sent["headers"]["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(sent["data"])) == body
+    else:
+        assert sent["json"] == body
+        assert sent["data"] is None
+        assert sent["headers"] is None
+
+
+def test_send_request_circuit_open():
+    mockito.when(circuit_breaker).allow_request().thenReturn("Server is down")
+    mockito.expect(requests.Session, times=0).request(...)
+    response = request_handler.send_request("GET", "http://example.com/api/v1/pipelines/1")
+    assert response == request_handler.ErrorResponse(message="Server is down")
+
+
+def test_send_request_records_failure():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(request_handler.time).sleep(...).thenReturn(None)
+    mockito.when(requests.Session).request(...).thenReturn(mock_response(500)).thenReturn(
+        mock_response(404, {"detail": "Not found"})
+    )
+    request_handler.send_request("GET", "http://example.com/api/v1/pipelines/1")
+    mockito.verify(circuit_breaker, times=1).record_failure()
+    request_handler.send_request("GET", "http://example.com/api/v1/pipelines/1")
+    mockito.verify(circuit_breaker, times=1).record_success()
+
+
+@pytest.fixture(
+    params=[
+        {"attempt": 0, "retry_after": None, "min": 0.0, "max": 0.5},
+        {"attempt": 3, "retry_after": None, "min": 0.0, "max": 4.0},
+        {"attempt": 10, "retry_after": None, "min": 0.0, "max": 30.0},
+        {"attempt": 0, "retry_after": "7", "min": 7.0, "max": 7.0},
+        {"attempt": 0, "retry_after": "Wed, 21 Oct 2015 07:28:00 GMT", "min": 0.0, "max": 0.0},
+        {"attempt": 1, "retry_after": "soon", "min": 0.0, "max": 1.0},
+    ]
+)
+def retry_delay_data(request):
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    return request.param
+
+
+def test_get_retry_delay(retry_delay_data):
+    delay = request_handler.__get_retry_delay(
+        retry_delay_data["attempt"], retry_delay_data["retry_after"]
+    )
+    assert retry_delay_data["min"] <= delay <= retry_delay_data["max"]
+
+
+@pytest.fixture(
+    params=[
+        {
+            "config": {},
+            "pool_maxsize": request_handler.DEFAULT_CONNECTION_POOL_MAXSIZE,
+            "connection_header": "keep-alive",
+        },
+        {
+            "config": {
+                "connection_pool_size": "4",
+                "connection_pool_maxsize": "32",
+                "keep_alive": "false",
             },
-            "success": False,
-            "logging": "Failed to open test_wdl_file file with path tests/data/not_a_real.wdl"
-        }
+            "pool_maxsize": 32,
+            "connection_header": "close",
+        },
+        {
+            "config": {"connection_pool_maxsize": "lots", "keep_alive": "true"},
+            "pool_maxsize": request_handler.DEFAULT_CONNECTION_POOL_MAXSIZE,
+            "connection_header": "keep-alive",
+        },
+    ]
+)
+def get_session_data(request):
+    # Make sure we build a new session with this config
+    request_handler.close_session()
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    for var_name, value in request.param["config"].items():
+        mockito.when(config).load_var_no_error(var_name).thenReturn(value)
+    yield request.param
+    request_handler.close_session()
+
+
+def test_get_session(get_session_data):
+    session = request_handler.get_session()
+    # The session should be shared between calls
+    assert request_handler.get_session() is session
+    adapter = session.get_adapter("http://example.com")
+    assert adapter._pool_maxsize == get_session_data["pool_maxsize"]
+    assert session.headers.get("Connection") == get_session_data["connection_header"]
+    assert "gzip" in session.headers.get("Accept-Encoding")
+
+
+@pytest.fixture
+def upload_server():
+    # A server that parses multipart request bodies and responds with the fields it received
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            message = email.parser.BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            fields = {
+                part.get_param("name", header="content-disposition"): {
+                    "filename": part.get_filename(),
+                    "value": part.get_payload(decode=True).decode(),
+                }
+                for part in message.get_payload()
+            }
+            response = json.dumps(fields).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    request_handler.close_session()
+
+
+def test_send_request_files(upload_server):
+    response = request_handler.send_request(
+        "POST",
+        f"{upload_server}/api/v1/templates",
+        body={"name": "Sword template", "pipeline_id": "1"},
+        files={"test_wdl_file": "tests/data/test.wdl", "eval_wdl_file": "tests/data/eval.wdl"},
+    )
+    with open("tests/data/test.wdl", "r") as test_wdl:
+        assert response["test_wdl_file"] == {"filename": "test.wdl", "value": test_wdl.read()}
+    assert response["eval_wdl_file"]["filename"] == "eval.wdl"
+    assert response["name"] == {"filename": None, "value": "Sword template"}
+    assert response["pipeline_id"] == {"filename": None, "value": "1"}
+
+
+def test_send_request_files_missing(caplog):
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.expect(requests.Session, times=0).request(...)
+    response = request_handler.send_request(
+        "POST",
+        "http://example.com/api/v1/templates",
+        body={"name": "Sword template"},
+        files={"test_wdl_file": "tests/data/not_a_real.wdl"},
+    )
+    assert isinstance(response, request_handler.ErrorResponse)
+    assert "Failed to open file with path tests/data/not_a_real.wdl" in caplog.text
+
+
+def paged_find(records, calls):
+    """Returns a find function over records that records the limit and offset of each call"""
+
+    def find_page(limit, offset):
+        calls.append((limit, offset))
+        page = records[offset : offset + limit]
+        if not page:
+            return request_handler.ErrorResponse(status=404, body={"title": "No records found"})
+        return page
+
+    return find_page
+
+
+@pytest.fixture(
+    params=[
+        # A short first page means we're done
+        {"count": 5, "page_size": 10, "offset": 0, "calls": [(10, 0)]},
+        # Pages double in size while responses are fast
+        {"count": 35, "page_size": 10, "offset": 0, "calls": [(10, 0), (20, 10), (40, 30)]},
+        # A 404 after the first page means we've run out of records
+        {"count": 30, "page_size": 10, "offset": 0, "calls": [(10, 0), (20, 10), (40, 30)]},
+        {"count": 30, "page_size": 10, "offset": 25, "calls": [(10, 25)]},
+    ]
+)
+def paginate_data(request):
+    return request.param
+
+
+def test_paginate(paginate_data):
+    records = [{"id": i} for i in range(paginate_data["count"])]
+    calls = []
+    result = list(
+        request_handler.paginate(
+            paged_find(records, calls),
+            paginate_data["page_size"],
+            paginate_data["offset"],
+        )
+    )
+    assert result == records[paginate_data["offset"] :]
+    assert calls == paginate_data["calls"]
+
+
+def test_paginate_slow_pages():
+    records = [{"id": i} for i in range(60)]
+    calls = []
+    # Every page takes far longer than the target, so the page size should shrink
+    times = iter([0, 10, 10, 20, 20, 30, 30, 40])
+    mockito.when(request_handler.time).monotonic().thenAnswer(lambda: next(times))
+    result = list(request_handler.paginate(paged_find(records, calls), 40))
+    assert result == records
+    assert calls == [(40, 0), (20, 40), (10, 60)]
+
+
+def test_paginate_error():
+    error = request_handler.ErrorResponse(message="Encountered a connection error.")
+    with pytest.raises(request_handler.PaginationError) as e:
+        list(request_handler.paginate(lambda limit, offset: error, 10))
+    assert e.value.response == error
+
+
+@pytest.fixture(
+    params=[
+        {"count": 95, "page_size": 10, "offset": 0, "prefetch": 4},
+        {"count": 100, "page_size": 10, "offset": 0, "prefetch": 4},
+        {"count": 3, "page_size": 10, "offset": 0, "prefetch": 4},
+        {"count": 95, "page_size": 10, "offset": 42, "prefetch": 2},
+    ]
+)
+def paginate_prefetch_data(request):
+    return request.param
+
+
+def test_paginate_prefetch(paginate_prefetch_data):
+    records = [{"id": i} for i in range(paginate_prefetch_data["count"])]
+    calls = []
+    find_page = paged_find(records, calls)
+
+    def slow_find_page(limit, offset):
+        # Make earlier pages slower so they finish out of order
+        time.sleep(0.01 * (3 - (offset // limit) % 4))
+        return find_page(limit, offset)
+
+    result = list(
+        request_handler.paginate(
+            slow_find_page,
+            paginate_prefetch_data["page_size"],
+            paginate_prefetch_data["offset"],
+            paginate_prefetch_data["prefetch"],
+        )
+    )
+    assert result == records[paginate_prefetch_data["offset"] :]
+    # The page size stays fixed so pages can be requested before the previous ones come back
+    assert all(limit == paginate_prefetch_data["page_size"] for limit, _ in calls)
+
+
+def test_paginate_prefetch_error():
+    def find_page(limit, offset):
+        if offset >= 20:
+            return request_handler.ErrorResponse(status=500, text="Internal server error")
+        return [{"id": i} for i in range(offset, offset + limit)]
+
+    records = []
+    with pytest.raises(request_handler.PaginationError) as e:
+        for record in request_handler.paginate(find_page, 10, prefetch=3):
+            records.append(record)
+    # Everything before the failed page should still come through, in order
+    assert records == [{"id": i} for i in range(20)]
+    assert e.value.response.status == 500
+
+
+def test_paginate_streamed_pages():
+    records = [{"id": i} for i in range(35)]
+    calls = []
+    find_page = paged_find(records, calls)
+
+    def streamed_find_page(limit, offset):
+        page = find_page(limit, offset)
+        if isinstance(page, list):
+            return (record for record in page)
+        return page
+
+    result = list(request_handler.paginate(streamed_find_page, 10))
+    assert result == records
+    assert calls == [(10, 0), (20, 10), (40, 30)]
+
+
+def streamed_response(body, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(body.encode("utf-8"))
+    return response
+
+
+@pytest.fixture(
+    params=[
+        {
+            "body": '[{"id": 1}, {"id": 2, "name": "Bow"}]',
+            "return": [{"id": 1}, {"id": 2, "name": "Bow"}],
+        },
+        {
+            "body": '  [ 12345 , "a,]b" ,{"nested": [1, {"x": "]"}]} ]  ',
+            "return": [12345, "a,]b", {"nested": [1, {"x": "]"}]}],
+        },
+        {"body": "[]", "return": []},
+        {"body": '[{"name": "Entrapta ééé"}]', "return": [{"name": "Entrapta ééé"}]},
+        {"body": '{"title": "Not an array"}', "return": {"title": "Not an array"}},
+        {"body": '[{"id": 1}, {"id": 2', "error": "not a complete json array"},
+        {"body": '[{"id": 1} {"id": 2}]', "error": "Expected , or ]"},
     ]
 )
-def process_file_dict_data(request):
+def stream_data(request, monkeypatch):
+    # Use tiny chunks so records are split across them
+    monkeypatch.setattr(request_handler, "STREAM_CHUNK_SIZE", 3)
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(requests.Session).request(...).thenReturn(
+        streamed_response(request.param["body"])
+    )
     return request.param
 
 
-def test_process_file_dict(process_file_dict_data, caplog):
-    if process_file_dict_data["success"]:
-        result = request_handler.__process_file_dict(process_file_dict_data["files"])
-        for key, value in result.items():
-            assert value[0] == process_file_dict_data["files"][key].rsplit("/", 1)[1]
-            assert value[1].name == process_file_dict_data["files"][key]
+def test_send_request_stream(stream_data):
+    result = request_handler.send_request(
+        "GET", "http://example.com/api/v1/pipelines", stream=True
+    )
+    if "error" in stream_data:
+        with pytest.raises(request_handler.PaginationError) as e:
+            list(result)
+        assert stream_data["error"] in e.value.response.message
+    elif isinstance(stream_data["return"], list):
+        assert isinstance(result, types.GeneratorType)
+        assert list(result) == stream_data["return"]
     else:
-        with pytest.raises(IOError):
-            request_handler.__process_file_dict(process_file_dict_data["files"])
-        assert process_file_dict_data["logging"] in caplog.text
+        assert result == stream_data["return"]
+
+
+def test_send_request_stream_is_incremental(monkeypatch):
+    monkeypatch.setattr(request_handler, "STREAM_CHUNK_SIZE", 16)
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    body = json.dumps([{"id": i, "name": "x" * 100} for i in range(100)])
+    response = streamed_response(body)
+    mockito.when(requests.Session).request(...).thenReturn(response)
+    records = request_handler.send_request(
+        "GET", "http://example.com/api/v1/pipelines", stream=True
+    )
+    assert next(records) == {"id": 0, "name": "x" * 100}
+    # Only a little more than the first record should have been read
+    assert response.raw.tell() < 200
+    assert len(list(records)) == 99
+
+
+def test_find_streaming():
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+    mockito.when(request_handler).send_request(
+        "GET", "http://example.com/api/v1/pipelines", params=[], stream=True
+    ).thenReturn("streamed")
+    mockito.when(request_handler).send_request(
+        "GET", "http://example.com/api/v1/pipelines", params=[], stream=False
+    ).thenReturn("not streamed")
+    with request_handler.streaming():
+        assert request_handler.find("pipelines", []) == "streamed"
+    assert request_handler.find("pipelines", []) == "not streamed"
+
+
+def test_find_runs_streaming():
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+    address = "http://example.com/api/v1/pipelines/p1/runs"
+    mockito.when(request_handler).send_request(
+        "GET", address, params=[], stream=True
+    ).thenReturn("streamed")
+    mockito.when(request_handler).send_request(
+        "GET", address, params=[], stream=False
+    ).thenReturn("not streamed")
+    with request_handler.streaming():
+        assert request_handler.find_runs("pipelines", "p1", []) == "streamed"
+    assert request_handler.find_runs("pipelines", "p1", []) == "not streamed"
+
+
+def test_find_maps_streaming():
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+    address = "http://example.com/api/v1/runs/r1/reports"
+    mockito.when(request_handler).send_request(
+        "GET", address, params=[], stream=True
+    ).thenReturn("streamed")
+    mockito.when(request_handler).send_request(
+        "GET", address, params=[], stream=False
+    ).thenReturn("not streamed")
+    with request_handler.streaming():
+        assert request_handler.find_maps("runs", "r1", "reports", []) == "streamed"
+    assert request_handler.find_maps("runs", "r1", "reports", []) == "not streamed"
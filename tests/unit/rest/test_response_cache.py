@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.rest import request_handler, response_cache
+from carrot_cli.rest.request_handler import ErrorResponse
+
+RUN_ID = "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+    response_cache.set_mode("default")
+
+
+@pytest.fixture(autouse=True)
+def server_address():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+    mockito.when(config).load_var("carrot_server_address").thenReturn("example.com")
+
+
+def test_put_and_get():
+    record = {"pipeline_id": RUN_ID, "name": "Sword of Protection"}
+    response_cache.put("pipelines", RUN_ID, record)
+    assert response_cache.get("pipelines", RUN_ID) == record
+    # Other entity types should be cached separately
+    assert response_cache.get("templates", RUN_ID) is None
+
+
+def test_get_different_server():
+    response_cache.put("pipelines", RUN_ID, {"name": "Sword of Protection"})
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    assert response_cache.get("pipelines", RUN_ID) is None
+
+
+def test_get_expired():
+    response_cache.put("pipelines", RUN_ID, {"name": "Sword of Protection"})
+    mockito.when(config).load_var_with_default("response_cache_ttl", 3600).thenReturn(10)
+    later = time.time() + 20
+    mockito.when(response_cache.time).time().thenReturn(later)
+    assert response_cache.get("pipelines", RUN_ID) is None
+
+
+@pytest.fixture(
+    params=[
+        {"status": "succeeded", "cached": True},
+        {"status": "test_failed", "cached": True},
+        {"status": "running", "cached": False},
+        {"status": None, "cached": False},
+    ]
+)
+def run_data(request):
+    return request.param
+
+
+def test_put_run(run_data):
+    record = {"run_id": RUN_ID, "status": run_data["status"]}
+    response_cache.put("runs", RUN_ID, record)
+    # Finished runs never expire
+    much_later = time.time() + 10 ** 9
+    mockito.when(response_cache.time).time().thenReturn(much_later)
+    assert response_cache.get("runs", RUN_ID) == (record if run_data["cached"] else None)
+
+
+def test_put_ignores_errors_and_uncached_entities():
+    response_cache.put("pipelines", RUN_ID, ErrorResponse(status=500, text="Oh no"))
+    response_cache.put("subscriptions", RUN_ID, {"subscription_id": RUN_ID})
+    assert response_cache.get("pipelines", RUN_ID) is None
+    assert response_cache.get("subscriptions", RUN_ID) is None
+
+
+def test_remove_and_clear():
+    response_cache.put("pipelines", RUN_ID, {"name": "Sword of Protection"})
+    response_cache.put("tests", RUN_ID, {"name": "Sword of Protection test"})
+    response_cache.remove("pipelines", RUN_ID)
+    assert response_cache.get("pipelines", RUN_ID) is None
+    response_cache.put("pipelines", RUN_ID, {"name": "Sword of Protection"})
+    response_cache.clear("tests")
+    assert response_cache.get("tests", RUN_ID) is None
+    assert response_cache.get("pipelines", RUN_ID) is not None
+    response_cache.clear()
+    assert response_cache.get("pipelines", RUN_ID) is None
+
+
+def test_find_by_id_uses_cache():
+    record = {"pipeline_id": RUN_ID, "name": "Sword of Protection"}
+    mockito.expect(request_handler, times=1).send_request(
+        "GET", f"http://example.com/api/v1/pipelines/{RUN_ID}", ...
+    ).thenReturn(record)
+    assert request_handler.find_by_id("pipelines", RUN_ID) == record
+    # The second time should come from the cache
+    assert request_handler.find_by_id("pipelines", RUN_ID) == record
+
+
+def test_find_by_id_refresh():
+    response_cache.put("pipelines", RUN_ID, {"name": "Old name"})
+    response_cache.set_mode("refresh")
+    mockito.when(request_handler).send_request(
+        "GET", f"http://example.com/api/v1/pipelines/{RUN_ID}", ...
+    ).thenReturn({"name": "New name"})
+    assert request_handler.find_by_id("pipelines", RUN_ID) == {"name": "New name"}
+    response_cache.set_mode("default")
+    assert response_cache.get("pipelines", RUN_ID) == {"name": "New name"}
+
+
+def test_find_by_id_cache_only():
+    response_cache.put("pipelines", RUN_ID, {"name": "Sword of Protection"})
+    response_cache.set_mode("cache_only")
+    mockito.expect(request_handler, times=0).send_request(...)
+    assert request_handler.find_by_id("pipelines", RUN_ID) == {"name": "Sword of Protection"}
+    result = request_handler.find_by_id("tests", RUN_ID)
+    assert isinstance(result, ErrorResponse)
+    assert "--cache_only" in result.message
+
+
+def test_get_validators():
+    record = {"name": "Sword of Protection"}
+    response_cache.put("pipelines", RUN_ID, {"name": "No validators"})
+    assert response_cache.get_validators("pipelines", RUN_ID) == (None, {})
+    response_cache.put("pipelines", RUN_ID, record, {"etag": '"1"', "last_modified": None})
+    # Validators are returned even once the record has expired
+    mockito.when(config).load_var_with_default("response_cache_ttl", 3600).thenReturn(10)
+    later = time.time() + 20
+    mockito.when(response_cache.time).time().thenReturn(later)
+    assert response_cache.get("pipelines", RUN_ID) is None
+    assert response_cache.get_validators("pipelines", RUN_ID) == (
+        record,
+        {"etag": '"1"', "last_modified": None},
+    )
+    response_cache.set_mode("refresh")
+    assert response_cache.get_validators("pipelines", RUN_ID) == (None, {})
+
+
+@pytest.fixture
+def stub_server():
+    # A local server that serves a single pipeline with an ETag, and responds with a 304 to
+    # requests that send a matching If-None-Match
+    state = {"etag": '"v1"', "record": {"pipeline_id": RUN_ID, "name": "Sword of Protection"}}
+    requests_received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_received.append(dict(self.headers))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.send_header("ETag", state["etag"])
+                self.end_headers()
+                return
+            body = json.dumps(state["record"]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", state["etag"])
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    address = f"127.0.0.1:{server.server_address[1]}"
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(address)
+    mockito.when(config).load_var("carrot_server_address").thenReturn(address)
+    # Make sure we get a fresh session with the default config
+    request_handler.close_session()
+    yield state, requests_received
+    request_handler.close_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_find_by_id_revalidates(stub_server):
+    state, requests_received = stub_server
+    mockito.when(config).load_var_with_default(...).thenCallOriginalImplementation()
+    mockito.when(config).load_var_with_default("response_cache_ttl", 3600).thenReturn(-1)
+    assert request_handler.find_by_id("pipelines", RUN_ID) == state["record"]
+    assert "If-None-Match" not in requests_received[0]
+    # The cached record has expired, so we should check whether it changed and get a 304
+    cached_record = dict(state["record"])
+    state["record"]["name"] = "Changed without a new etag"
+    assert request_handler.find_by_id("pipelines", RUN_ID) == cached_record
+    assert requests_received[1]["If-None-Match"] == '"v1"'
+    # Once the etag changes, we should get the new record
+    state["etag"] = '"v2"'
+    assert request_handler.find_by_id("pipelines", RUN_ID) == state["record"]
+    assert len(requests_received) == 3
+
+
+def test_update_removes_cached_record():
+    response_cache.put("pipelines", RUN_ID, {"name": "Old name"})
+    mockito.when(request_handler).send_request(...).thenReturn({"name": "New name"})
+    mockito.when(request_handler.name_cache).remove_id(...).thenReturn(None)
+    mockito.when(request_handler.name_cache).cache_from_response(...).thenReturn(None)
+    request_handler.update("pipelines", RUN_ID, [("name", "New name")])
+    assert response_cache.get("pipelines", RUN_ID) is None
+
+
+def test_set_mode_invalid():
+    with pytest.raises(ValueError):
+        response_cache.set_mode("offline")
@@ -0,0 +1,19 @@
+import pytest
+from carrot_cli.rest import run_status
+
+
+@pytest.mark.parametrize(
+    "status,terminal",
+    [
+        ("succeeded", True),
+        ("test_failed", True),
+        ("carrot_failed", True),
+        ("eval_aborted", True),
+        ("aborted", True),
+        ("running", False),
+        ("test_queued_in_cromwell", False),
+        ("building", False),
+    ],
+)
+def test_is_terminal(status, terminal):
+    assert run_status.is_terminal(status) == terminal
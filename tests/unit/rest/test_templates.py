@@ -3,7 +3,8 @@ import json
 
 import mockito
 import pytest
-from carrot_cli.rest import request_handler, templates
+from carrot_cli.config import manager as config
+from carrot_cli.rest import request_handler, templates, upload_manifest
 
 
 @pytest.fixture(autouse=True)
@@ -409,6 +410,74 @@ def test_update(update_data):
     assert result == update_data["return"]
 
 
+@pytest.fixture
+def uploaded_template():
+    # A template whose test WDL was uploaded from tests/data/test.wdl, and which still uses it
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+    template_id = "bd132568-06fe-4b1a-9e96-47d4f36bf819"
+    upload_manifest.record_uploads(
+        template_id,
+        {"test_wdl": upload_manifest.hash_file("tests/data/test.wdl")},
+        {"test_wdl": "gs://carrot/test.wdl"},
+    )
+    template = {"template_id": template_id, "test_wdl": "gs://carrot/test.wdl"}
+    mockito.when(request_handler).find_by_id(
+        "templates", template_id, revalidate=True
+    ).thenReturn(template)
+    return template
+
+
+def test_update_skips_unchanged_files(uploaded_template):
+    template_id = uploaded_template["template_id"]
+    response = dict(uploaded_template, eval_wdl="gs://carrot/eval.wdl")
+    mockito.when(request_handler).update(
+        "templates",
+        template_id,
+        [("name", ""), ("description", "New description")],
+        files={"eval_wdl_file": "tests/data/eval.wdl"},
+    ).thenReturn(response)
+    result = templates.update(
+        template_id, "", "New description", "tests/data/test.wdl", "", "tests/data/eval.wdl", ""
+    )
+    assert result == response
+    # The eval WDL should now be recorded too
+    assert upload_manifest.get_location(
+        template_id, "eval_wdl", upload_manifest.hash_file("tests/data/eval.wdl")
+    ) == "gs://carrot/eval.wdl"
+
+
+@pytest.fixture(params=["force_upload", "changed_file", "changed_template"])
+def reupload_reason(request, uploaded_template):
+    if request.param == "changed_template":
+        uploaded_template["test_wdl"] = "gs://elsewhere/test.wdl"
+    return request.param
+
+
+def test_update_reuploads_files(uploaded_template, reupload_reason):
+    template_id = uploaded_template["template_id"]
+    test_wdl = "tests/data/eval.wdl" if reupload_reason == "changed_file" else "tests/data/test.wdl"
+    mockito.when(request_handler).update(
+        "templates",
+        template_id,
+        [("name", ""), ("description", "")],
+        files={"test_wdl_file": test_wdl},
+    ).thenReturn(uploaded_template)
+    result = templates.update(
+        template_id,
+        "",
+        "",
+        test_wdl,
+        "",
+        "",
+        "",
+        force_upload=(reupload_reason == "force_upload"),
+    )
+    assert result == uploaded_template
+
+
 @pytest.fixture(
     params=[
         {
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.rest import throttle
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def server_address():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+
+
+@pytest.fixture
+def sleeps():
+    # Freeze the clock and record sleeps instead of sleeping
+    sleeps = []
+    now = time.time()
+    mockito.when(throttle.time).time().thenReturn(now)
+    mockito.when(throttle.time).sleep(...).thenAnswer(sleeps.append)
+    return sleeps
+
+
+@pytest.fixture(params=[True, False])
+def file_locking(request, monkeypatch):
+    # Test with the limit state shared through files, and with it kept in this process
+    if not request.param:
+        monkeypatch.setattr(throttle, "fcntl", None)
+        monkeypatch.setattr(throttle, "__BUCKETS", {})
+        monkeypatch.setattr(throttle, "__SEMAPHORES", {})
+    return request.param
+
+
+def send_requests(count):
+    for _ in range(count):
+        with throttle.limit():
+            pass
+
+
+def test_limit_no_limits(sleeps, home):
+    send_requests(5)
+    assert sleeps == []
+    # With no limits, we shouldn't need any state files
+    assert not (home / ".carrot_cli" / "throttle").exists()
+
+
+def test_limit_rate(sleeps, file_locking):
+    mockito.when(config).load_var_no_error("rate_limit").thenReturn("2")
+    mockito.when(config).load_var_no_error("rate_burst").thenReturn("3")
+    send_requests(6)
+    # The first 3 requests use up the burst, and after that they're spaced half a second apart
+    assert sleeps == pytest.approx([0.5, 1.0, 1.5])
+
+
+def test_limit_rate_refills(sleeps, file_locking):
+    mockito.when(config).load_var_no_error("rate_limit").thenReturn("1")
+    send_requests(1)
+    later = time.time() + 10
+    mockito.when(throttle.time).time().thenReturn(later)
+    # The bucket should only hold one token, no matter how long it's been
+    send_requests(2)
+    assert sleeps == pytest.approx([1.0])
+
+
+def test_limit_rate_shared_between_servers(sleeps):
+    mockito.when(config).load_var_no_error("rate_limit").thenReturn("1")
+    send_requests(1)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    send_requests(1)
+    # Each server has its own bucket
+    assert sleeps == []
+
+
+def test_limit_rate_per_server(sleeps):
+    mockito.when(config).load_var_no_error("rate_limit").thenReturn("1")
+    mockito.when(config).load_var_no_error("server_limits").thenReturn(
+        '{"example.com": {"rate_limit": 2, "rate_burst": 2}}'
+    )
+    send_requests(3)
+    # example.com has its own limits
+    assert sleeps == pytest.approx([0.5])
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    send_requests(2)
+    # Other servers use the global ones
+    assert sleeps == pytest.approx([0.5, 1.0])
+
+
+@pytest.mark.parametrize(
+    "server_limits", ["{not json", '["example.com"]', '{"example.com": 5}']
+)
+def test_limit_invalid_server_limits(sleeps, server_limits):
+    mockito.when(config).load_var_no_error("rate_limit").thenReturn("1")
+    mockito.when(config).load_var_no_error("server_limits").thenReturn(server_limits)
+    send_requests(2)
+    # Invalid server limits are ignored in favor of the global ones
+    assert sleeps == pytest.approx([1.0])
+
+
+def test_limit_max_in_flight(file_locking):
+    mockito.when(config).load_var_no_error("max_in_flight").thenReturn("2")
+    in_flight = []
+    max_seen = []
+    lock = threading.Lock()
+
+    def send():
+        with throttle.limit():
+            with lock:
+                in_flight.append(1)
+                max_seen.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=send) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(max_seen) == 6
+    assert max(max_seen) == 2
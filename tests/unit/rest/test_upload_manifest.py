@@ -0,0 +1,74 @@
+import hashlib
+
+import mockito
+import pytest
+from carrot_cli.config import manager as config
+from carrot_cli.rest import upload_manifest
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def server_address():
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.com"
+    )
+
+
+TEMPLATE_ID = "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "test.wdl"
+    path.write_bytes(b"workflow sword {}")
+    assert upload_manifest.hash_file(str(path)) == hashlib.sha256(b"workflow sword {}").hexdigest()
+    assert upload_manifest.hash_file(str(tmp_path / "missing.wdl")) is None
+
+
+def test_record_uploads_and_get_location():
+    upload_manifest.record_uploads(
+        TEMPLATE_ID,
+        {"test_wdl": "abc123", "eval_wdl": "def456"},
+        {"test_wdl": "gs://bucket/test.wdl", "eval_wdl": "gs://bucket/eval.wdl"},
+    )
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "abc123") == "gs://bucket/test.wdl"
+    # A file with different contents wasn't uploaded
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "def456") is None
+    entry = upload_manifest.get_upload(TEMPLATE_ID, "eval_wdl")
+    assert entry["sha256"] == "def456"
+    assert entry["location"] == "gs://bucket/eval.wdl"
+    assert upload_manifest.get_upload(TEMPLATE_ID, "test_wdl_dependencies") is None
+    # Uploads to other servers are kept separately
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(
+        "example.org"
+    )
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "abc123") is None
+
+
+def test_record_uploads_failed_request():
+    upload_manifest.record_uploads(TEMPLATE_ID, {"test_wdl": "abc123"}, {"test_wdl": "gs://a"})
+    # If the response doesn't have the location of a file, we don't know what the server has
+    upload_manifest.record_uploads(TEMPLATE_ID, {"test_wdl": "def456"}, {"name": "Sword"})
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "abc123") is None
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "def456") is None
+
+
+def test_remove_template_and_clear():
+    upload_manifest.record_uploads(TEMPLATE_ID, {"test_wdl": "abc123"}, {"test_wdl": "gs://a"})
+    upload_manifest.record_uploads("other", {"test_wdl": "abc123"}, {"test_wdl": "gs://b"})
+    upload_manifest.remove_template(TEMPLATE_ID)
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "abc123") is None
+    assert upload_manifest.get_location("other", "test_wdl", "abc123") == "gs://b"
+    upload_manifest.clear()
+    assert upload_manifest.get_location("other", "test_wdl", "abc123") is None
+
+
+def test_no_server_address():
+    mockito.when(config).load_var_no_error("carrot_server_address").thenReturn(None)
+    upload_manifest.record_uploads(TEMPLATE_ID, {"test_wdl": "abc123"}, {"test_wdl": "gs://a"})
+    assert upload_manifest.get_location(TEMPLATE_ID, "test_wdl", "abc123") is None
@@ -18,6 +18,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -352,7 +354,7 @@ def update_data(request):
         mockito.when(results).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(results).update(
@@ -496,7 +498,7 @@ def delete_data(request):
         request.param["return"]
     )
     mockito.when(results).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     return request.param
 
@@ -644,11 +646,11 @@ def map_to_template_data(request):
         mockito.when(results).find(
             name=request.param["from_names"]["result_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["result_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["result_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(template_results).create_map(
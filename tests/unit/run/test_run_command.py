@@ -5,9 +5,10 @@ from click.testing import CliRunner
 
 import mockito
 import pytest
+from carrot_cli import dependency_util, output, watch_util
 from carrot_cli.__main__ import main_entry as carrot
 from carrot_cli.config import manager as config
-from carrot_cli.rest import reports, run_reports, runs
+from carrot_cli.rest import reports, request_handler, run_reports, runs
 
 
 @pytest.fixture(autouse=True)
@@ -18,6 +19,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 @pytest.fixture(
@@ -274,11 +277,11 @@ def delete_data(request):
         mockito.when(runs).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(runs).delete(request.param["id"]).thenReturn(request.param["return"])
     mockito.when(runs).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     return request.param
 
@@ -489,11 +492,11 @@ def create_report_data(request):
         mockito.when(runs).find(
             name=request.param["from_names"]["run_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["run_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["run_return"]))
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(run_reports).create_map(
@@ -679,11 +682,11 @@ def find_report_by_ids_data(request):
         mockito.when(runs).find(
             name=request.param["from_names"]["run_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["run_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["run_return"]))
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(run_reports).find_map_by_ids(
@@ -959,11 +962,11 @@ def find_reports_data(request):
         mockito.when(runs).find(
             name=request.param["from_names"]["run_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["run_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["run_return"]))
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
     # Mock up request response
     mockito.when(run_reports).find_maps(
         request.param["params"][0],
@@ -1282,11 +1285,11 @@ def delete_report_by_ids_data(request):
         mockito.when(runs).find(
             name=request.param["from_names"]["run_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["run_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["run_return"]))
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["ids"]) > 0:
         mockito.when(run_reports).delete_map_by_ids(
@@ -1296,7 +1299,7 @@ def delete_report_by_ids_data(request):
         mockito.when(run_reports).find_map_by_ids(
             request.param["ids"][0],
             request.param["ids"][1],
-        ).thenReturn(request.param["find_return"])
+        ).thenReturn(json.loads(request.param["find_return"]))
     return request.param
 
 
@@ -1322,3 +1325,110 @@ def test_delete_report_by_ids(delete_report_by_ids_data, caplog):
     # If we expect logging that we want to check, make sure it's there
     if "logging" in delete_report_by_ids_data:
         assert delete_report_by_ids_data["logging"] in caplog.text
+
+
+@pytest.fixture(
+    params=[
+        {
+            "statuses": ["succeeded"],
+            "exit_code": 0,
+        },
+        {
+            "statuses": ["running", "eval_failed"],
+            "exit_code": 1,
+        },
+    ]
+)
+def wait_data(request):
+    run_id = "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+    mockito.when(watch_util.time).sleep(...).thenReturn(None)
+    request.param["records"] = [
+        {"run_id": run_id, "name": "Queen of Bright Moon run", "status": status}
+        for status in request.param["statuses"]
+    ]
+    mockito.when(runs).find_by_id(run_id).thenReturn(*request.param["records"])
+    request.param["run_id"] = run_id
+    return request.param
+
+
+def test_wait(wait_data):
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["run", "wait", wait_data["run_id"], "--min_interval", 0])
+    assert result.exit_code == wait_data["exit_code"]
+    assert json.loads(result.output) == [wait_data["records"][-1]]
+
+
+@pytest.fixture(
+    params=[
+        {
+            "responses": [
+                request_handler.ErrorResponse(
+                    status=404, body={"title": "No run found", "status": 404}
+                )
+            ],
+            "args": [],
+            "exit_code": 1,
+        },
+        {
+            "responses": [
+                request_handler.ErrorResponse(status=500, message="Server error"),
+            ],
+            "args": ["--timeout", 0],
+            "exit_code": 2,
+        },
+    ]
+)
+def wait_error_data(request):
+    run_id = "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+    mockito.when(watch_util.time).sleep(...).thenReturn(None)
+    mockito.when(runs).find_by_id(run_id).thenReturn(*request.param["responses"])
+    request.param["run_id"] = run_id
+    return request.param
+
+
+def test_wait_error(wait_error_data):
+    runner = CliRunner()
+    result = runner.invoke(
+        carrot, ["run", "wait", wait_error_data["run_id"]] + wait_error_data["args"]
+    )
+    assert result.exit_code == wait_error_data["exit_code"]
+    assert json.loads(result.output) == [
+        {
+            "run_id": wait_error_data["run_id"],
+            "error": output.format_result(wait_error_data["responses"][-1]),
+        }
+    ]
+
+
+def test_wait_by_names():
+    # All the names should be resolved with one batched lookup
+    names = {
+        "Queen of Bright Moon run": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+        "Princess of Power run": "bd132568-06fe-4b1a-9e96-47d4f36bf819",
+    }
+    mockito.when(dependency_util).get_ids_from_ids_or_names_and_handle_error(
+        [(name, runs, "run_id", "run") for name in list(names) + ["Princess of Power run"]]
+    ).thenReturn(list(names.values()) + [names["Princess of Power run"]])
+    mockito.when(watch_util.time).sleep(...).thenReturn(None)
+    records = {
+        run_id: {"run_id": run_id, "name": name, "status": "succeeded"}
+        for name, run_id in names.items()
+    }
+    for run_id, record in records.items():
+        mockito.when(runs).find_by_id(run_id).thenReturn(record)
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["run", "wait"] + list(names) + ["Princess of Power run"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == list(records.values()) + [
+        records[names["Princess of Power run"]]
+    ]
+    mockito.verify(dependency_util, times=0).get_id_from_id_or_name_and_handle_error(...)
+
+
+def test_watch(wait_data):
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["run", "watch", wait_data["run_id"], "--min_interval", 0])
+    assert result.exit_code == wait_data["exit_code"]
+    events = [json.loads(line) for line in result.output.splitlines()]
+    assert [event["status"] for event in events] == wait_data["statuses"]
+    assert all(event["run_id"] == wait_data["run_id"] for event in events)
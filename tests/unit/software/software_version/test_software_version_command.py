@@ -217,7 +217,7 @@ def find_data(request):
         mockito.when(software).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(software_versions).find(
         request.param["params"][0],
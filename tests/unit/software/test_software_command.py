@@ -17,6 +17,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -175,6 +177,45 @@ def test_find(find_data):
     assert test_software.output == find_data["return"] + "\n"
 
 
+def test_find_all():
+    first_page = [{"name": "Sword of Protection software"}, {"name": "Sword of Power software"}]
+    mockito.when(software).find(...).thenReturn(None)
+    mockito.when(software).find("", "", "", "", "", "", "", "", 2, 0).thenReturn(
+        first_page
+    )
+    mockito.when(software).find("", "", "", "", "", "", "", "", 10, 2).thenReturn(
+        [{"name": "Sword of Truth software"}]
+    )
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["software", "find", "--limit", 2, "--all"])
+    assert json.loads(result.output) == first_page + [{"name": "Sword of Truth software"}]
+
+
+def test_find_ndjson():
+    records = [{"name": "Sword of Protection software"}, {"name": "Sword of Power software"}]
+    mockito.when(software).find(...).thenReturn(None)
+    mockito.when(software).find("", "", "", "", "", "", "", "", 20, 0).thenReturn(records)
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["--output", "ndjson", "software", "find"])
+    assert result.output == (
+        '{"name":"Sword of Protection software"}\n{"name":"Sword of Power software"}\n'
+    )
+
+
+def test_find_ndjson_streamed():
+    records = [{"name": "Sword of Protection software"}, {"name": "Sword of Power software"}]
+    mockito.when(software).find(...).thenReturn(None)
+    # Within streaming, find returns a generator of records as they're parsed
+    mockito.when(software).find("", "", "", "", "", "", "", "", 20, 0).thenReturn(
+        (record for record in records)
+    )
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["--output", "ndjson", "software", "find"])
+    assert result.output == (
+        '{"name":"Sword of Protection software"}\n{"name":"Sword of Power software"}\n'
+    )
+
+
 @pytest.fixture(
     params=[
         {
@@ -351,7 +392,7 @@ def update_data(request):
         mockito.when(software).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(software).update(
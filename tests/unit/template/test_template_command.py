@@ -6,6 +6,7 @@ from click.testing import CliRunner
 import mockito
 import pytest
 from carrot_cli.__main__ import main_entry as carrot
+from carrot_cli import wdl_util
 from carrot_cli.config import manager as config
 from carrot_cli.rest import pipelines, reports, results, runs, template_reports, template_results, templates
 
@@ -18,6 +19,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -250,7 +253,7 @@ def find_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(templates).find(
         request.param["params"][0],
@@ -431,7 +434,7 @@ def create_data(request):
         mockito.when(pipelines).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(templates).create(
@@ -456,6 +459,100 @@ def test_create(create_data, caplog):
         assert result.output == create_data["return"] + "\n"
 
 
+@pytest.fixture(
+    params=[
+        {
+            "test_wdl": "tests/data/test.wdl",
+            "test_wdl_dependencies": "/tmp/test_deps.zip",
+            "eval_wdl": "tests/data/eval.wdl",
+            "eval_wdl_dependencies": "example.com/she-ra_eval_dep.zip",
+            "built": {},
+        },
+        {
+            "test_wdl": "tests/data/test.wdl",
+            "test_wdl_dependencies": "/tmp/test_deps.zip",
+            "eval_wdl": "tests/data/eval.wdl",
+            "eval_wdl_dependencies": None,
+            "built": {"tests/data/eval.wdl": "/tmp/eval_deps.zip"},
+        },
+        {
+            "test_wdl": "tests/data/test.wdl",
+            "test_wdl_dependencies": None,
+            "eval_wdl": "example.com/she-ra_eval.wdl",
+            "eval_wdl_dependencies": "example.com/she-ra_eval_dep.zip",
+            "built": {"tests/data/test.wdl": None},
+        },
+        {
+            "test_wdl": "tests/data/test.wdl",
+            "test_wdl_dependencies": "/tmp/test_deps.zip",
+            "eval_wdl": "http://example.com/she-ra_eval.wdl",
+            "eval_wdl_dependencies": None,
+            "built": {},
+            "logging": "Can't build the dependencies zip for http://example.com/she-ra_eval.wdl",
+        },
+        {
+            "test_wdl": "tests/data/test.wdl",
+            "test_wdl_dependencies": None,
+            "eval_wdl": "example.com/she-ra_eval.wdl",
+            "eval_wdl_dependencies": "example.com/she-ra_eval_dep.zip",
+            "built": {"tests/data/test.wdl": wdl_util.WdlImportError("Failed to read lib.wdl")},
+            "logging": "Failed to read lib.wdl",
+        },
+    ]
+)
+def build_dependencies_data(request):
+    mockito.when(templates).create(...).thenReturn(None)
+    for wdl, built in request.param["built"].items():
+        if isinstance(built, Exception):
+            mockito.when(wdl_util).build_dependency_zip(wdl).thenRaise(built)
+        else:
+            mockito.when(wdl_util).build_dependency_zip(wdl).thenReturn(built)
+    return request.param
+
+
+def test_create_build_dependencies(build_dependencies_data, caplog):
+    args = [
+        "template",
+        "create",
+        "--pipeline",
+        "550e8400-e29b-41d4-a716-446655440000",
+        "--name",
+        "Sword of Protection template",
+        "--test_wdl",
+        build_dependencies_data["test_wdl"],
+        "--eval_wdl",
+        build_dependencies_data["eval_wdl"],
+        "--created_by",
+        "adora@example.com",
+        "--build_dependencies",
+    ]
+    for field in ("test_wdl_dependencies", "eval_wdl_dependencies"):
+        if build_dependencies_data[field] is not None:
+            args += [f"--{field}", build_dependencies_data[field]]
+    runner = CliRunner()
+    result = runner.invoke(carrot, args)
+    if "logging" in build_dependencies_data:
+        assert result.exit_code == 1
+        assert build_dependencies_data["logging"] in caplog.text
+        mockito.verify(templates, times=0).create(...)
+        return
+    # Dependencies that were specified should be used as they are, and the others built
+    built = build_dependencies_data["built"]
+    expected = []
+    for wdl_field in ("test_wdl", "eval_wdl"):
+        dependencies = build_dependencies_data[f"{wdl_field}_dependencies"]
+        if dependencies is None:
+            dependencies = built[build_dependencies_data[wdl_field]] or ""
+        expected += [build_dependencies_data[wdl_field], dependencies]
+    mockito.verify(templates).create(
+        "Sword of Protection template",
+        "550e8400-e29b-41d4-a716-446655440000",
+        "",
+        *expected,
+        "adora@example.com"
+    )
+
+
 @pytest.fixture(
     params=[
         {
@@ -475,7 +572,9 @@ def test_create(create_data, caplog):
                 "example.com/she-ra_eval.wdl",
                 "--eval_wdl_dependencies",
                 "example.com/she-ra_eval_dep.zip",
+                "--force_upload",
             ],
+            "force_upload": True,
             "params": [
                 "cd987859-06fe-4b1a-9e96-47d4f36bf819",
                 "New Sword of Protection template",
@@ -586,7 +685,7 @@ def update_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(templates).update(
@@ -597,6 +696,7 @@ def update_data(request):
             request.param["params"][4],
             request.param["params"][5],
             request.param["params"][6],
+            force_upload=request.param.get("force_upload", False),
         ).thenReturn(request.param["return"])
     return request.param
 
@@ -789,13 +889,13 @@ def delete_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(templates).delete(request.param["id"]).thenReturn(
         request.param["return"]
     )
     mockito.when(templates).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     return request.param
 
@@ -1054,7 +1154,7 @@ def find_runs_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     if len(request.param["params"]) > 0:
         mockito.when(runs).find(
@@ -1201,7 +1301,7 @@ def subscribe_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(templates).subscribe(
         request.param["params"][0], request.param["params"][1]
@@ -1303,7 +1403,7 @@ def unsubscribe_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(templates).unsubscribe(
         request.param["params"][0], request.param["params"][1]
@@ -1440,11 +1540,11 @@ def map_to_result_data(request):
         mockito.when(results).find(
             name=request.param["from_names"]["result_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["result_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["result_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(template_results).create_map(
@@ -1566,11 +1666,11 @@ def find_result_map_by_id_data(request):
         mockito.when(results).find(
             name=request.param["from_names"]["result_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["result_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["result_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(template_results).find_map_by_ids(
@@ -1754,11 +1854,11 @@ def find_result_maps_data(request):
         mockito.when(results).find(
             name=request.param["from_names"]["result_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["result_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["result_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response
     mockito.when(template_results).find_maps(
         request.param["params"][0],
@@ -2017,11 +2117,11 @@ def delete_result_map_by_id_data(request):
         mockito.when(results).find(
             name=request.param["from_names"]["result_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["result_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["result_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["ids"]) > 0:
         mockito.when(template_results).delete_map_by_ids(
@@ -2031,7 +2131,7 @@ def delete_result_map_by_id_data(request):
         mockito.when(template_results).find_map_by_ids(
             request.param["ids"][0],
             request.param["ids"][1],
-        ).thenReturn(request.param["find_return"])
+        ).thenReturn(json.loads(request.param["find_return"]))
     return request.param
 
 
@@ -2229,11 +2329,11 @@ def map_to_report_data(request):
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(template_reports).create_map(
@@ -2408,11 +2508,11 @@ def find_report_map_by_id_data(request):
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(template_reports).find_map_by_ids(
@@ -2641,11 +2741,11 @@ def find_report_maps_data(request):
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response
     mockito.when(template_reports).find_maps(
         request.param["params"][0],
@@ -2926,11 +3026,11 @@ def delete_report_map_by_id_data(request):
         mockito.when(reports).find(
             name=request.param["from_names"]["report_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["report_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["report_return"]))
         mockito.when(templates).find(
             name=request.param["from_names"]["template_name"],
             limit=2
-        ).thenReturn(request.param["from_names"]["template_return"])
+        ).thenReturn(json.loads(request.param["from_names"]["template_return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["ids"]) > 0:
         mockito.when(template_reports).delete_map_by_ids(
@@ -2940,7 +3040,7 @@ def delete_report_map_by_id_data(request):
         mockito.when(template_reports).find_map_by_ids(
             request.param["ids"][0],
             request.param["ids"][1],
-        ).thenReturn(request.param["find_return"])
+        ).thenReturn(json.loads(request.param["find_return"]))
     return request.param
 
 
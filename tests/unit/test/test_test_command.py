@@ -8,6 +8,7 @@ import pytest
 from carrot_cli.__main__ import main_entry as carrot
 from carrot_cli.config import manager as config
 from carrot_cli.rest import runs, templates, tests
+from carrot_cli.rest.request_handler import ErrorResponse
 
 
 @pytest.fixture(autouse=True)
@@ -18,6 +19,8 @@ def unstub():
 
 @pytest.fixture(autouse=True)
 def no_email():
+    # Other config variables should also read as unset
+    mockito.when(config).load_var_no_error(...).thenReturn(None)
     mockito.when(config).load_var_no_error("email").thenReturn(None)
 
 
@@ -275,7 +278,7 @@ def find_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(tests).find(
         request.param["params"][0],
@@ -461,7 +464,7 @@ def create_data(request):
         mockito.when(templates).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(tests).create(
@@ -616,7 +619,7 @@ def update_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response only if we expect it to get that far
     if len(request.param["params"]) > 0:
         mockito.when(tests).update(
@@ -814,11 +817,11 @@ def delete_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(tests).delete(request.param["id"]).thenReturn(request.param["return"])
     mockito.when(tests).find_by_id(request.param["id"]).thenReturn(
-        request.param["find_return"]
+        json.loads(request.param["find_return"])
     )
     return request.param
 
@@ -1037,7 +1040,7 @@ def run_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     if len(request.param["params"]) > 0:
         mockito.when(tests).run(
@@ -1295,7 +1298,7 @@ def find_runs_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     if len(request.param["params"]) > 0:
         mockito.when(runs).find(
@@ -1442,7 +1445,7 @@ def subscribe_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(tests).subscribe(
         request.param["params"][0], request.param["params"][1]
@@ -1544,7 +1547,7 @@ def unsubscribe_data(request):
         mockito.when(tests).find(
             name=request.param["from_name"]["name"],
             limit=2
-        ).thenReturn(request.param["from_name"]["return"])
+        ).thenReturn(json.loads(request.param["from_name"]["return"]))
     # Mock up request response
     mockito.when(tests).unsubscribe(
         request.param["params"][0], request.param["params"][1]
@@ -1556,3 +1559,47 @@ def test_unsubscribe(unsubscribe_data):
     runner = CliRunner()
     result = runner.invoke(carrot, unsubscribe_data["args"])
     assert result.output == unsubscribe_data["return"] + "\n"
+
+
+def test_run_batch(tmp_path):
+    test_id = "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8"
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(f"test,name\n{test_id},run 1\n{test_id},run 2\n")
+    mockito.when(config).load_var_no_error("email").thenReturn("adora@example.com")
+    mockito.when(tests).run(...).thenReturn(None)
+    mockito.when(tests).run(test_id, "run 1", "", "", "", "", "adora@example.com").thenReturn(
+        {"run_id": "11111111-2222-3333-4444-555555555555", "name": "run 1"}
+    )
+    mockito.when(tests).run(test_id, "run 2", "", "", "", "", "adora@example.com").thenReturn(
+        ErrorResponse(status=500, text="Internal server error")
+    )
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["test", "run_batch", str(manifest), "--parallelism", 2])
+    assert result.exit_code == 1
+    assert json.loads(result.output) == [
+        {
+            "row": 1,
+            "test": test_id,
+            "name": "run 1",
+            "status": "submitted",
+            "run_id": "11111111-2222-3333-4444-555555555555",
+        },
+        {
+            "row": 2,
+            "test": test_id,
+            "name": "run 2",
+            "status": "failed",
+            "error": json.dumps(
+                {"Status": 500, "Body": "Internal server error"}, indent=4, sort_keys=True
+            ),
+        },
+    ]
+
+
+def test_run_batch_no_email(tmp_path, caplog):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"test": "Sword of Protection test"}\n')
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["test", "run_batch", str(manifest)])
+    assert result.exit_code == 1
+    assert "No email config variable set" in caplog.text
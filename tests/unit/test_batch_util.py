@@ -0,0 +1,153 @@
+import json
+
+import mockito
+import pytest
+from carrot_cli import batch_util
+from carrot_cli.rest import name_cache, tests
+from carrot_cli.rest.request_handler import ErrorResponse
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def no_cached_names():
+    mockito.when(name_cache).get(...).thenReturn(None)
+    mockito.when(name_cache).put(...).thenReturn(None)
+
+
+@pytest.fixture
+def manifest_dir(tmp_path):
+    (tmp_path / "test_input.json").write_text(json.dumps({"in_greeted": "Cool Person"}))
+    (tmp_path / "eval_input.json").write_text(json.dumps({"in_output_filename": "out.txt"}))
+    (tmp_path / "bad.json").write_text("{not json")
+    return tmp_path
+
+
+def test_read_manifest_csv(manifest_dir):
+    manifest = manifest_dir / "manifest.csv"
+    manifest.write_text(
+        "test,name,test_input,eval_input\n"
+        "Sword of Protection test,run 1,test_input.json,\n"
+        "Sword of Protection test,run 2,,eval_input.json\n"
+    )
+    rows = batch_util.read_manifest(str(manifest))
+    assert rows == [
+        {
+            "test": "Sword of Protection test",
+            "name": "run 1",
+            "test_input": str(manifest_dir / "test_input.json"),
+            "eval_input": "",
+        },
+        {
+            "test": "Sword of Protection test",
+            "name": "run 2",
+            "test_input": "",
+            "eval_input": str(manifest_dir / "eval_input.json"),
+        },
+    ]
+
+
+def test_read_manifest_jsonl(manifest_dir):
+    manifest = manifest_dir / "manifest.jsonl"
+    manifest.write_text(
+        '{"test": "Sword of Protection test", "test_input": {"in_greeted": "Inline Person"}}\n'
+        "\n"
+        '{"test": "Sword of Power test", "eval_input": "eval_input.json"}\n'
+    )
+    rows = batch_util.read_manifest(str(manifest))
+    assert rows == [
+        {"test": "Sword of Protection test", "test_input": {"in_greeted": "Inline Person"}},
+        {"test": "Sword of Power test", "eval_input": str(manifest_dir / "eval_input.json")},
+    ]
+
+
+@pytest.fixture(
+    params=[
+        '{"name": "run with no test"}\n',
+        '{"test": "Sword of Protection test", "color": "blue"}\n',
+        "{not json\n",
+    ]
+)
+def bad_manifest(request, manifest_dir):
+    manifest = manifest_dir / "manifest.jsonl"
+    manifest.write_text(request.param)
+    return str(manifest)
+
+
+def test_read_manifest_invalid(bad_manifest):
+    with pytest.raises(SystemExit):
+        batch_util.read_manifest(bad_manifest)
+
+
+def test_run_batch(manifest_dir):
+    test_id = "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8"
+    mockito.when(tests).find(...).thenReturn(None)
+    # Each test should only be looked up once
+    mockito.expect(tests, times=1).find(name="Sword of Protection test", limit=2).thenReturn(
+        [{"name": "Sword of Protection test", "test_id": test_id}]
+    )
+    mockito.expect(tests, times=1).find(name="Sword of Power test", limit=2).thenReturn(
+        ErrorResponse(status=404, body={"title": "No tests found"})
+    )
+    mockito.when(tests).run(...).thenReturn(None)
+    mockito.when(tests).run(
+        test_id, "run 1", {"in_greeted": "Cool Person"}, "", "", "", "adora@example.com"
+    ).thenReturn({"run_id": "11111111-2222-3333-4444-555555555555", "name": "run 1"})
+    mockito.when(tests).run(
+        test_id, "", {"in_greeted": "Cool Person"}, "", "", "", "glimmer@example.com"
+    ).thenReturn({"run_id": "66666666-2222-3333-4444-555555555555", "name": "generated"})
+    mockito.when(tests).run(
+        test_id, "run 3", "", "", "", "", "adora@example.com"
+    ).thenReturn(ErrorResponse(status=500, text="Internal server error"))
+    rows = [
+        {
+            "test": "Sword of Protection test",
+            "name": "run 1",
+            "test_input": str(manifest_dir / "test_input.json"),
+        },
+        {
+            "test": "Sword of Protection test",
+            "test_input": str(manifest_dir / "test_input.json"),
+            "created_by": "glimmer@example.com",
+        },
+        {"test": "Sword of Protection test", "name": "run 3"},
+        {"test": "Sword of Power test", "name": "run 4"},
+        {
+            "test": "Sword of Protection test",
+            "name": "run 5",
+            "eval_input": str(manifest_dir / "bad.json"),
+        },
+    ]
+    report = batch_util.run_batch(rows, "adora@example.com", 3, 0)
+    assert report[0] == {
+        "row": 1,
+        "test": "Sword of Protection test",
+        "name": "run 1",
+        "status": "submitted",
+        "run_id": "11111111-2222-3333-4444-555555555555",
+    }
+    assert report[1]["status"] == "submitted"
+    assert report[1]["name"] == "generated"
+    assert report[2]["status"] == "failed"
+    assert "Internal server error" in report[2]["error"]
+    assert report[3]["status"] == "failed"
+    assert "No tests found" in report[3]["error"]
+    assert report[4]["status"] == "failed"
+    assert "JSONDecodeError" in report[4]["error"]
+    mockito.verify(tests, times=3).run(...)
+
+
+def test_rate_limiter():
+    times = iter([0.0, 0.0, 0.1])
+    sleeps = []
+    mockito.when(batch_util.time).monotonic().thenAnswer(lambda: next(times))
+    mockito.when(batch_util.time).sleep(...).thenAnswer(sleeps.append)
+    rate_limiter = batch_util.RateLimiter(2)
+    for _ in range(3):
+        rate_limiter.acquire()
+    # The second call comes right after the first, and the third 0.1 seconds later
+    assert sleeps == [0.5, 0.9]
@@ -5,7 +5,21 @@ import mockito
 import pytest
 
 from carrot_cli import dependency_util
-from carrot_cli.rest import pipelines
+from carrot_cli.rest import name_cache, pipelines, templates
+from carrot_cli.rest.request_handler import ErrorResponse
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def no_cached_names():
+    # Don't use or update the real name cache
+    mockito.when(name_cache).get(...).thenReturn(None)
+    mockito.when(name_cache).put(...).thenReturn(None)
 
 @pytest.fixture(
     params=[
@@ -14,19 +28,15 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "pipeline_id",
             "entity_name": "pipeline",
-            "request_return": json.dumps(
-                [
-                    {
-                        "created_at": "2020-09-16T18:48:06.371563",
-                        "created_by": "adora@example.com",
-                        "description": "This is the old description for this pipeline",
-                        "name": "Sword of Protection pipeline",
-                        "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
-                    }
-                ],
-                indent=4,
-                sort_keys=True,
-            ),
+            "request_return": [
+                {
+                    "created_at": "2020-09-16T18:48:06.371563",
+                    "created_by": "adora@example.com",
+                    "description": "This is the old description for this pipeline",
+                    "name": "Sword of Protection pipeline",
+                    "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
+                }
+            ],
             "return": "550e8400-e29b-41d4-a716-446655440000"
         },
         {
@@ -42,15 +52,11 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "pipeline_id",
             "entity_name": "pipeline",
-            "request_return": json.dumps(
-                {
-                    "title": "No pipeline found",
-                    "status": 404,
-                    "detail": "No pipelines found with the specified parameters"
-                },
-                indent=4,
-                sort_keys=True,
-            ),
+            "request_return": {
+                "title": "No pipeline found",
+                "status": 404,
+                "detail": "No pipelines found with the specified parameters"
+            },
             "logging": "Encountered an error processing value for pipeline: " +
                json.dumps(
                     {
@@ -67,26 +73,22 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "pipeline_id",
             "entity_name": "pipeline",
-            "request_return": json.dumps(
-                [
-                    {
-                        "created_at": "2020-09-16T18:48:06.371563",
-                        "created_by": "adora@example.com",
-                        "description": "This is the old description for this pipeline",
-                        "name": "Sword of Protection pipeline",
-                        "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
-                    },
-                    {
-                        "created_at": "2020-09-16T18:48:06.371563",
-                        "created_by": "adora@example.com",
-                        "description": "This pipeline is one we weren't looking for",
-                        "name": "Some other pipeline",
-                        "pipeline_id": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
-                    }
-                ],
-                indent=4,
-                sort_keys=True,
-            ),
+            "request_return": [
+                {
+                    "created_at": "2020-09-16T18:48:06.371563",
+                    "created_by": "adora@example.com",
+                    "description": "This is the old description for this pipeline",
+                    "name": "Sword of Protection pipeline",
+                    "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
+                },
+                {
+                    "created_at": "2020-09-16T18:48:06.371563",
+                    "created_by": "adora@example.com",
+                    "description": "This pipeline is one we weren't looking for",
+                    "name": "Some other pipeline",
+                    "pipeline_id": "cd987859-06fe-4b1a-9e96-47d4f36bf819",
+                }
+            ],
             "logging": "Encountered an error processing value for pipeline: Attempt to retrieve record by name produced "
                        "unexpected result: " +
                        json.dumps(
@@ -115,7 +117,7 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "pipeline_id",
             "entity_name": "pipeline",
-            "request_return": json.dumps([], indent=4, sort_keys=True),
+            "request_return": [],
             "logging": "Encountered an error processing value for pipeline: Attempt to retrieve record by name produced "
                        "unexpected result: " + json.dumps([], indent=4, sort_keys=True),
         },
@@ -124,19 +126,15 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "template_id",
             "entity_name": "pipeline",
-            "request_return": json.dumps(
-                [
-                    {
-                        "created_at": "2020-09-16T18:48:06.371563",
-                        "created_by": "adora@example.com",
-                        "description": "This is the old description for this pipeline",
-                        "name": "Sword of Protection pipeline",
-                        "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
-                    }
-                ],
-                indent=4,
-                sort_keys=True,
-            ),
+            "request_return": [
+                {
+                    "created_at": "2020-09-16T18:48:06.371563",
+                    "created_by": "adora@example.com",
+                    "description": "This is the old description for this pipeline",
+                    "name": "Sword of Protection pipeline",
+                    "pipeline_id": "550e8400-e29b-41d4-a716-446655440000",
+                }
+            ],
             "logging": "Encountered an error processing value for pipeline: Attempt to retrieve template_id by name "
                        "failed with record: " +
                        json.dumps(
@@ -158,7 +156,9 @@ from carrot_cli.rest import pipelines
             "module": pipelines,
             "id_key": "pipeline_id",
             "entity_name": "pipeline",
-            "request_return": "The Horde prevented your request from being processed.",
+            "request_return": ErrorResponse(
+                message="The Horde prevented your request from being processed."
+            ),
             "logging": "Encountered an error processing value for pipeline: The Horde prevented your request from being "
                        "processed.",
         },
@@ -195,3 +195,66 @@ def test_get_id_from_id_or_name_and_handle_error(get_id_from_id_or_name_and_hand
             get_id_from_id_or_name_and_handle_error_data["entity_name"]
         )
         assert result == get_id_from_id_or_name_and_handle_error_data["return"]
+
+
+def test_find_id_by_name_cached():
+    mockito.when(name_cache).get("pipelines", "Test name").thenReturn(
+        "550e8400-e29b-41d4-a716-446655440000"
+    )
+    # We shouldn't need to make a request
+    mockito.when(pipelines).find(...).thenRaise(AssertionError)
+    result = dependency_util.find_id_by_name("Test name", pipelines, "pipeline_id")
+    assert result == "550e8400-e29b-41d4-a716-446655440000"
+
+
+def test_find_id_by_name_caches_result():
+    mockito.when(pipelines).find(name="Test name", limit=2).thenReturn(
+        [{"name": "Test name", "pipeline_id": "550e8400-e29b-41d4-a716-446655440000"}]
+    )
+    dependency_util.find_id_by_name("Test name", pipelines, "pipeline_id")
+    mockito.verify(name_cache).put(
+        "pipelines", "Test name", "550e8400-e29b-41d4-a716-446655440000"
+    )
+
+
+def test_get_ids_from_ids_or_names():
+    pipeline_id = "550e8400-e29b-41d4-a716-446655440000"
+    template_id = "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8"
+    mockito.when(pipelines).find(...).thenReturn(ErrorResponse(status=404, body={}))
+    mockito.expect(pipelines, times=1).find(name="Sword pipeline", limit=2).thenReturn(
+        [{"name": "Sword pipeline", "pipeline_id": pipeline_id}]
+    )
+    mockito.expect(templates, times=1).find(name="Sword template", limit=2).thenReturn(
+        [{"name": "Sword template", "template_id": template_id}]
+    )
+    result = dependency_util.get_ids_from_ids_or_names(
+        [
+            ("Sword pipeline", pipelines, "pipeline_id"),
+            (template_id, templates, "template_id"),
+            ("Sword template", templates, "template_id"),
+            ("", templates, "template_id"),
+            # Repeated names should only be looked up once
+            ("Sword pipeline", pipelines, "pipeline_id"),
+            ("Shield pipeline", pipelines, "pipeline_id"),
+        ]
+    )
+    assert result[:5] == [pipeline_id, template_id, template_id, "", pipeline_id]
+    assert isinstance(result[5], dependency_util.RecordNotFoundError)
+
+
+def test_get_ids_from_ids_or_names_and_handle_error(caplog):
+    mockito.when(pipelines).find(name="Sword pipeline", limit=2).thenReturn(
+        [{"name": "Sword pipeline", "pipeline_id": "1"}]
+    )
+    mockito.when(pipelines).find(name="Shield pipeline", limit=2).thenReturn([])
+    assert dependency_util.get_ids_from_ids_or_names_and_handle_error(
+        [("Sword pipeline", pipelines, "pipeline_id", "pipeline")]
+    ) == ["1"]
+    with pytest.raises(SystemExit):
+        dependency_util.get_ids_from_ids_or_names_and_handle_error(
+            [
+                ("Sword pipeline", pipelines, "pipeline_id", "pipeline"),
+                ("Shield pipeline", pipelines, "pipeline_id", "second pipeline"),
+            ]
+        )
+    assert "Encountered an error processing value for second pipeline" in caplog.text
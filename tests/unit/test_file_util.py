@@ -0,0 +1,36 @@
+import hashlib
+
+import pytest
+from carrot_cli import file_util
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "test.wdl"
+    path.write_bytes(b"workflow sword {}")
+    assert file_util.hash_file(str(path)) == hashlib.sha256(b"workflow sword {}").hexdigest()
+    with pytest.raises(OSError):
+        file_util.hash_file(str(tmp_path / "missing.wdl"))
+
+
+def test_save_and_load_json(tmp_path):
+    path = str(tmp_path / "cache" / "test.json")
+    assert file_util.load_json(path, {}) == {}
+    file_util.save_json(path, {"sword": "protection"})
+    assert file_util.load_json(path) == {"sword": "protection"}
+    # Only the saved file should be left behind
+    assert [child.name for child in (tmp_path / "cache").iterdir()] == ["test.json"]
+    (tmp_path / "cache" / "test.json").write_text("{not json")
+    assert file_util.load_json(path) is None
+
+
+def test_atomic_write_path_failure(tmp_path):
+    path = tmp_path / "test.json"
+    path.write_text("{}")
+    with pytest.raises(ValueError):
+        with file_util.atomic_write_path(str(path)) as temp_path:
+            with open(temp_path, "w") as temp_file:
+                temp_file.write("{partial")
+            raise ValueError("Failed partway through")
+    # The original file should be untouched, and the temporary file removed
+    assert path.read_text() == "{}"
+    assert [child.name for child in tmp_path.iterdir()] == ["test.json"]
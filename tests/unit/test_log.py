@@ -0,0 +1,44 @@
+import json
+import os
+
+import mockito
+import pytest
+
+import carrot_cli
+from carrot_cli import log
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture
+def cache_path(home):
+    return os.path.join(home, ".carrot_cli", "log_format_cache.json")
+
+
+def test_get_dot_separated_submodule_names():
+    module_names = log.get_dot_separated_submodule_names(carrot_cli)
+    assert "carrot_cli.log" in module_names
+    assert "carrot_cli.rest.request_handler" in module_names
+    assert "carrot_cli.software.software_version.software_build.command" in module_names
+
+
+def test_get_cached_logging_format_string(cache_path):
+    expected = log.get_logging_format_string(carrot_cli)
+    assert log.get_cached_logging_format_string(carrot_cli, "1.0.0") == expected
+    with open(cache_path, "r") as cache_file:
+        assert json.load(cache_file)["format_string"] == expected
+    # Now that it's cached, we shouldn't walk the package again
+    mockito.when(log).get_logging_format_string(...).thenRaise(AssertionError)
+    assert log.get_cached_logging_format_string(carrot_cli, "1.0.0") == expected
+
+
+def test_get_cached_logging_format_string_new_version(cache_path):
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, "w") as cache_file:
+        json.dump({"key": "0.0.1:/old/path", "format_string": "stale"}, cache_file)
+    result = log.get_cached_logging_format_string(carrot_cli, "1.0.0")
+    assert result == log.get_logging_format_string(carrot_cli)
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+import pytest
+from carrot_cli.__main__ import SUBCOMMAND_MODULES
+from carrot_cli.__main__ import main_entry as carrot
+
+
+def test_subcommands_not_imported_at_startup():
+    # Check in a fresh interpreter, since other tests will have already imported everything
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "import carrot_cli.__main__\n"
+            "loaded = [m for m in sys.modules if m.endswith('.command') or m == 'requests']\n"
+            "print(','.join(loaded))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.parametrize("subcommand", sorted(SUBCOMMAND_MODULES))
+def test_subcommand_help(subcommand):
+    runner = CliRunner()
+    result = runner.invoke(carrot, [subcommand, "--help"])
+    assert result.exit_code == 0
+    assert f"Usage: carrot_cli {subcommand}" in result.output
+
+
+def test_list_subcommands():
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["--help"])
+    for subcommand in SUBCOMMAND_MODULES:
+        assert f"  {subcommand} " in result.output
+
+
+def test_log_format_cache_written_to_home(home):
+    # Configuring logging caches the format string under the home directory, which the shared
+    # home fixture points somewhere temporary so commands run in tests don't write to the real one
+    runner = CliRunner()
+    result = runner.invoke(carrot, ["config", "get"])
+    assert result.exit_code == 0
+    assert (home / ".carrot_cli" / "log_format_cache.json").exists()
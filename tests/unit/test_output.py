@@ -0,0 +1,177 @@
+import json
+
+import pytest
+from carrot_cli import output
+from carrot_cli.rest.request_handler import ErrorResponse, PaginationError
+
+
+@pytest.fixture(autouse=True)
+def reset_output_format():
+    yield
+    output.set_output_format("pretty")
+
+
+@pytest.fixture(
+    params=[
+        {
+            "result": {"name": "Sword of Protection", "pipeline_id": "cd987859"},
+            "return": json.dumps(
+                {"name": "Sword of Protection", "pipeline_id": "cd987859"},
+                indent=4,
+                sort_keys=True,
+            ),
+        },
+        {
+            "result": ErrorResponse(
+                message="Encountered a connection error. Enable verbose logging (-v) for more info"
+            ),
+            "return": "Encountered a connection error. Enable verbose logging (-v) for more info",
+        },
+        {
+            "result": ErrorResponse(
+                status=404, body={"title": "No pipelines found", "status": 404}
+            ),
+            "return": json.dumps(
+                {"title": "No pipelines found", "status": 404}, indent=4, sort_keys=True
+            ),
+        },
+        {
+            "result": ErrorResponse(status=500, text="Internal server error"),
+            "return": json.dumps(
+                {"Status": 500, "Body": "Internal server error"}, indent=4, sort_keys=True
+            ),
+        },
+        {
+            "result": "Already formatted",
+            "return": "Already formatted",
+        },
+    ]
+)
+def format_result_data(request):
+    return request.param
+
+
+def test_format_result(format_result_data):
+    result = output.format_result(format_result_data["result"])
+    assert result == format_result_data["return"]
+
+
+@pytest.fixture(
+    params=[
+        {
+            "records": [{"name": "Sword of Protection"}, {"name": "Sword of Power"}],
+            "error": None,
+            "return": json.dumps(
+                [{"name": "Sword of Protection"}, {"name": "Sword of Power"}],
+                indent=4,
+                sort_keys=True,
+            ),
+        },
+        {
+            "records": [],
+            "error": None,
+            "return": "[]",
+        },
+        {
+            "records": [],
+            "error": ErrorResponse(
+                status=404, body={"title": "No pipelines found", "status": 404}
+            ),
+            "return": json.dumps(
+                {"title": "No pipelines found", "status": 404}, indent=4, sort_keys=True
+            ),
+        },
+    ]
+)
+def print_records_data(request):
+    return request.param
+
+
+def test_print_records(print_records_data, capsys):
+    def records():
+        yield from print_records_data["records"]
+        if print_records_data["error"] is not None:
+            raise PaginationError(print_records_data["error"])
+
+    output.print_records(records())
+    assert capsys.readouterr().out == print_records_data["return"] + "\n"
+
+
+def test_print_records_fails_partway(capsys):
+    def records():
+        yield {"name": "Sword of Protection"}
+        raise PaginationError(ErrorResponse(message="Request timed out"))
+
+    with pytest.raises(SystemExit):
+        output.print_records(records())
+    # Whatever was printed should still be a complete json array
+    printed = json.loads(capsys.readouterr().out)
+    assert printed == [{"name": "Sword of Protection"}]
+
+
+@pytest.fixture(
+    params=[
+        {
+            "format": "compact",
+            "result": {"pipeline_id": "cd987859", "name": "Sword of Protection"},
+            "return": '{"pipeline_id":"cd987859","name":"Sword of Protection"}',
+        },
+        {
+            "format": "ndjson",
+            "result": [{"name": "Sword of Protection"}, {"name": "Sword of Power"}],
+            "return": '{"name":"Sword of Protection"}\n{"name":"Sword of Power"}',
+        },
+        {
+            "format": "ndjson",
+            "result": ErrorResponse(status=500, text="Internal server error"),
+            "return": '{"Status":500,"Body":"Internal server error"}',
+        },
+    ]
+)
+def format_result_output_format_data(request):
+    return request.param
+
+
+def test_format_result_output_format(format_result_output_format_data):
+    output.set_output_format(format_result_output_format_data["format"])
+    result = output.format_result(format_result_output_format_data["result"])
+    assert result == format_result_output_format_data["return"]
+
+
+@pytest.fixture(
+    params=[
+        {
+            "format": "ndjson",
+            "records": [{"name": "Sword of Protection"}, {"name": "Sword of Power"}],
+            "return": '{"name":"Sword of Protection"}\n{"name":"Sword of Power"}\n',
+        },
+        {
+            "format": "ndjson",
+            "records": [],
+            "return": "",
+        },
+        {
+            "format": "compact",
+            "records": [{"name": "Sword of Protection"}, {"name": "Sword of Power"}],
+            "return": '[{"name":"Sword of Protection"},{"name":"Sword of Power"}]\n',
+        },
+        {
+            "format": "compact",
+            "records": [],
+            "return": "[]\n",
+        },
+    ]
+)
+def print_records_output_format_data(request):
+    return request.param
+
+
+def test_print_records_output_format(print_records_output_format_data, capsys):
+    output.set_output_format(print_records_output_format_data["format"])
+    output.print_records(iter(print_records_output_format_data["records"]))
+    assert capsys.readouterr().out == print_records_output_format_data["return"]
+
+
+def test_set_output_format_invalid():
+    with pytest.raises(ValueError):
+        output.set_output_format("yaml")
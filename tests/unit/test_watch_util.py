@@ -0,0 +1,197 @@
+import datetime
+
+import mockito
+import pytest
+from carrot_cli import watch_util
+from carrot_cli.rest import runs
+from carrot_cli.rest.request_handler import ErrorResponse
+
+RUN_1 = "cd987859-06fe-4b1a-9e96-47d4f36bf819"
+RUN_2 = "986325ba-06fe-4b1a-9e96-47d4f36bf819"
+
+
+@pytest.fixture(autouse=True)
+def unstub():
+    yield
+    mockito.unstub()
+
+
+@pytest.fixture(autouse=True)
+def fake_clock():
+    # Sleeping just advances the clock, so tests run instantly
+    clock = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    mockito.when(watch_util.time).monotonic().thenAnswer(lambda: clock[0])
+    mockito.when(watch_util.time).sleep(...).thenAnswer(fake_sleep)
+    return sleeps
+
+
+def run_record(run_id, status, age_seconds=0):
+    created_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=age_seconds)
+    return {
+        "run_id": run_id,
+        "name": f"run {run_id[:8]}",
+        "status": status,
+        "created_at": created_at.isoformat(),
+    }
+
+
+@pytest.fixture(
+    params=[
+        {
+            "responses": {
+                RUN_1: [
+                    run_record(RUN_1, "running"),
+                    run_record(RUN_1, "running"),
+                    run_record(RUN_1, "succeeded"),
+                ],
+                RUN_2: [run_record(RUN_2, "building"), run_record(RUN_2, "succeeded")],
+            },
+            "exit_code": watch_util.EXIT_SUCCEEDED,
+            "events": [
+                (RUN_1, None, "running"),
+                (RUN_2, None, "building"),
+                # Building runs are polled half as often
+                (RUN_1, "running", "succeeded"),
+                (RUN_2, "building", "succeeded"),
+            ],
+        },
+        {
+            "responses": {
+                RUN_1: [run_record(RUN_1, "test_failed")],
+                RUN_2: [
+                    ErrorResponse(message="Encountered a connection error."),
+                    run_record(RUN_2, "succeeded"),
+                ],
+            },
+            "exit_code": watch_util.EXIT_FAILED,
+            "events": [(RUN_1, None, "test_failed"), (RUN_2, None, "succeeded")],
+        },
+        {
+            "responses": {
+                RUN_1: [ErrorResponse(status=404, body={"title": "No run found"})],
+                RUN_2: [run_record(RUN_2, "eval_aborted")],
+            },
+            "exit_code": watch_util.EXIT_FAILED,
+            "events": [(RUN_1, None, "not_found"), (RUN_2, None, "eval_aborted")],
+        },
+    ]
+)
+def watch_runs_data(request):
+    return request.param
+
+
+def test_watch_runs(watch_runs_data):
+    for run_id, responses in watch_runs_data["responses"].items():
+        mockito.when(runs).find_by_id(run_id).thenReturn(*responses)
+    events = []
+    records, exit_code = watch_util.watch_runs(
+        [RUN_1, RUN_2], min_interval=1, max_interval=3, on_event=events.append
+    )
+    assert exit_code == watch_runs_data["exit_code"]
+    assert [
+        (event["run_id"], event["previous_status"], event["status"]) for event in events
+    ] == watch_runs_data["events"]
+    for run_id, responses in watch_runs_data["responses"].items():
+        assert records[run_id] == responses[-1]
+
+
+def test_watch_runs_timeout():
+    mockito.when(runs).find_by_id(RUN_1).thenReturn(run_record(RUN_1, "running"))
+    records, exit_code = watch_util.watch_runs([RUN_1], timeout=10, min_interval=1)
+    assert exit_code == watch_util.EXIT_TIMED_OUT
+    assert records[RUN_1]["status"] == "running"
+    # Polled every second, including one last time when the timeout is reached
+    mockito.verify(runs, times=11).find_by_id(RUN_1)
+
+
+@pytest.fixture(
+    params=[
+        {"status": "running", "age": 0, "interval": 5},
+        {"status": "running", "age": 100, "interval": 10},
+        {"status": "running", "age": 10000, "interval": 60},
+        {"status": "queued_in_cromwell", "age": 100, "interval": 20},
+        {"status": "building", "age": 0, "interval": 10},
+    ]
+)
+def poll_interval_data(request):
+    return request.param
+
+
+def test_poll_interval(poll_interval_data, fake_clock):
+    sleeps = fake_clock
+    mockito.when(runs).find_by_id(RUN_1).thenReturn(
+        run_record(RUN_1, poll_interval_data["status"], poll_interval_data["age"]),
+        run_record(RUN_1, "succeeded"),
+    )
+    watch_util.watch_runs([RUN_1], min_interval=5, max_interval=60)
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(poll_interval_data["interval"], abs=0.1)
+
+
+def test_watch_runs_by_test():
+    test_id = "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8"
+    run_3 = "11111111-06fe-4b1a-9e96-47d4f36bf819"
+    run_ids = [RUN_1, RUN_2, run_3]
+
+    def test_run(run_id, status):
+        record = run_record(run_id, status)
+        record["test_id"] = test_id
+        return record
+
+    # The first poll of each run has to be by id, since we don't know their tests yet
+    for run_id in run_ids:
+        mockito.when(runs).find_by_id(run_id).thenReturn(test_run(run_id, "running"))
+    # After that, they should all be retrieved together, including a run we aren't watching
+    mockito.when(runs).find(...).thenReturn(
+        [
+            test_run(RUN_1, "succeeded"),
+            test_run("99999999-06fe-4b1a-9e96-47d4f36bf819", "running"),
+            test_run(RUN_2, "running"),
+            test_run(run_3, "running"),
+        ],
+        [test_run(RUN_2, "test_failed"), test_run(run_3, "succeeded")],
+    )
+    events = []
+    records, exit_code = watch_util.watch_runs(
+        run_ids, min_interval=1, on_event=events.append, strategy="by_test"
+    )
+    assert exit_code == watch_util.EXIT_FAILED
+    assert {run_id: record["status"] for run_id, record in records.items()} == {
+        RUN_1: "succeeded",
+        RUN_2: "test_failed",
+        run_3: "succeeded",
+    }
+    assert len(events) == 6
+    mockito.verify(runs, times=1).find_by_id(RUN_1)
+    mockito.verify(runs, times=1).find_by_id(RUN_2)
+    mockito.verify(runs, times=1).find_by_id(run_3)
+    mockito.verify(runs, times=2).find(
+        parent_entity="tests",
+        parent_entity_id=test_id,
+        created_after=mockito.ANY,
+        sort="asc(created_at)",
+        limit=watch_util.FIND_RUNS_PAGE_SIZE,
+        offset=0,
+    )
+
+
+def test_watch_runs_by_test_falls_back_to_per_run():
+    test_id = "3d1bfbab-d9ec-46c7-aa8e-9c1d1808f2b8"
+    first = [run_record(RUN_1, "running"), run_record(RUN_2, "running")]
+    for record in first:
+        record["test_id"] = test_id
+    mockito.when(runs).find_by_id(RUN_1).thenReturn(first[0], run_record(RUN_1, "succeeded"))
+    mockito.when(runs).find_by_id(RUN_2).thenReturn(first[1], run_record(RUN_2, "succeeded"))
+    # If the query for the test's runs fails, we should retrieve them individually
+    mockito.when(runs).find(...).thenReturn(ErrorResponse(message="Request timed out."))
+    records, exit_code = watch_util.watch_runs(
+        [RUN_1, RUN_2], min_interval=1, strategy="by_test"
+    )
+    assert exit_code == watch_util.EXIT_SUCCEEDED
+    mockito.verify(runs, times=1).find(...)
@@ -0,0 +1,90 @@
+import os
+import zipfile
+
+import pytest
+from carrot_cli import wdl_util
+
+
+@pytest.fixture
+def wdl_tree(tmp_path):
+    # A workflow importing a task, which imports a shared struct file also imported by the workflow
+    root = tmp_path / "wdl"
+    (root / "tasks").mkdir(parents=True)
+    (root / "structs").mkdir()
+    (root / "main.wdl").write_text(
+        'version 1.0\n'
+        '# import "commented_out.wdl"\n'
+        'import "tasks/align.wdl" as align\n'
+        "import 'structs/sample.wdl' alias Sample as S\n"
+        'import "https://example.com/remote.wdl"\n'
+        "workflow main {}\n"
+    )
+    (root / "tasks" / "align.wdl").write_text(
+        'version 1.0\nimport "../structs/sample.wdl"\ntask align {}\n'
+    )
+    (root / "structs" / "sample.wdl").write_text("version 1.0\nstruct Sample {}\n")
+    return root
+
+
+def test_find_imports(wdl_tree):
+    assert wdl_util.find_imports(str(wdl_tree / "main.wdl")) == [
+        "tasks/align.wdl",
+        "structs/sample.wdl",
+        "https://example.com/remote.wdl",
+    ]
+
+
+def test_resolve_import_graph(wdl_tree):
+    assert wdl_util.resolve_import_graph(str(wdl_tree / "main.wdl")) == [
+        ("structs/sample.wdl", str(wdl_tree / "structs" / "sample.wdl")),
+        ("tasks/align.wdl", str(wdl_tree / "tasks" / "align.wdl")),
+    ]
+
+
+@pytest.fixture(
+    params=[
+        ('import "../outside.wdl"\n', "outside"),
+        ('import "missing.wdl"\n', "Failed to read"),
+    ]
+)
+def invalid_import_data(request):
+    return request.param
+
+
+def test_resolve_import_graph_invalid(tmp_path, invalid_import_data):
+    contents, message = invalid_import_data
+    (tmp_path / "wdl").mkdir()
+    (tmp_path / "wdl" / "main.wdl").write_text(contents)
+    with pytest.raises(wdl_util.WdlImportError, match=message):
+        wdl_util.resolve_import_graph(str(tmp_path / "wdl" / "main.wdl"))
+
+
+def test_build_dependency_zip(wdl_tree, home):
+    zip_path = wdl_util.build_dependency_zip(str(wdl_tree / "main.wdl"))
+    assert zip_path.startswith(str(home))
+    with zipfile.ZipFile(zip_path) as dependency_zip:
+        assert dependency_zip.namelist() == ["structs/sample.wdl", "tasks/align.wdl"]
+        assert dependency_zip.read("structs/sample.wdl") == b"version 1.0\nstruct Sample {}\n"
+    with open(zip_path, "rb") as zip_file:
+        contents = zip_file.read()
+    # Building again should reuse the zip, and rebuilding it from scratch should give the same
+    # bytes
+    assert wdl_util.build_dependency_zip(str(wdl_tree / "main.wdl")) == zip_path
+    os.remove(zip_path)
+    assert wdl_util.build_dependency_zip(str(wdl_tree / "main.wdl")) == zip_path
+    with open(zip_path, "rb") as zip_file:
+        assert zip_file.read() == contents
+    # Changing a file anywhere in the graph should give a new zip
+    (wdl_tree / "structs" / "sample.wdl").write_text("version 1.0\nstruct Sample { File f }\n")
+    assert wdl_util.build_dependency_zip(str(wdl_tree / "main.wdl")) != zip_path
+
+
+def test_build_dependency_zip_no_imports(tmp_path):
+    (tmp_path / "main.wdl").write_text("version 1.0\nworkflow main {}\n")
+    assert wdl_util.build_dependency_zip(str(tmp_path / "main.wdl")) is None
+
+
+def test_clear_dependency_zips(wdl_tree):
+    zip_path = wdl_util.build_dependency_zip(str(wdl_tree / "main.wdl"))
+    wdl_util.clear_dependency_zips()
+    assert not os.path.exists(zip_path)